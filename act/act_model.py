@@ -9,42 +9,174 @@ import os
 import sys
 import tempfile
 
+import numpy as np
 import pint
-import yaml
-from .core.units import *
+from .core.units import CARBON_UNIT, kg, units, year
 
-from .core.arg_parser import get_clean_args, get_parser
-from .core.common import *
+from .core.batch import as_magnitude
+from .core.common import (
+    CARBON_PER_IC_PACKAGE,
+    ComponentCategory,
+    EnergyLocation,
+    ModelType,
+    PACKAGE_CARBON,
+)
 
 from .core.capacitor_model import CapacitorModel, DEFAULT_CP_CONFIG
-from .core.carbon import Carbon, SourceType
-
-from .core.dram_model import DEFAULT_DRAM_CONFIG, DRAMModel
-from .core.hdd_model import DEFAULT_HDD_CONFIG, HDDModel
+from .core.carbon import Carbon, CarbonArray, SourceType
 
 from .core.logger import log, setup_logger
-from .core.logic_model import LogicModel
 from .core.materials_model import DEFAULT_MATERIALS_CONFIG, MaterialsModel
-from .core.op_model import OpModel
-from .core.ssd_model import SSDModel
-from .core.bom import *
-from .core.battery_model import BatteryModel
-from .core.pcb_model import DEFAULT_PCB_MODEL_FILE, PCBModel
+from .core.bom import BOM, COUNT, load_bom, MATERIALS, PASSIVES, SILICON, spec_key
+from .core.bundle import DEFAULT_MODEL_BUNDLE, load_model_bundle
+from .core.cache import DEFAULT_CACHE_SIZE, LRUCache
+from .core.report import (
+    build_report,
+    check_export_mode,
+    dump_report,
+    EXPORT_ASYNC,
+    EXPORT_NONE,
+    EXPORT_SYNC,
+    ReportWriter,
+)
 from .core.utils import DEFAULT_LOCATION_CONFIG, DEFAULT_SOURCE_CONFIG
 
+"""Silicon annotation fields that can be evaluated over arrays of design points."""
+SILICON_BATCH_FIELDS = (
+    "area",
+    "capacity",
+    "n_ics",
+    "process",
+    "carbon",
+    "fab_yield",
+    "fab_ci",
+    "gpa",
+    "count",
+)
+
+"""Passive component fields that can be evaluated over arrays of design points."""
+PASSIVES_BATCH_FIELDS = ("quantity", "weight", "fab_ci", "count")
+
+"""Frame, enclosure, PCB and battery fields that can be evaluated over arrays of design points."""
+MATERIALS_BATCH_FIELDS = ("weight", "area", "layers", "capacity", "count")
+
+"""Silicon model types backed by a capacity based storage model."""
+STORAGE_MODEL_TYPES = (ModelType.DRAM, ModelType.FLASH, ModelType.HDD)
+
+
+def _has_params(params: dict, section: str, device: str, fields: tuple) -> bool:
+    """Check if any field of a device is evaluated over arrays"""
+    return any(f"{section}.{device}.{field}" in params for field in fields)
+
+
+class _Submodel:
+    """
+    A submodel of ACTModel that is only built the first time it is used.
+
+    Assigning a submodel replaces it and invalidates the memoized device results of the model.
+    """
+
+    def __init__(self, build) -> None:
+        self.build = build
+
+    def __set_name__(self, owner, name: str) -> None:
+        self.name = name
+
+    def __get__(self, model, owner=None):
+        if model is None:
+            return self
+        submodel = model.__dict__.get(self.name)
+        if submodel is None:
+            submodel = model.__dict__[self.name] = self.build(model)
+        return submodel
+
+    def __set__(self, model, submodel) -> None:
+        model.__dict__[self.name] = submodel
+        model._model_version += 1
+
+
+def _logic_model(model):
+    from .core.logic_model import LogicModel
+
+    return LogicModel()
+
+
+def _dram_model(model):
+    from .core.dram_model import DEFAULT_DRAM_CONFIG, DRAMModel
+
+    dram_config = model.model_configs["dram_config"]
+    return DRAMModel(model_file=dram_config or DEFAULT_DRAM_CONFIG)
+
+
+def _ssd_model(model):
+    from .core.ssd_model import SSDModel
+
+    return SSDModel()
+
+
+def _hdd_model(model):
+    from .core.hdd_model import DEFAULT_HDD_CONFIG, HDDModel
+
+    hdd_config = model.model_configs["hdd_config"]
+    return HDDModel(model_files=hdd_config or DEFAULT_HDD_CONFIG)
+
+
+def _op_model(model):
+    from .core.op_model import OpModel
+
+    return OpModel(
+        loc_ci_config=model.model_configs["loc_ci_config"],
+        src_ci_config=model.model_configs["src_ci_config"],
+    )
+
+
+def _cap_model(model):
+    return CapacitorModel(model_file=model.model_configs["cap_config"])
+
+
+def _materials_model(model):
+    return MaterialsModel(model_file=model.model_configs["materials_config"])
+
+
+def _pcb_model(model):
+    from .core.pcb_model import DEFAULT_PCB_MODEL_FILE, PCBModel
+
+    pcb_config = model.model_configs["pcb_config"]
+    return PCBModel(model_file=pcb_config or DEFAULT_PCB_MODEL_FILE)
+
+
+def _battery_model(model):
+    from .core.battery_model import BatteryModel
+
+    return BatteryModel()
+
 
 class ACTModel:
+    # the models for each type of device, built on first use
+    logic_model = _Submodel(_logic_model)
+    dram_model = _Submodel(_dram_model)
+    ssd_model = _Submodel(_ssd_model)
+    hdd_model = _Submodel(_hdd_model)
+    op_model = _Submodel(_op_model)
+    cap_model = _Submodel(_cap_model)
+    materials_model = _Submodel(_materials_model)
+    pcb_model = _Submodel(_pcb_model)
+    battery_model = _Submodel(_battery_model)
+
     def __init__(
         self,
         out_dir: str = None,
         weight_unit=kg,
         cap_config=DEFAULT_CP_CONFIG,
-        dram_config=DEFAULT_DRAM_CONFIG,
-        hdd_config=DEFAULT_HDD_CONFIG,
+        dram_config=None,
+        hdd_config=None,
         materials_config=DEFAULT_MATERIALS_CONFIG,
-        pcb_config=DEFAULT_PCB_MODEL_FILE,
+        pcb_config=None,
         loc_ci_config=DEFAULT_LOCATION_CONFIG,
         src_ci_config=DEFAULT_SOURCE_CONFIG,
+        cache_size=DEFAULT_CACHE_SIZE,
+        model_bundle=DEFAULT_MODEL_BUNDLE,
+        export_mode=EXPORT_SYNC,
     ):
         """ACT Model object
 
@@ -52,37 +184,46 @@ class ACTModel:
             out_dir: Output directory for results
             weight_unit: The unit of weight to normalize results to for reporting
             cap_config: Capacitor model configuration file
-            dram_config: DRAM model configuration file
-            hdd_config: HDD model configuration file
-            pcb_config: PCB model configuration file
+            dram_config: DRAM model configuration file. Defaults to the Hynix DRAM model
+            hdd_config: HDD model configuration files. Defaults to the consumer and enterprise HDD models
+            pcb_config: PCB model configuration file. Defaults to the PCB area model
             materials_config: Material model configuration file
             loc_ci_config: Location carbon intensity configuration file
             src_ci_config: Energy source carbon intensity configuration file
+            cache_size: Number of device results memoized across evaluations (0 to disable, None for unbounded)
+            model_bundle: Precompiled model data bundle to load the model files from when it is fresh (None to always parse the model files)
+            export_mode: Export mode of the report of each estimate: written before returning (sync), written by a background thread (async) or skipped (none)
 
         """
 
         self.weight_unit = weight_unit
 
-        if out_dir is None:
-            self.out_dir = tempfile.TemporaryDirectory(prefix="act_out_").name
-        else:
-            self.out_dir = out_dir
-
-        if not os.path.exists(self.out_dir):
+        # a temporary output directory is only created for the first report
+        self.out_dir = out_dir
+        if self.out_dir is not None and not os.path.exists(self.out_dir):
             os.makedirs(self.out_dir, exist_ok=True)
 
-        # load the models for each type of device
-        self.logic_model = LogicModel()
-        self.dram_model = DRAMModel(model_file=dram_config)
-        self.ssd_model = SSDModel()
-        self.hdd_model = HDDModel(model_files=hdd_config)
-        self.op_model = OpModel(
-            loc_ci_config=loc_ci_config, src_ci_config=src_ci_config
+        self.export_mode = check_export_mode(export_mode)
+        self.report_writer = ReportWriter()
+
+        # load the precompiled model data once per process if available
+        if model_bundle is not None:
+            load_model_bundle(model_bundle)
+
+        # the models for each type of device are only loaded when first used
+        self.model_configs = dict(
+            cap_config=cap_config,
+            dram_config=dram_config,
+            hdd_config=hdd_config,
+            materials_config=materials_config,
+            pcb_config=pcb_config,
+            loc_ci_config=loc_ci_config,
+            src_ci_config=src_ci_config,
         )
-        self.cap_model = CapacitorModel(model_file=cap_config)
-        self.materials_model = MaterialsModel(model_file=materials_config)
-        self.pcb_model = PCBModel(model_file=pcb_config)
-        self.battery_model = BatteryModel()
+
+        # memoized device results keyed by device specification and model version
+        self._model_version = 0
+        self.component_cache = LRUCache(cache_size)
 
         # save the last settings
         self.last_op_power = None
@@ -104,212 +245,501 @@ class ACTModel:
         duty_cycle: float = 1.0,
         hw_lifetime=2 * year,
         export_file=None,
+        expand_instances: bool = False,
+        export: str = None,
+        stream=None,
     ):
         """Calculate the aggregate carbon cost for this configuration
 
         Args:
-            bom: Bill of materials data structure specifying the component lists and parameters
+            bom: Bill of materials data structure specifying the component lists and parameters, or a bill of materials compiled with compile_bom
             op_power: Operating power of the device
             op_ci: Operational carbon intensity setting
             duty_cycle: Device utilization rate between 0 and 1
             hw_lifetime: Expected hardware life cycle
             export_file: Output file for results
+            expand_instances: Report each of the identical devices of a device with a count separately
+            export: Export mode of the report (sync, async or none). Defaults to the export mode of the model
+            stream: Report stream (see open_report_stream) the report is also written to as it is built, whatever the export mode
         """
 
+        # only the operational carbon needs to be evaluated for a compiled bill of materials
+        from .core.plan import CompiledBOM
+
+        plan = bom if isinstance(bom, CompiledBOM) else self.compile_bom(bom)
+
         self.last_op_power = op_power
         self.last_op_ci = op_ci
         self.last_duty_cycle = duty_cycle
         self.last_hw_lifetime = hw_lifetime
-        self.last_bom = bom
+        self.last_bom = plan.bom
 
-        self.silicon_results = self.silicon_analysis(bom.silicon)
-        self.passives_results = self.passives_analysis(bom.passives)
-        self.materials_results = self.materials_analysis(bom.materials)
+        self.silicon_results = plan.silicon_results
+        self.passives_results = plan.passives_results
+        self.materials_results = plan.materials_results
 
-        op_carbon = self.op_model.get_carbon(
-            lifetime=hw_lifetime, duty_cycle=duty_cycle, op_power=op_power, op_ci=op_ci
+        total_carbon = plan.get_carbon(
+            op_power=op_power,
+            op_ci=op_ci,
+            duty_cycle=duty_cycle,
+            hw_lifetime=hw_lifetime,
         )
 
-        total_carbon = (
-            sum(
-                [
-                    *self.silicon_results.values(),
-                    *self.passives_results.values(),
-                    *self.materials_results.values(),
-                ]
+        if stream is not None:
+            stream.write(
+                build_report(**self.report_data(total_carbon, expand_instances))
             )
-            + op_carbon
-        )
 
         # export the result to report for auditing
+        export = self.export_mode if export is None else check_export_mode(export)
+        if export == EXPORT_NONE:
+            return total_carbon
         if export_file is None:
-            export_file = f"{self.out_dir}/act_report.yaml"
-        self.export_results(export_file, total_carbon)
+            export_file = f"{self.report_dir()}/act_report.yaml"
+        if export == EXPORT_ASYNC:
+            self.submit_results(export_file, total_carbon, expand_instances)
+        else:
+            self.export_results(export_file, total_carbon, expand_instances)
 
         return total_carbon
 
-    def silicon_analysis(self, silicon):
-        # for each device, run the carbon modeling analysis
+    def report_dir(self) -> str:
+        """The output directory of the reports, creating a temporary directory if none was given"""
+        if self.out_dir is None:
+            self.out_dir = tempfile.mkdtemp(prefix="act_out_")
+        return self.out_dir
+
+    def compile_bom(self, bom: BOM) -> "CompiledBOM":
+        """Compile a bill of materials into a plan that can be re-evaluated under new operating parameters
+
+        The embodied carbon of every device is evaluated once here. Passing the result to get_carbon, or
+        calling its own get_carbon, only evaluates the operational carbon.
+
+        Args:
+            bom: Bill of materials data structure specifying the component lists and parameters
+
+        Returns:
+            CompiledBOM: The compiled bill of materials
+        """
+        from .core.plan import CompiledBOM
+
+        return CompiledBOM(
+            bom=bom,
+            op_model=self.op_model,
+            silicon_results=self.silicon_analysis(bom.silicon),
+            passives_results=self.passives_analysis(bom.passives),
+            materials_results=self.materials_analysis(bom.materials),
+        )
+
+    def get_carbon_batch(
+        self,
+        bom,
+        op_power,
+        op_ci=EnergyLocation.USA,
+        duty_cycle=1.0,
+        hw_lifetime=2 * year,
+        params: dict = None,
+    ) -> CarbonArray:
+        """Calculate the aggregate carbon cost over arrays of design points
+
+        Operating parameters may either be scalars or arrays. Parameters of individual devices in the bill
+        of materials are replaced by arrays through params, keyed by "<section>.<device>.<field>" where section
+        is silicon, passives or materials (ex., {"silicon.cpu.area": np.array([50, 100]) * mm2}).
+        All arrays are broadcast against each other.
+
+        Args:
+            bom: Bill of materials data structure specifying the component lists and parameters
+            op_power: Operating power of the device
+            op_ci: Operational carbon intensity setting
+            duty_cycle: Device utilization rate between 0 and 1
+            hw_lifetime: Expected hardware life cycle
+            params: Device parameters to evaluate over arrays
+
+        Returns:
+            CarbonArray: The carbon results for each design point
+        """
+        silicon_results, passives_results, materials_results = self.batch_analysis(
+            bom, params
+        )
+
+        op_carbon = self.op_model.get_carbon_batch(
+            lifetime=hw_lifetime,
+            duty_cycle=duty_cycle,
+            op_power=op_power,
+            op_ci=op_ci,
+        )
+        results = [
+            *silicon_results.values(),
+            *passives_results.values(),
+            *materials_results.values(),
+            op_carbon,
+        ]
+
+        # accumulate every result in place into an array with the broadcast shape of all results
+        shape = np.broadcast_shapes(*[r.values.shape[:-1] for r in results])
+        total_carbon = CarbonArray.zeros(shape)
+        for result in results:
+            total_carbon += result
+        return total_carbon
+
+    def batch_analysis(self, bom, params: dict = None) -> tuple:
+        """Calculate the embodied carbon of each device over arrays of design points
+
+        Args:
+            bom: Bill of materials data structure specifying the component lists and parameters
+            params: Device parameters to evaluate over arrays (see get_carbon_batch)
+
+        Returns:
+            tuple: The silicon, passives and materials results by device.
+        """
+        params = dict() if params is None else params
+        sections = {
+            SILICON: (bom.silicon, SILICON_BATCH_FIELDS),
+            PASSIVES: (bom.passives, PASSIVES_BATCH_FIELDS),
+            MATERIALS: (bom.materials, MATERIALS_BATCH_FIELDS),
+        }
+        for key in params:
+            section, _, field = key.partition(".")
+            device, _, field = field.rpartition(".")
+            if section not in sections or device not in sections[section][0]:
+                raise KeyError(
+                    f"Batch parameter {key} does not match any device in {bom.name}."
+                )
+            if field not in sections[section][1]:
+                raise KeyError(
+                    f"Batch parameter {key} must be one of the {section} fields {sections[section][1]}."
+                )
+
+        silicon_results = self.silicon_batch_analysis(bom.silicon, params)
+        passives_results = self.passives_batch_analysis(bom.passives, params)
+        materials_results = self.materials_batch_analysis(bom.materials, params)
+        return silicon_results, passives_results, materials_results
+
+    def silicon_batch_analysis(self, silicon, params):
+        # for each device, run the vectorized carbon modeling analysis
         silicon_results = dict()
 
-        # for each silicon item in the list, query the manufacturing cost
         for sname, silicon_data in silicon.items():
+            spec = {
+                field: params.get(
+                    f"{SILICON}.{sname}.{field}", getattr(silicon_data, field)
+                )
+                for field in SILICON_BATCH_FIELDS
+            }
             mtype = silicon_data.model
-            fab_yield = silicon_data.fab_yield
-            n_ics = silicon_data.n_ics
-            gpa = silicon_data.gpa
-            fab_ci = silicon_data.fab_ci
 
-            # calculate the carbon emissions for silicon devices
             if mtype is ModelType.LOGIC:
-                si_carbon = self.logic_model.get_carbon(
-                    logic_process=silicon_data.process,
-                    area=silicon_data.area,
-                    fab_yield=fab_yield,
-                    n_ics=n_ics,
-                    gpa=gpa,
-                    fab_ci=fab_ci,
+                si_carbon = self.logic_model.get_carbon_batch(
+                    logic_process=spec["process"],
+                    area=spec["area"],
+                    fab_yield=spec["fab_yield"],
+                    n_ics=spec["n_ics"],
+                    gpa=spec["gpa"],
+                    fab_ci=spec["fab_ci"],
                 )
-            elif mtype is ModelType.DRAM:
-                si_carbon = self.dram_model.get_carbon(
-                    capacity=silicon_data.capacity,
-                    process=silicon_data.process,
-                    fab_yield=fab_yield,
-                    n_ics=n_ics,
-                )
-            elif mtype is ModelType.FLASH:
-                si_carbon = self.ssd_model.get_carbon(
-                    capacity=silicon_data.capacity,
-                    process=silicon_data.process,
-                    fab_yield=fab_yield,
-                    n_ics=n_ics,
-                )
-            elif mtype is ModelType.HDD:
-                si_carbon = self.hdd_model.get_carbon(
-                    capacity=silicon_data.capacity,
-                    process=silicon_data.process,
-                    fab_yield=fab_yield,
-                    n_ics=n_ics,
+            elif mtype in STORAGE_MODEL_TYPES:
+                storage_model = {
+                    ModelType.DRAM: self.dram_model,
+                    ModelType.FLASH: self.ssd_model,
+                    ModelType.HDD: self.hdd_model,
+                }[mtype]
+                si_carbon = storage_model.get_carbon_batch(
+                    capacity=spec["capacity"],
+                    process=spec["process"],
+                    fab_yield=spec["fab_yield"],
+                    n_ics=spec["n_ics"],
                 )
             elif mtype is ModelType.MANUAL:
-                si_carbon = Carbon(
-                    silicon_data.carbon / fab_yield, silicon_data.ctype
-                ) + Carbon(
-                    n_ics * CARBON_PER_IC_PACKAGE / fab_yield, SourceType.PACKAGING
+                fab_yield = as_magnitude(spec["fab_yield"])
+                si_carbon = CarbonArray._from_amounts(
+                    {
+                        silicon_data.ctype: as_magnitude(spec["carbon"], CARBON_UNIT)
+                        / fab_yield
+                    }
+                ) + CarbonArray._from_amounts(
+                    {
+                        SourceType.PACKAGING: as_magnitude(spec["n_ics"])
+                        * PACKAGE_CARBON
+                        / fab_yield
+                    }
                 )
             else:
                 raise NotImplementedError(
                     f"Silicon model type for {mtype} not implemented. Unable to calculate cost."
                 )
 
-            # update the results with the aggregate total
-            silicon_results[sname] = si_carbon
+            silicon_results[sname] = si_carbon * as_magnitude(spec["count"])
 
         return silicon_results
 
-    def passives_analysis(self, passives):
-        passives_results = dict()
+    def passives_batch_analysis(self, passives, params):
+        # for each device with batch parameters, run the vectorized carbon modeling analysis
+        passives_results = self.passives_analysis(
+            {
+                pname: pspec
+                for pname, pspec in passives.items()
+                if not _has_params(params, PASSIVES, pname, PASSIVES_BATCH_FIELDS)
+            }
+        )
+
         for pname, pspec in passives.items():
+            if pname in passives_results:
+                continue
+            spec = {
+                field: params.get(f"{PASSIVES}.{pname}.{field}", getattr(pspec, field))
+                for field in PASSIVES_BATCH_FIELDS
+            }
             if pspec.category is ComponentCategory.CAPACITOR:
-                carbon = self.cap_model.get_carbon(
-                    ci=pspec.fab_ci,
+                carbon = self.cap_model.get_carbon_batch(
+                    ci=spec["fab_ci"],
                     ctype=pspec.type,
-                    weight=pspec.weight,
-                    n_caps=pspec.quantity,
+                    weight=spec["weight"],
+                    n_caps=spec["quantity"],
                 )
             else:
                 raise NotImplementedError(
                     f"Carbon model for component type {pspec.category} not implemented."
                 )
+            passives_results[pname] = carbon * as_magnitude(spec["count"])
 
-            # add the passive device to the results and list of devices
-            passives_results[pname] = carbon
-        return passives_results
+        return {pname: passives_results[pname] for pname in passives}
 
-    def materials_analysis(self, materials):
-        materials_results = dict()
-        for pname, spec in materials.items():
-            if spec.category in [ComponentCategory.FRAME, ComponentCategory.ENCLOSURE]:
-                carbon = self.materials_model.get_carbon(
-                    mat=spec.type, weight=spec.weight
+    def materials_batch_analysis(self, materials, params):
+        # for each device with batch parameters, run the vectorized carbon modeling analysis
+        materials_results = self.materials_analysis(
+            {
+                mname: spec
+                for mname, spec in materials.items()
+                if not _has_params(params, MATERIALS, mname, MATERIALS_BATCH_FIELDS)
+            }
+        )
+
+        for mname, mspec in materials.items():
+            if mname in materials_results:
+                continue
+            spec = {
+                field: params.get(f"{MATERIALS}.{mname}.{field}", getattr(mspec, field))
+                for field in MATERIALS_BATCH_FIELDS
+            }
+            if mspec.category in [ComponentCategory.FRAME, ComponentCategory.ENCLOSURE]:
+                carbon = self.materials_model.get_carbon_batch(
+                    mat=mspec.type, weight=spec["weight"]
+                )
+            elif mspec.category is ComponentCategory.PCB:
+                carbon = self.pcb_model.get_carbon_batch(
+                    area=spec["area"], layers=spec["layers"]
                 )
-            elif spec.category is ComponentCategory.PCB:
-                carbon = self.pcb_model.get_carbon(area=spec.area, layers=spec.layers)
-            elif spec.category is ComponentCategory.BATTERY:
-                carbon = self.battery_model.get_carbon(capacity=spec.capacity)
+            elif mspec.category is ComponentCategory.BATTERY:
+                carbon = self.battery_model.get_carbon_batch(capacity=spec["capacity"])
             else:
                 raise NotImplementedError(
-                    f"Carbon model for component type {spec.category} not implemented."
+                    f"Carbon model for component type {mspec.category} not implemented."
                 )
+            materials_results[mname] = carbon * as_magnitude(spec["count"])
+
+        return {mname: materials_results[mname] for mname in materials}
+
+    def load_models(self):
+        """Build every submodel now instead of on first use, ex. to compile their tables into a model bundle"""
+        for name, attr in vars(type(self)).items():
+            if isinstance(attr, _Submodel):
+                getattr(self, name)
+
+    @property
+    def model_version(self) -> int:
+        """The version of the model tables, which changes when a model is replaced or invalidate_cache is called"""
+        return self._model_version
+
+    def invalidate_cache(self):
+        """Discard the memoized device results, ex. after editing the tables of a model in place"""
+        self._model_version += 1
+        self.component_cache.clear()
+
+        # only clear the caches of the models that were loaded
+        for name, cache in [
+            ("logic_model", "cpa_cache"),
+            ("dram_model", "cpg_cache"),
+            ("ssd_model", "cpg_cache"),
+            ("hdd_model", "cpg_cache"),
+        ]:
+            if name in self.__dict__:
+                getattr(self.__dict__[name], cache).clear()
+
+    def _cached_analysis(self, devices: dict, analyze) -> dict:
+        """Evaluate each device once, reusing the results of devices with unchanged specifications, and scale it by its count"""
+        version = self.model_version
+        results = dict()
+        for name, spec in devices.items():
+            try:
+                key = (spec_key(spec), version)
+                carbon = self.component_cache.get(key)
+            except TypeError:  # fields that cannot be hashed are not memoized
+                carbon = analyze(spec)
+            else:
+                if carbon is None:
+                    carbon = analyze(spec)
+                    self.component_cache.put(key, carbon)
+            # scaling and copying both return a new result that does not share the cached array
+            results[name] = carbon * spec.count if spec.count != 1 else carbon.copy()
+        return results
+
+    def silicon_analysis(self, silicon):
+        # for each device, run the carbon modeling analysis
+        return self._cached_analysis(silicon, self._silicon_carbon)
+
+    def _silicon_carbon(self, silicon_data):
+        # query the manufacturing cost of a silicon device
+        mtype = silicon_data.model
+        fab_yield = silicon_data.fab_yield
+        n_ics = silicon_data.n_ics
+        gpa = silicon_data.gpa
+        fab_ci = silicon_data.fab_ci
+
+        # calculate the carbon emissions for silicon devices
+        if mtype is ModelType.LOGIC:
+            si_carbon = self.logic_model.get_carbon(
+                logic_process=silicon_data.process,
+                area=silicon_data.area,
+                fab_yield=fab_yield,
+                n_ics=n_ics,
+                gpa=gpa,
+                fab_ci=fab_ci,
+            )
+        elif mtype is ModelType.DRAM:
+            si_carbon = self.dram_model.get_carbon(
+                capacity=silicon_data.capacity,
+                process=silicon_data.process,
+                fab_yield=fab_yield,
+                n_ics=n_ics,
+            )
+        elif mtype is ModelType.FLASH:
+            si_carbon = self.ssd_model.get_carbon(
+                capacity=silicon_data.capacity,
+                process=silicon_data.process,
+                fab_yield=fab_yield,
+                n_ics=n_ics,
+            )
+        elif mtype is ModelType.HDD:
+            si_carbon = self.hdd_model.get_carbon(
+                capacity=silicon_data.capacity,
+                process=silicon_data.process,
+                fab_yield=fab_yield,
+                n_ics=n_ics,
+            )
+        elif mtype is ModelType.MANUAL:
+            si_carbon = Carbon(
+                silicon_data.carbon / fab_yield, silicon_data.ctype
+            ) + Carbon(n_ics * CARBON_PER_IC_PACKAGE / fab_yield, SourceType.PACKAGING)
+        else:
+            raise NotImplementedError(
+                f"Silicon model type for {mtype} not implemented. Unable to calculate cost."
+            )
+        return si_carbon
+
+    def passives_analysis(self, passives):
+        return self._cached_analysis(passives, self._passive_carbon)
+
+    def _passive_carbon(self, pspec):
+        if pspec.category is ComponentCategory.CAPACITOR:
+            return self.cap_model.get_carbon(
+                ci=pspec.fab_ci,
+                ctype=pspec.type,
+                weight=pspec.weight,
+                n_caps=pspec.quantity,
+            )
+        raise NotImplementedError(
+            f"Carbon model for component type {pspec.category} not implemented."
+        )
 
-            # add the passive device to the results and list of devices
-            materials_results[pname] = carbon
-        return materials_results
+    def materials_analysis(self, materials):
+        return self._cached_analysis(materials, self._material_carbon)
+
+    def _material_carbon(self, spec):
+        if spec.category in [ComponentCategory.FRAME, ComponentCategory.ENCLOSURE]:
+            return self.materials_model.get_carbon(mat=spec.type, weight=spec.weight)
+        elif spec.category is ComponentCategory.PCB:
+            return self.pcb_model.get_carbon(area=spec.area, layers=spec.layers)
+        elif spec.category is ComponentCategory.BATTERY:
+            return self.battery_model.get_carbon(capacity=spec.capacity)
+        raise NotImplementedError(
+            f"Carbon model for component type {spec.category} not implemented."
+        )
 
-    def export_results(self, export_file: str, total_carbon):
-        now = datetime.datetime.now()
-        export_data = dict(report_generated=now.strftime("%m/%d/%Y %H:%M:%S"))
-        export_data.update(cl_args=" ".join(sys.argv))
+    def report_data(
+        self, total_carbon, expand_instances: bool = False, snapshot: bool = False
+    ):
+        """The arguments of build_report for the results of the last estimate
 
+        Args:
+            total_carbon: The total carbon of the last estimate
+            expand_instances: Report each of the identical devices of a device with a count separately
+            snapshot: Copy the device results and capture the command line and time so the report can be built later
+
+        Returns:
+            dict: The keyword arguments of build_report
+        """
         # export the settings used for the operational estimate
-        query_dict = dict(
+        query_settings = dict(
             op_power=str(self.last_op_power),
             op_ci=self.last_op_ci.value,
             duty_cycle=str(self.last_duty_cycle),
             hw_lifetime=str(self.last_hw_lifetime),
         )
-        export_data.update(query_settings=query_dict)
 
-        # log the total carbon
-        export_data.update(total_carbon=str(total_carbon.total().to(self.weight_unit)))
+        device_results = dict()
+        sections = [
+            (SILICON, "silicon_results", self.silicon_results),
+            (MATERIALS, "materials_results", self.materials_results),
+            (PASSIVES, "passives_results", self.passives_results),
+        ]
+        for section, report_key, results in sections:
+            devices = getattr(self.last_bom, section, None) or dict()
+            device_results[report_key] = {
+                dev: (
+                    carbon.copy() if snapshot else carbon,
+                    getattr(devices.get(dev), COUNT, 1),
+                )
+                for dev, carbon in results.items()
+            }
 
-        # generate the result report by category
-        result_by_cat_dict = dict()
-        for src in SourceType:
-            result_by_cat_dict[src.name] = str(
-                total_carbon.partial(src).to(self.weight_unit)
-            )
-        export_data.update(result_by_category=result_by_cat_dict)
+        return dict(
+            query_settings=query_settings,
+            total_carbon=total_carbon.copy() if snapshot else total_carbon,
+            device_results=device_results,
+            weight_unit=self.weight_unit,
+            expand_instances=expand_instances,
+            cl_args=" ".join(sys.argv) if snapshot else None,
+            generated=datetime.datetime.now() if snapshot else None,
+        )
 
-        # generate the results by component
-        result_by_dev_dict = dict()
+    def export_results(
+        self, export_file: str, total_carbon, expand_instances: bool = False
+    ):
+        dump_report(
+            export_file,
+            build_report(**self.report_data(total_carbon, expand_instances)),
+        )
 
-        silicon_results = dict()
-        for dev, carbon in self.silicon_results.items():
-            dev_dict = {
-                ctype.name: str(amt.to(self.weight_unit))
-                for ctype, amt in carbon.carbon_by_type.items()
-            }
-            silicon_results[dev] = dev_dict
-        result_by_dev_dict.update(silicon_results=silicon_results)
-
-        materials_results = dict()
-        for dev, carbon in self.materials_results.items():
-            dev_dict = {
-                ctype.name: str(amt.to(self.weight_unit))
-                for ctype, amt in carbon.carbon_by_type.items()
-            }
-            materials_results[dev] = dev_dict
-        result_by_dev_dict.update(materials_results=materials_results)
-
-        passives_results = dict()
-        for dev, carbon in self.passives_results.items():
-            dev_dict = {
-                ctype.name: str(amt.to(self.weight_unit))
-                for ctype, amt in carbon.carbon_by_type.items()
-            }
-            passives_results[dev] = dev_dict
-        result_by_dev_dict.update(passives_results=passives_results)
+    def submit_results(
+        self, export_file: str, total_carbon, expand_instances: bool = False
+    ):
+        """Queue the report of the last estimate to be written by the background report writer
 
-        export_data.update(result_by_device=result_by_dev_dict)
+        The results are copied, so later estimates do not change the report. Call flush_reports to wait for
+        the queued reports to be written.
+        """
+        kwargs = self.report_data(total_carbon, expand_instances, snapshot=True)
+        self.report_writer.submit(export_file, lambda: build_report(**kwargs))
 
-        with open(export_file, "w") as handle:
-            yaml.dump(export_data, handle)
-        log.info(f"ACT results exported to: {export_file}")
+    def flush_reports(self):
+        """Wait until the reports queued by the background report writer are written"""
+        self.report_writer.flush()
 
 
 def main():
     # parse arguments and sanitize them
+    from .core.arg_parser import get_clean_args, get_parser
+
     parser = get_parser()
     args = parser.parse_args()
 
@@ -324,24 +754,57 @@ def main():
     # initialize the model
     model = ACTModel(**model_args)
 
+    # keep the model loaded and answer queries until interrupted
+    if args.serve:
+        import asyncio
+
+        from .core.server import CarbonServer, DEFAULT_PORT
+
+        server = CarbonServer(
+            model,
+            max_batch=args.max_batch,
+            batch_window=args.batch_window,
+            max_concurrency=args.max_concurrency,
+        )
+        port = DEFAULT_PORT if args.port is None and args.socket is None else args.port
+        try:
+            asyncio.run(server.serve_forever(args.host, port, args.socket))
+        except KeyboardInterrupt:
+            pass
+        return model
+
     # if a bill of materials file is specified, use that instead of the cl arg values
     if args.materials is not None:
-        with open(args.materials) as handle:
-            bom = BOM(
-                **yaml.load(handle, Loader=yaml.FullLoader),
-                file=args.materials,
-                material_type=model.materials_model.MaterialType,
-            )
-            query_args.update(bom=bom)
+        bom = load_bom(args.materials, model.materials_model.MaterialType)
+        query_args.update(bom=bom)
 
     # query the model for the carbon estimate
     carbon = model.get_carbon(**query_args)
     log.info(f"Total carbon for this system configuration: {carbon.total()}")
+    model.flush_reports()
 
     log.info("ACT done executing...")
 
     return model
 
 
+__all__ = [
+    "ACTModel",
+    "BOM",
+    "Carbon",
+    "CarbonArray",
+    "CARBON_UNIT",
+    "ComponentCategory",
+    "EnergyLocation",
+    "load_bom",
+    "main",
+    "MATERIALS_BATCH_FIELDS",
+    "ModelType",
+    "PASSIVES_BATCH_FIELDS",
+    "SILICON_BATCH_FIELDS",
+    "SourceType",
+    "units",
+]
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,125 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import argparse
+import logging
+import sys
+import time
+
+import yaml
+
+from .core.bom import BOM, decode_bom, MATERIALS, PASSIVES, SILICON
+from .core.common import ACT_ROOT
+from .core.logger import log, setup_logger
+from .core.materials_model import MaterialsModel
+from .core.utils import load_yaml, YAML_LOADER
+
+
+def get_parser():
+    """
+    Returns an ArgumentParser instance for the ACT bill of materials load benchmark.
+
+    The parser includes arguments for the bill of materials to scale, the scale factors and the number of repeats.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark the load time of a bill of materials scaled to a given number of copies."
+    )
+    parser.add_argument(
+        "-m",
+        "--materials",
+        type=str,
+        default=f"{ACT_ROOT}/boms/dellr740.yaml",
+        help="Bill of materials to scale. Its devices are copied once per scale.",
+    )
+    parser.add_argument(
+        "-s",
+        "--scales",
+        type=int,
+        nargs="+",
+        default=[1, 10, 100, 1000],
+        help="Number of copies of the devices of the bill of materials.",
+    )
+    parser.add_argument(
+        "-r",
+        "--repeats",
+        type=int,
+        default=3,
+        help="Number of repeats, the best time is reported.",
+    )
+    parser.add_argument(
+        "-l",
+        "--loglevel",
+        type=str,
+        default="info",
+        help="Log level to report messages and telemetry.",
+    )
+
+    return parser
+
+
+def scale_bom(bom_data: dict, scale: int) -> dict:
+    """
+    Copy every device of a bill of materials.
+
+    Args:
+        bom_data (dict): The bill of materials YAML data.
+        scale (int): The number of copies of each device.
+
+    Returns:
+        dict: The bill of materials YAML data with the copies named <device>.<copy>.
+    """
+    scaled = {k: v for k, v in bom_data.items() if k != "imports"}
+    for section in (SILICON, PASSIVES, MATERIALS):
+        devices = bom_data.get(section) or dict()
+        scaled[section] = {
+            f"{name}.{i}": data for i in range(scale) for name, data in devices.items()
+        }
+    return scaled
+
+
+def best_time(load, repeats: int) -> float:
+    """The best time in seconds of repeated calls"""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        load()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = get_parser()
+    args = parser.parse_args()
+
+    loglevel = getattr(logging, args.loglevel.upper())
+    setup_logger(loglevel=loglevel)
+
+    log.info("ACT BOM benchmark called with: " + " ".join(sys.argv))
+    log.info(f"YAML loader: {YAML_LOADER.__name__}")
+    material_type = MaterialsModel().MaterialType
+    bom_data = load_yaml(args.materials)
+
+    def load_python(document):
+        data = yaml.load(document, Loader=yaml.FullLoader)
+        return BOM(**data, material_type=material_type)
+
+    log.info(
+        f"{'devices':>10} {'python loader (s)':>18} {'load_bom (s)':>14} {'speedup':>8}"
+    )
+    for scale in args.scales:
+        scaled = scale_bom(bom_data, scale)
+        document = yaml.dump(scaled, sort_keys=False)
+        n_devices = sum(
+            len(scaled[section]) for section in (SILICON, PASSIVES, MATERIALS)
+        )
+        python_time = best_time(lambda: load_python(document), args.repeats)
+        fast_time = best_time(lambda: decode_bom(document, material_type), args.repeats)
+        log.info(
+            f"{n_devices:>10} {python_time:>18.4f} {fast_time:>14.4f} {python_time / fast_time:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
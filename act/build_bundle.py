@@ -0,0 +1,60 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import argparse
+import logging
+import sys
+
+from .core.bundle import build_model_bundle, DEFAULT_MODEL_BUNDLE, DEFAULT_MODELS_DIR
+from .core.logger import log, setup_logger
+
+
+def get_parser():
+    """
+    Returns an ArgumentParser instance for the ACT model bundle build tool.
+
+    The parser includes arguments for the model directory and the output bundle file.
+    """
+    parser = argparse.ArgumentParser(
+        description="Compile the ACT model files into a binary bundle for fast startup."
+    )
+    parser.add_argument(
+        "--models-dir",
+        type=str,
+        default=DEFAULT_MODELS_DIR,
+        help="Directory of the model files to compile.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        default=DEFAULT_MODEL_BUNDLE,
+        help="Output bundle file. ACTModel loads the default bundle when it is present.",
+    )
+    parser.add_argument(
+        "-l",
+        "--loglevel",
+        type=str,
+        default="info",
+        help="Log level to report messages and telemetry.",
+    )
+
+    return parser
+
+
+def main():
+    parser = get_parser()
+    args = parser.parse_args()
+
+    loglevel = getattr(logging, args.loglevel.upper())
+    setup_logger(loglevel=loglevel)
+
+    log.info("ACT build bundle called with: " + " ".join(sys.argv))
+    n_files = build_model_bundle(args.output, args.models_dir)
+    log.info(f"Compiled {n_files} model files into: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,13 @@ import argparse
 
 from .common import *
 from .bom import BOM
+from .report import EXPORT_MODES, EXPORT_SYNC
+from .server import (
+    DEFAULT_BATCH_WINDOW,
+    DEFAULT_MAX_BATCH,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_PORT,
+)
 from .units import units
 
 
@@ -17,7 +24,7 @@ def get_parser():
     The parser includes arguments for output directory, materials, logic area,
     DRAM size, SSD size, HDD size, operating power, DRAM process, SSD process,
     HDD process, logic process, log level, number of ICs, number of capacitors,
-    PCB area, and export file.
+    PCB area, export file and mode, instance expansion of the exported report, and the query server settings.
     """
     parser = argparse.ArgumentParser(description="ACT carbon modeling tool.")
 
@@ -25,6 +32,7 @@ def get_parser():
     add_yield_args(parser)
     add_lifetime_args(parser)
     add_abatement_arg(parser)
+    add_serve_args(parser)
 
     parser.add_argument(
         "-o",
@@ -128,10 +136,72 @@ def get_parser():
     parser.add_argument(
         "--export-file", type=str, default=None, help="Output file for results from ACT"
     )
+    parser.add_argument(
+        "--export-mode",
+        type=str,
+        default=EXPORT_SYNC,
+        choices=EXPORT_MODES,
+        help="Write the report before returning (sync), on a background thread (async), or skip it (none).",
+    )
+    parser.add_argument(
+        "--expand-instances",
+        action="store_true",
+        help="Report each of the identical devices of a bill of materials device with a count separately in the export file.",
+    )
 
     return parser
 
 
+def add_serve_args(parser):
+    """
+    Adds query server arguments to the parser.
+
+    The added arguments include the serve switch, the TCP host and port, the Unix socket,
+    the batch size and window, and the concurrency limit.
+    """
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Keep the model loaded and answer JSON carbon queries over HTTP (POST /carbon) instead of evaluating once.",
+    )
+    parser.add_argument(
+        "--host",
+        type=str,
+        default="127.0.0.1",
+        help="Host the query server listens on.",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=None,
+        help=f"TCP port the query server listens on. Defaults to {DEFAULT_PORT} unless --socket is given.",
+    )
+    parser.add_argument(
+        "--socket",
+        type=str,
+        default=None,
+        help="Unix socket the query server listens on.",
+    )
+    parser.add_argument(
+        "--max-batch",
+        type=int,
+        default=DEFAULT_MAX_BATCH,
+        help="Maximum number of queries the query server evaluates together.",
+    )
+    parser.add_argument(
+        "--batch-window",
+        type=float,
+        default=DEFAULT_BATCH_WINDOW,
+        help="Time in seconds the query server waits for more queries before evaluating a batch.",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=DEFAULT_MAX_CONCURRENCY,
+        help="Maximum number of queries in flight in the query server.",
+    )
+
+
 def add_yield_args(parser):
     """
     Adds yield-related arguments to the parser.
@@ -231,13 +301,13 @@ def get_clean_args(args):
     """
     Returns a tuple of model arguments and query arguments based on the input arguments.
 
-    The model arguments include out_dir, and the query arguments include bom, op_ci,
-    op_power, duty_cycle, hw_lifetime, and export_file.
+    The model arguments include out_dir and export_mode, and the query arguments include bom, op_ci,
+    op_power, duty_cycle, hw_lifetime, export_file, and expand_instances.
     """
     op_ci = get_src_or_loc(args.op_ci)
     fab_ci = get_src_or_loc(args.op_ci)
 
-    model_args = dict(out_dir=args.out_dir)
+    model_args = dict(out_dir=args.out_dir, export_mode=args.export_mode)
 
     bom = BOM(
         silicon=dict(
@@ -276,6 +346,7 @@ def get_clean_args(args):
         duty_cycle=float(args.duty_cycle),
         hw_lifetime=units(args.lifetime),
         export_file=args.export_file,
+        expand_instances=args.expand_instances,
     )
 
     return model_args, query_args
@@ -0,0 +1,111 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+Helpers for evaluating the carbon models over arrays of design points
+- Numeric parameters are converted once to float arrays in a fixed unit
+- Categorical parameters (processes, carbon intensities, abatement levels) are resolved once per unique value
+- All outputs broadcast against each other following NumPy broadcasting rules
+"""
+
+import numpy as np
+import pint
+
+from .bom import SILICON
+from .logger import log
+from .units import units
+
+"""Operating parameters that can be evaluated over arrays."""
+OP_FIELDS = ("op_power", "op_ci", "duty_cycle", "hw_lifetime")
+
+"""Parameters that must have units."""
+QUANTITY_FIELDS = ("area", "capacity", "carbon", "op_power", "hw_lifetime")
+
+"""Parameters with categorical values (processes, carbon intensities and abatement levels)."""
+CATEGORICAL_FIELDS = ("process", "fab_ci", "gpa", "op_ci")
+
+
+def as_magnitude(value, unit=None) -> np.ndarray:
+    """
+    Convert a scalar or array valued quantity to a float array in the given unit.
+
+    Args:
+        value: A pint.Quantity (scalar or array valued), a sequence of quantities or quantity strings, or plain numbers for dimensionless parameters.
+        unit: The unit to express the magnitudes in. Defaults to None for dimensionless parameters.
+
+    Returns:
+        np.ndarray: The magnitudes of the value in the requested unit.
+    """
+
+    def _magnitude(v):
+        v = units(v) if isinstance(v, str) else v
+        return v.to(unit if unit is not None else "").magnitude
+
+    if isinstance(value, (pint.Quantity, str)):
+        return np.asarray(_magnitude(value), dtype=float)
+
+    values = np.asarray(value, dtype=object)
+    if values.size > 0 and isinstance(values.flat[0], (pint.Quantity, str)):
+        # sequence of individual quantities
+        return np.fromiter(
+            (_magnitude(v) for v in values.flat), dtype=float, count=values.size
+        ).reshape(values.shape)
+
+    if unit is not None:
+        log.error(f"Expected values with units of {unit}. Got unitless {value}.")
+        exit(-1)
+    return np.asarray(value, dtype=float)
+
+
+def map_keys(fn, *keys) -> np.ndarray:
+    """
+    Evaluate a scalar function once per unique combination of categorical keys and broadcast the results.
+
+    Args:
+        fn: Function mapping one value of each key to a float.
+        keys: Scalar or array valued categorical keys (ex., enum members or their values).
+
+    Returns:
+        np.ndarray: Float array with the broadcast shape of the keys.
+    """
+    arrays = np.broadcast_arrays(*[np.asarray(k, dtype=object) for k in keys])
+    shape = arrays[0].shape
+    memo = dict()
+
+    def _lookup(key):
+        if key not in memo:
+            memo[key] = fn(*key)
+        return memo[key]
+
+    flat = zip(*[a.ravel() for a in arrays])
+    values = np.fromiter((_lookup(k) for k in flat), dtype=float, count=arrays[0].size)
+    return values.reshape(shape)
+
+
+def split_params(values: dict, bom) -> tuple:
+    """
+    Split named parameter arrays into operating parameters and bill of materials parameters.
+
+    Names are either operating parameters (see OP_FIELDS), bill of materials fields (ex., silicon.cpu.area),
+    or bare silicon fields that apply to every silicon device in the bill of materials (ex., fab_ci).
+
+    Args:
+        values (dict): Parameter arrays by name.
+        bom (BOM): The bill of materials the parameters apply to.
+
+    Returns:
+        tuple: The operating parameters and the params argument of ACTModel.get_carbon_batch.
+    """
+    op_args = dict()
+    params = dict()
+    for name, value in values.items():
+        if name in OP_FIELDS:
+            op_args[name] = value
+        elif "." in name:
+            params[name] = value
+        else:
+            for device in bom.silicon:
+                params[f"{SILICON}.{device}.{name}"] = value
+    return op_args, params
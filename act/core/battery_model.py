@@ -7,8 +7,8 @@ from enum import Enum
 
 import pint
 
-from .carbon import Carbon, SourceType
-from .units import kg, kWh
+from .carbon import Carbon, CarbonArray, SourceType
+from .units import CARBON_UNIT, ENERGY_UNIT, kg, kWh
 
 
 # based on https://www.nature.com/articles/s41467-024-54634-y
@@ -40,8 +40,20 @@ class BatteryModel:
     A model for estimating carbon emissions from batteries.
 
     This class provides a method to calculate the estimated carbon emissions from a battery based on its capacity.
+
+    Attributes:
+        model (dict): A dictionary mapping CathodeType to carbon per capacity as floats.
     """
 
+    def __init__(self) -> None:
+        """
+        Initializes a new instance of the BatteryModel class.
+        """
+        self.model = {
+            k: v.m_as(CARBON_UNIT / ENERGY_UNIT)
+            for k, v in LI_BATTERY_CARBON_PER_KWH.items()
+        }
+
     def get_carbon(
         self, capacity: pint.Quantity, btype: CathodeType = CathodeType.NMC
     ) -> Carbon:
@@ -55,5 +67,21 @@ class BatteryModel:
         Returns:
             Carbon: The total carbon emissions from the battery fabrication.
         """
-        c = Carbon(capacity * LI_BATTERY_CARBON_PER_KWH[btype], SourceType.FABRICATION)
-        return c
+        c = capacity.m_as(ENERGY_UNIT) * self.model[btype]
+        return Carbon._from_amounts({SourceType.FABRICATION: c})
+
+    def get_carbon_batch(self, capacity, btype=CathodeType.NMC) -> CarbonArray:
+        """
+        Get the estimated carbon emissions from batteries over arrays of capacities.
+
+        Args:
+            capacity: The capacity of the battery with units of energy (scalar or array).
+            btype: The Li battery cathode type (or array of types). Defaults to CathodeType.NMC.
+
+        Returns:
+            CarbonArray: The carbon emissions from the battery fabrication for each design point.
+        """
+        from .batch import as_magnitude, map_keys
+
+        c = as_magnitude(capacity, ENERGY_UNIT) * map_keys(self.model.get, btype)
+        return CarbonArray._from_amounts({SourceType.FABRICATION: c})
@@ -3,10 +3,11 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
+import copy
 from dataclasses import dataclass
 
 from .capacitor_model import CapacitorType
-from .units import *
+from .units import parse_quantity
 import os
 from enum import Enum
 from typing import Union
@@ -28,13 +29,16 @@ from .common import (
     ModelType,
     SSDProcess,
 )
-from .logger import log
+from .materials_model import get_material_type_state, set_material_type_state
+from .utils import load_model_data, YAML_LOADER
 
 SILICON = "silicon"
 CATEGORY = "category"
 MATERIALS = "materials"
 PASSIVES = "passives"
 IMPORTS = "imports"
+COUNT = "count"
+FILE = "file"
 
 
 @dataclass
@@ -45,7 +49,7 @@ class BOM:
     materials: dict = None  # frame/enclosure device materials
     passives: dict = None  # passive component devices
     silicon: dict = None  # silicon devices
-    imports: dict = None  # any files to import (not recursive)
+    imports: dict = None  # any files to import (imports of imported files are followed)
     file: str = None  # original file for this BOM
     material_type: Enum = None  # the material types
 
@@ -57,59 +61,48 @@ class BOM:
         if self.silicon is None:
             self.silicon = dict()
 
-        # import data from additional files if specified first
+        # import the devices of additional files first
         if self.imports is not None:
-            for iname, filepath in self.imports.items():
-                path = os.path.dirname(self.file) + "/" + filepath
-                with open(path) as handle:
-                    file_data = yaml.load(handle, Loader=yaml.FullLoader)
-                if MATERIALS in file_data:
-                    for name, data in file_data[MATERIALS].items():
-                        self.materials[f"{iname}.{name}"] = data
-                if SILICON in file_data:
-                    for name, data in file_data[SILICON].items():
-                        self.silicon[f"{iname}.{name}"] = data
-                if PASSIVES in file_data:
-                    for name, data in file_data[PASSIVES].items():
-                        self.passives[f"{iname}.{name}"] = data
-                if IMPORTS in file_data:
-                    log.warn(
-                        f"File importing currently only works for a single level and is not recursive. Recursive import {file_data[IMPORTS]} in {path} will be ignored."
-                    )
+            stack = (os.path.abspath(self.file),) if self.file is not None else ()
+            imported = import_devices(
+                self.file, self.imports, self.material_type, stack
+            )
+            for section, devices in imported.items():
+                getattr(self, section).update(devices)
 
         # convert the dictionary to unit'ed structure and specifications
-        passives = dict()
-        if self.passives is not None:
-            for cname, cdata in self.passives.items():
-                cat = ComponentCategory(cdata[CATEGORY])
-                if cat is ComponentCategory.CAPACITOR:
-                    passives[cname] = CapacitorSpec(**cdata)
-                elif cat is ComponentCategory.RESISTOR:
-                    passives[cname] = ResistorSpec(**cdata)
-                elif cat is ComponentCategory.SIGNAL_BEAD:
-                    passives[cname] = BaseSpec(**cdata)
-                else:
-                    raise NotImplementedError(
-                        f"Materials specification category {cat} for materials list item {cname} not defined."
-                    )
-        self.passives = passives
+        # devices decoded by load_bom are already specifications
+        self.passives = {
+            cname: make_passive_spec(cname, cdata)
+            for cname, cdata in self.passives.items()
+        }
 
         # convert the frame materials
-        if self.materials is not None:
-            self.materials = {
-                mname: MaterialSpec(**mdata, material_type=self.material_type)
-                for mname, mdata in self.materials.items()
-            }
-        else:
-            self.materials = dict()
+        self.materials = {
+            mname: make_material_spec(mdata, self.material_type)
+            for mname, mdata in self.materials.items()
+        }
 
         # convert the silicon annotation data structure
-        silicon = dict()
-        if self.silicon is not None:
-            for dname, silicon_data in self.silicon.items():
-                annotation = SiliconAnnotation(**silicon_data)
-                silicon[dname] = annotation
-        self.silicon = silicon
+        self.silicon = {
+            dname: make_silicon_spec(silicon_data)
+            for dname, silicon_data in self.silicon.items()
+        }
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state.update(material_type=get_material_type_state(self.material_type))
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.material_type = set_material_type_state(state["material_type"])
+
+
+def _check_count(count) -> None:
+    """Check the number of identical devices of a specification"""
+    if not isinstance(count, int) or count < 0:
+        raise ValueError(f"Device count must be a non-negative integer. Got {count}")
 
 
 @dataclass
@@ -124,12 +117,14 @@ class SiliconAnnotation:
     fab_yield: float = DEFAULT_FAB_YIELD
     fab_ci: str = None
     gpa: AbatementLevel = None
+    count: int = 1  # number of identical devices, evaluated once and scaled
 
     def __post_init__(self):
-        self.area = units(self.area)
+        _check_count(self.count)
+        self.area = parse_quantity(self.area)
         self.model = ModelType(self.model)
-        self.capacity = units(self.capacity)
-        self.carbon = units(self.carbon) if self.carbon is not None else None
+        self.capacity = parse_quantity(self.capacity)
+        self.carbon = parse_quantity(self.carbon) if self.carbon is not None else None
         self.ctype = SourceType(self.ctype)
         self.gpa = (
             AbatementLevel(self.gpa) if self.gpa is not None else AbatementLevel.GPA97
@@ -177,12 +172,14 @@ class BaseSpec:  # common materials specifications
     capacity: pint.Quantity = "0 kWh"
     fab_ci: str = None
     layers: int = None
+    count: int = 1  # number of identical devices, evaluated once and scaled
 
     def __post_init__(self):
-        self.weight = units(self.weight)
+        _check_count(self.count)
+        self.weight = parse_quantity(self.weight)
         self.category = ComponentCategory(self.category)
-        self.area = units(self.area)
-        self.capacity = units(self.capacity)
+        self.area = parse_quantity(self.area)
+        self.capacity = parse_quantity(self.capacity)
         self.fab_ci = (
             get_src_or_loc(self.fab_ci)
             if self.fab_ci is not None
@@ -215,11 +212,232 @@ class MaterialSpec(BaseSpec):
             self.material_type(self.type) if self.type else self.material_type.NA
         )
 
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state.update(material_type=get_material_type_state(self.material_type))
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.material_type = set_material_type_state(state["material_type"])
+
+
+def spec_key(spec) -> tuple:
+    """
+    A hashable key of the current field values of a device specification.
+
+    Devices with equal keys have the same carbon per device, so the key is used to reuse the results of unchanged
+    devices when a bill of materials is edited and evaluated again. The count of identical devices is not
+    part of the key.
+
+    Args:
+        spec: The device specification (ex., SiliconAnnotation, CapacitorSpec or MaterialSpec).
+
+    Returns:
+        tuple: The specification type and its field values.
+    """
+    key = [type(spec)]
+    for field, value in spec.__dict__.items():
+        # identical devices share results, which are scaled by their count
+        if field == COUNT:
+            continue
+        # plain values hash much faster than units and enum members
+        if isinstance(value, pint.Quantity):
+            value = (value.magnitude, value._units)
+        elif isinstance(value, Enum):
+            value = value.value
+        key.append(value)
+    return tuple(key)
+
+
+def make_silicon_spec(data) -> SiliconAnnotation:
+    """Create the specification of a silicon device from its fields, unless it already is one"""
+    if isinstance(data, SiliconAnnotation):
+        return data
+    return SiliconAnnotation(**data)
+
+
+def make_passive_spec(name: str, data) -> BaseSpec:
+    """Create the specification of a passive device from its fields by category, unless it already is one"""
+    if isinstance(data, BaseSpec):
+        return data
+    cat = ComponentCategory(data[CATEGORY])
+    if cat is ComponentCategory.CAPACITOR:
+        return CapacitorSpec(**data)
+    elif cat is ComponentCategory.RESISTOR:
+        return ResistorSpec(**data)
+    elif cat is ComponentCategory.SIGNAL_BEAD:
+        return BaseSpec(**data)
+    raise NotImplementedError(
+        f"Materials specification category {cat} for materials list item {name} not defined."
+    )
+
+
+def make_material_spec(data, material_type: Enum) -> MaterialSpec:
+    """Create the specification of a frame material from its fields, unless it already is one"""
+    if isinstance(data, MaterialSpec):
+        return data
+    return MaterialSpec(**data, material_type=material_type)
+
+
+_STR_TAG = "tag:yaml.org,2002:str"
+_MERGE_TAG = "tag:yaml.org,2002:merge"
+
+
+def _decode_fields(loader, node):
+    """
+    Decode the mapping node of a device into the keyword arguments of its specification.
+
+    Plain string scalars, which make up most device fields, are taken from the node as is instead of going
+    through the generic constructor. Other nodes are constructed as usual.
+    """
+    if not isinstance(node, yaml.MappingNode) or any(
+        key_node.tag == _MERGE_TAG for key_node, _ in node.value
+    ):
+        return loader.construct_object(node, deep=True)
+    fields = dict()
+    for key_node, value_node in node.value:
+        key = (
+            key_node.value
+            if key_node.tag == _STR_TAG
+            else loader.construct_object(key_node, deep=True)
+        )
+        if isinstance(value_node, yaml.ScalarNode) and value_node.tag == _STR_TAG:
+            fields[key] = value_node.value
+        else:
+            fields[key] = loader.construct_object(value_node, deep=True)
+    return fields
+
+
+def decode_bom_data(stream, material_type: Enum):
+    """
+    Decode a bill of materials YAML document with its device sections decoded straight into specifications.
+
+    The device sections are decoded device by device from the YAML nodes, so the document is never built
+    as nested dictionaries that are walked again to create the specifications.
+
+    Args:
+        stream: The YAML document, as a string or an open file.
+        material_type (Enum): The material types of the frame materials.
+
+    Returns:
+        The document data, with the devices of a mapping document converted to specifications.
+    """
+    device_decoders = {
+        SILICON: lambda name, data: make_silicon_spec(data),
+        PASSIVES: make_passive_spec,
+        MATERIALS: lambda name, data: make_material_spec(data, material_type),
+    }
+
+    loader = YAML_LOADER(stream)
+    try:
+        node = loader.get_single_node()
+        if not isinstance(node, yaml.MappingNode):
+            return loader.construct_document(node) if node is not None else None
+
+        bom_data = dict()
+        for key_node, value_node in node.value:
+            key = loader.construct_object(key_node, deep=True)
+            if key in device_decoders and isinstance(value_node, yaml.MappingNode):
+                decode = device_decoders[key]
+                devices = dict()
+                for name_node, device_node in value_node.value:
+                    name = loader.construct_object(name_node, deep=True)
+                    devices[name] = decode(name, _decode_fields(loader, device_node))
+                bom_data[key] = devices
+            else:
+                bom_data[key] = loader.construct_object(value_node, deep=True)
+        return bom_data
+    finally:
+        loader.dispose()
+
+
+def decode_bom(stream, material_type: Enum, file: str = None) -> BOM:
+    """
+    Decode a bill of materials YAML document straight into device specifications (see decode_bom_data).
+
+    Args:
+        stream: The YAML document, as a string or an open file.
+        material_type (Enum): The material types of the frame materials.
+        file (str, optional): The file of the document, used to resolve imports. Defaults to None.
+
+    Returns:
+        BOM: The bill of materials.
+    """
+    bom_data = decode_bom_data(stream, material_type)
+    return BOM(**bom_data, file=file, material_type=material_type)
+
+
+def _load_import(path: str, material_type: Enum) -> dict:
+    with open(path) as handle:
+        bom_data = decode_bom_data(handle, material_type)
+    if not isinstance(bom_data, dict):
+        raise ValueError(f"Imported bill of materials {path} must be a mapping.")
+    return bom_data
+
+
+def import_devices(file: str, imports: dict, material_type: Enum, stack=()) -> dict:
+    """
+    Collect the devices of the files imported by a bill of materials, following nested imports.
+
+    Each imported file is parsed and converted once per process (and again if it is modified), however many
+    bills of materials import it. Every importer gets its own copies of the device specifications.
+
+    Args:
+        file (str): The bill of materials file, import paths are relative to its directory.
+        imports (dict): The imported files by import name. An import is either a file path or a mapping with
+            the file path (file) and the number of copies of its devices (count).
+        material_type (Enum): The material types of the frame materials.
+        stack (tuple, optional): The absolute paths of the files importing this file, to detect cycles.
+            Defaults to ().
+
+    Returns:
+        dict: The device specifications of each section, named <import name>.<device name>. Devices of nested
+            imports are named <import name>.<nested import name>.<device name>. The count of each device is
+            multiplied by the counts of the imports it is included through.
+
+    Raises:
+        ValueError: If the imports form a cycle or a count is not a non-negative integer.
+    """
+    devices = {MATERIALS: dict(), SILICON: dict(), PASSIVES: dict()}
+    for iname, entry in imports.items():
+        # an import is either a file path or a mapping with the file and the number of copies
+        filepath, count = (
+            (entry[FILE], entry.get(COUNT, 1))
+            if isinstance(entry, dict)
+            else (entry, 1)
+        )
+        _check_count(count)
+        path = os.path.abspath(os.path.join(os.path.dirname(file), filepath))
+        if path in stack:
+            cycle = " -> ".join(stack[stack.index(path) :] + (path,))
+            raise ValueError(f"Bill of materials imports form a cycle: {cycle}")
+        bom_data = load_model_data(
+            path, (IMPORTS, material_type), lambda p: _load_import(p, material_type)
+        )
+
+        imported = {
+            section: {
+                name: copy.deepcopy(spec)
+                for name, spec in (bom_data.get(section) or dict()).items()
+            }
+            for section in devices
+        }
+        if bom_data.get(IMPORTS):
+            nested = import_devices(
+                path, bom_data[IMPORTS], material_type, stack + (path,)
+            )
+            for section, section_devices in nested.items():
+                imported[section].update(section_devices)
+        for section, section_devices in imported.items():
+            for name, spec in section_devices.items():
+                spec.count *= count
+                devices[section][f"{iname}.{name}"] = spec
+    return devices
+
 
 def load_bom(materials_file: str, material_type: Enum):
     """Load the materials file and return a BOM data structure"""
 
     with open(materials_file) as handle:
-        materials_data = yaml.load(handle, Loader=yaml.FullLoader)
-    materials = BOM(**materials_data, file=materials_file, material_type=material_type)
-    return materials
+        return decode_bom(handle, material_type, file=materials_file)
@@ -0,0 +1,139 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+Precompiled model data bundle for fast startup
+- The bundle holds the parsed YAML and the unit converted tables of every model file under act/models
+- Each file is stored with a digest of its contents and only loaded from the bundle if the file is unchanged,
+  otherwise the file is parsed again as usual
+- The bundle is a pickle file and is only loaded from the ACT model directory, or a path you trust
+"""
+
+import glob
+import hashlib
+import os
+import pickle
+import tempfile
+
+from .common import ACT_ROOT
+from .logger import log
+from .materials_model import get_material_type_state, set_material_type_state
+from .utils import load_model_yaml, register_model_data, registered_model_data
+
+DEFAULT_MODELS_DIR = f"{ACT_ROOT}/models"
+DEFAULT_MODEL_BUNDLE = f"{DEFAULT_MODELS_DIR}/models.bundle"
+
+"""Format version of the bundle, bumped when the stored data changes."""
+BUNDLE_VERSION = 1
+
+"""Bundles already loaded in this process."""
+_LOADED_BUNDLES = set()
+
+
+def file_digest(path: str) -> str:
+    """Digest of the contents of a file"""
+    with open(path, "rb") as handle:
+        return hashlib.sha1(handle.read()).hexdigest()
+
+
+class _BundlePickler(pickle.Pickler):
+    """Pickler that stores dynamically generated MaterialType enums (table key types) by their members"""
+
+    def reducer_override(self, obj):
+        if isinstance(obj, type):
+            state = get_material_type_state(obj)
+            if state is not obj:
+                return set_material_type_state, (state,)
+        return NotImplemented
+
+
+def build_model_bundle(
+    bundle_file: str = DEFAULT_MODEL_BUNDLE, models_dir: str = DEFAULT_MODELS_DIR
+) -> int:
+    """
+    Compile every model file under models_dir into a bundle.
+
+    Args:
+        bundle_file (str, optional): The bundle file to write. Defaults to DEFAULT_MODEL_BUNDLE.
+        models_dir (str, optional): The directory of the model files. Defaults to DEFAULT_MODELS_DIR.
+
+    Returns:
+        int: The number of model files in the bundle.
+    """
+    from ..act_model import ACTModel
+
+    # build the tables of every default submodel and load the YAML data of every model file
+    ACTModel(model_bundle=None).load_models()
+    models_dir = os.path.abspath(models_dir)
+    paths = glob.glob(f"{models_dir}/**/*.yaml", recursive=True)
+    for path in paths:
+        load_model_yaml(path)
+    registered = registered_model_data()
+
+    files = dict()
+    for path in paths:
+        rel_path = os.path.relpath(path, models_dir)
+        digest = file_digest(path)
+        data = registered[path]
+
+        # the tables of a default model file also hold for an identical copy under models_dir
+        default_path = os.path.join(os.path.abspath(DEFAULT_MODELS_DIR), rel_path)
+        if default_path != path and default_path in registered:
+            if file_digest(default_path) == digest:
+                data = dict(registered[default_path], **data)
+        files[rel_path] = (digest, data)
+
+    # write atomically so concurrent processes never read a partial bundle
+    handle, tmp_file = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(bundle_file))
+    )
+    with os.fdopen(handle, "wb") as handle:
+        _BundlePickler(handle).dump(dict(version=BUNDLE_VERSION, files=files))
+    os.chmod(tmp_file, 0o644)
+    os.replace(tmp_file, bundle_file)
+    return len(files)
+
+
+def load_model_bundle(
+    bundle_file: str = DEFAULT_MODEL_BUNDLE, models_dir: str = DEFAULT_MODELS_DIR
+) -> int:
+    """
+    Register the model data of the unchanged model files in a bundle, once per process.
+
+    Args:
+        bundle_file (str, optional): The bundle file to load. Defaults to DEFAULT_MODEL_BUNDLE.
+        models_dir (str, optional): The directory of the model files. Defaults to DEFAULT_MODELS_DIR.
+
+    Returns:
+        int: The number of model files loaded from the bundle.
+    """
+    bundle_file = os.path.abspath(bundle_file)
+    if bundle_file in _LOADED_BUNDLES or not os.path.exists(bundle_file):
+        return 0
+    _LOADED_BUNDLES.add(bundle_file)
+
+    try:
+        with open(bundle_file, "rb") as handle:
+            bundle = pickle.load(handle)
+    except Exception as e:
+        log.warning(f"Unable to load model bundle {bundle_file}: {e}")
+        return 0
+    if bundle.get("version") != BUNDLE_VERSION:
+        log.warning(
+            f"Model bundle {bundle_file} is out of date. Rebuild it with python -m act.build_bundle."
+        )
+        return 0
+
+    n_loaded = 0
+    for rel_path, (digest, data) in bundle["files"].items():
+        path = os.path.join(models_dir, rel_path)
+        if os.path.exists(path) and file_digest(path) == digest:
+            register_model_data(path, data)
+            n_loaded += 1
+    if n_loaded < len(bundle["files"]):
+        log.debug(
+            f"{len(bundle['files']) - n_loaded} model files changed since {bundle_file} was built."
+        )
+    return n_loaded
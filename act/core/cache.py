@@ -0,0 +1,106 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+Bounded memoization for repeated model evaluations
+- Entries are evicted least recently used first once the cache holds maxsize entries
+- Hits and misses are counted so the cache effectiveness can be inspected with info()
+- Cached entries are not pickled: a model shipped to a worker process starts with an empty cache
+"""
+
+import collections
+
+"""Cache statistics, mirroring functools.lru_cache."""
+CacheInfo = collections.namedtuple(
+    "CacheInfo", ["hits", "misses", "maxsize", "currsize"]
+)
+
+"""Sentinel for entries that are not cached."""
+_MISSING = object()
+
+"""Default number of entries of a cache."""
+DEFAULT_CACHE_SIZE = 4096
+
+
+class LRUCache:
+    """
+    A bounded least recently used cache with hit and miss counters.
+
+    Attributes:
+        maxsize (int): The maximum number of entries. None for an unbounded cache and 0 to disable caching.
+        hits (int): The number of lookups found in the cache.
+        misses (int): The number of lookups not found in the cache.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        """
+        Look up an entry and mark it as most recently used.
+
+        Args:
+            key: The hashable key of the entry.
+            default (optional): The value returned when the key is not cached. Defaults to None.
+
+        Returns:
+            The cached value or the default.
+        """
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def lookup(self, key, compute):
+        """
+        Look up an entry, computing and adding it if it is not cached.
+
+        Args:
+            key: The hashable key of the entry.
+            compute: Function without arguments that computes the value on a miss.
+
+        Returns:
+            The cached or computed value.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def put(self, key, value) -> None:
+        """Add an entry, evicting the least recently used entry if the cache is full"""
+        if self.maxsize == 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if self.maxsize is not None and len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove every entry and reset the counters"""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self) -> CacheInfo:
+        """The cache statistics"""
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+    def __getstate__(self) -> dict:
+        return dict(maxsize=self.maxsize)
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["maxsize"])
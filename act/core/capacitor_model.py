@@ -5,12 +5,14 @@
 
 from enum import Enum
 
-import yaml
-from .units import *
+import numpy as np
+import pint
 
-from .carbon import Carbon, SourceType
-from .common import ACT_ROOT, EnergyLocation
-from .utils import load_ci_model
+from .units import CARBON_UNIT, ENERGY_UNIT, g
+
+from .carbon import Carbon, CarbonArray, SourceType
+from .common import ACT_ROOT, EnergyLocation, get_src_or_loc
+from .utils import load_ci_model, load_model_table
 
 
 class CapacitorType(Enum):
@@ -37,14 +39,17 @@ DEFAULT_CARBON_PER_CAPACITOR = 300 * g
 """Default configuration file for capacitor models."""
 DEFAULT_CP_CONFIG = f"{ACT_ROOT}/models/passives/capacitors.yaml"
 
+"""Canonical unit of the capacitor manufacturing energy per weight model."""
+EPW_UNIT = ENERGY_UNIT / CARBON_UNIT
+
 
 class CapacitorModel:
     """
     A model for estimating carbon emissions from capacitors.
 
     Attributes:
-        capacitor_model (dict): A dictionary mapping CapacitorType to units of carbon per weight.
-        ci_model (dict): A dictionary mapping EnergyLocation to carbon intensity values.
+        capacitor_model (dict): A dictionary mapping CapacitorType to manufacturing energy per weight as floats in EPW_UNIT.
+        ci_model (dict): A dictionary mapping EnergyLocation to carbon intensity values as floats.
     """
 
     def __init__(self, model_file=DEFAULT_CP_CONFIG) -> None:
@@ -55,11 +60,9 @@ class CapacitorModel:
         Args:
             model_file (str, optional): Capacitor model file to load. Defaults to DEFAULT_CP_CONFIG.
         """
-        with open(model_file) as f:
-            self.capacitor_model: dict[CapacitorType, pint.Quantity] = {
-                CapacitorType(c): units(v)
-                for c, v in yaml.load(f, Loader=yaml.FullLoader).items()
-            }
+        self.capacitor_model: dict[CapacitorType, float] = load_model_table(
+            model_file, CapacitorType, EPW_UNIT
+        )
         self.ci_model = load_ci_model()
 
     def get_carbon(
@@ -82,10 +85,50 @@ class CapacitorModel:
             Carbon: A carbon object that encodes the emissions cost of manufacturing.
         """
         if ctype in self.capacitor_model:
-            c = Carbon(
-                self.capacitor_model[ctype] * weight * n_caps * self.ci_model[ci],
-                SourceType.PASSIVES,
+            c = (
+                self.capacitor_model[ctype]
+                * weight.m_as(CARBON_UNIT)
+                * n_caps
+                * self.ci_model[ci]
             )
-            return c
         else:
-            return Carbon(DEFAULT_CARBON_PER_CAPACITOR * n_caps, SourceType.PASSIVES)
+            c = DEFAULT_CARBON_PER_CAPACITOR.m_as(CARBON_UNIT) * n_caps
+        return Carbon._from_amounts({SourceType.PASSIVES: c})
+
+    def get_carbon_batch(
+        self,
+        ci=EnergyLocation.JAPAN,
+        ctype=CapacitorType.GENERIC,
+        weight=DEFAULT_CAPACITOR_WEIGHT,
+        n_caps=1,
+    ) -> CarbonArray:
+        """
+        Get the carbon emissions cost of capacitors over arrays of design points.
+
+        Every argument may either be a scalar or an array and all arguments are broadcast against each other.
+
+        Args:
+            ci (optional): Carbon intensity per manufacturing energy. Defaults to EnergyLocation.JAPAN.
+            ctype (optional): The capacitor type. Defaults to CapacitorType.GENERIC.
+            weight (optional): Weight of the capacitor. Defaults to DEFAULT_CAPACITOR_WEIGHT.
+            n_caps (optional): Number of capacitors. Defaults to 1.
+
+        Returns:
+            CarbonArray: The emissions cost of manufacturing for each design point.
+        """
+        from .batch import as_magnitude, map_keys
+
+        def _cpw(ci, ctype):
+            ctype = CapacitorType(ctype)
+            if ctype not in self.capacitor_model:
+                return np.nan
+            return self.capacitor_model[ctype] * self.ci_model[get_src_or_loc(ci)]
+
+        cpw = map_keys(_cpw, ci, ctype)
+        n_caps = as_magnitude(n_caps)
+        c = np.where(
+            np.isnan(cpw),
+            DEFAULT_CARBON_PER_CAPACITOR.m_as(CARBON_UNIT) * n_caps,
+            cpw * as_magnitude(weight, CARBON_UNIT) * n_caps,
+        )
+        return CarbonArray._from_amounts({SourceType.PASSIVES: c})
@@ -5,9 +5,10 @@
 
 from enum import auto, Enum
 
+import numpy as np
 import pint
 
-from .units import g
+from .units import CARBON_UNIT
 
 
 # Track the type of each emissions component
@@ -27,14 +28,28 @@ class SourceType(Enum):
     OTHER = auto()  # Miscellaneous source type
 
 
+"""Number of emissions source types tracked by each carbon result."""
+N_SOURCE_TYPES = len(SourceType)
+
+"""Position of each SourceType in the carbon result arrays."""
+SOURCE_INDEX = {src: i for i, src in enumerate(SourceType)}
+
+
 class Carbon:
     """
     A wrapper class around carbon results.
 
+    Carbon amounts are stored in a fixed length float array indexed by SourceType (see SOURCE_INDEX) in
+    CARBON_UNIT, and only converted to quantities when they are read. A bit mask tracks which source types
+    have been recorded. In-place addition (+=) accumulates into the existing array without allocating.
+
     Attributes:
-        carbon_by_type (dict): A dictionary mapping SourceType to amounts of carbon.
+        values (np.ndarray): Carbon amount per SourceType as floats in CARBON_UNIT.
+        mask (int): Bit mask of the SourceTypes present in this result.
     """
 
+    __slots__ = ("values", "mask")
+
     def __init__(
         self,
         amount: pint.Quantity = None,
@@ -45,38 +60,48 @@ class Carbon:
         Initializes a new instance of the Carbon class.
 
         Args:
-            amount (pint.Quantity, optional): Amount of carbon with units of weight. Defaults to None.
+            amount (pint.Quantity, optional): Amount of carbon with units of weight, or a float in CARBON_UNIT. Defaults to None.
             ctype (SourceType, optional): The emissions source type. If None is specified, will default to SourceType.OTHER
             result_dict (dict[SourceType, pint.Quantity], optional): A dictionary mapping SourceType to amounts of carbon. Used to initialize the object instead of the amount and ctype if provided.
         """
         # Initialize from dict if specified
-        if result_dict is not None:
-            self.carbon_by_type = result_dict
-        else:
-            assert amount.check(
-                g
-            ), f"Carbon amount must be in units of weight. Got {amount}"
-            if ctype is not None and ctype not in SourceType:
-                _ctype = SourceType.OTHER
-            else:
-                _ctype = ctype
-            self.carbon_by_type = {_ctype: amount}
+        if result_dict is None:
+            if ctype is None or ctype not in SourceType:
+                ctype = SourceType.OTHER
+            result_dict = {ctype: amount}
+        self.values = np.zeros(N_SOURCE_TYPES)
+        self.mask = 0
+        for k, v in result_dict.items():
+            self.values[SOURCE_INDEX[k]] = _to_float(v)
+            self.mask |= 1 << SOURCE_INDEX[k]
 
-    def _get_other_keys(self, other: "Carbon") -> list[SourceType]:
-        """
-        Get the keys from another Carbon instance.
+    @classmethod
+    def _from_amounts(cls, amounts: dict[SourceType, float]) -> "Carbon":
+        """Create a Carbon instance directly from floats in CARBON_UNIT without any unit checks"""
+        carbon = cls.__new__(cls)
+        carbon.values = np.zeros(N_SOURCE_TYPES)
+        carbon.mask = 0
+        for k, v in amounts.items():
+            carbon.values[SOURCE_INDEX[k]] = v
+            carbon.mask |= 1 << SOURCE_INDEX[k]
+        return carbon
 
-        Args:
-            other (Carbon): The other Carbon instance.
+    @classmethod
+    def _from_values(cls, values: np.ndarray, mask: int) -> "Carbon":
+        """Create a Carbon instance that takes ownership of a SourceType indexed array"""
+        carbon = cls.__new__(cls)
+        carbon.values = values
+        carbon.mask = mask
+        return carbon
 
-        Returns:
-            list[SourceType]: The keys from the other Carbon instance.
-        """
-        if other == 0:  # Handle zero that comes in through sums
-            other_keys = []
-        else:
-            other_keys = list(other.carbon_by_type.keys())
-        return other_keys
+    def copy(self) -> "Carbon":
+        """A copy of this Carbon instance that does not share its array"""
+        return Carbon._from_values(self.values.copy(), self.mask)
+
+    @property
+    def carbon_by_type(self) -> dict[SourceType, pint.Quantity]:
+        """A dictionary mapping SourceType to amounts of carbon."""
+        return {k: self.values[SOURCE_INDEX[k]] * CARBON_UNIT for k in self.types()}
 
     def __add__(self, other: "Carbon") -> "Carbon":
         """
@@ -88,14 +113,11 @@ class Carbon:
         Returns:
             Carbon: A new Carbon instance representing the sum of this one and the other.
         """
-        # Add another carbon result
-        new_result = {}
-        keys = self._get_other_keys(other) + list(self.carbon_by_type.keys())
-        for k in keys:
-            x = self.carbon_by_type.get(k, 0 * g)
-            y = other.carbon_by_type.get(k, 0 * g) if other != 0 else 0
-            new_result[k] = x + y
-        return Carbon(result_dict=new_result)
+        if other == 0:  # Handle zero that comes in through sums
+            return Carbon._from_values(self.values.copy(), self.mask)
+        if isinstance(other, CarbonArray):
+            return other + self
+        return Carbon._from_values(self.values + other.values, self.mask | other.mask)
 
     def __sub__(self, other: "Carbon") -> "Carbon":
         """
@@ -107,14 +129,43 @@ class Carbon:
         Returns:
             Carbon: A new Carbon instance representing the difference between this one and the other.
         """
-        # Subtract another carbon result
-        new_result = {}
-        keys = self._get_other_keys(other) + list(self.carbon_by_type.keys())
-        for k in keys:
-            x = self.carbon_by_type.get(k, 0 * g)
-            y = other.carbon_by_type.get(k, 0 * g) if other != 0 else 0
-            new_result[k] = x - y
-        return Carbon(result_dict=new_result)
+        if other == 0:
+            return Carbon._from_values(self.values.copy(), self.mask)
+        return Carbon._from_values(self.values - other.values, self.mask | other.mask)
+
+    def __iadd__(self, other: "Carbon") -> "Carbon":
+        """
+        Accumulate another Carbon instance into this one in place.
+
+        Args:
+            other (Carbon): The other Carbon instance.
+
+        Returns:
+            Carbon: This Carbon instance.
+        """
+        if other == 0:
+            return self
+        if isinstance(other, CarbonArray):
+            return other + self
+        np.add(self.values, other.values, out=self.values)
+        self.mask |= other.mask
+        return self
+
+    def __isub__(self, other: "Carbon") -> "Carbon":
+        """
+        Subtract another Carbon instance from this one in place.
+
+        Args:
+            other (Carbon): The other Carbon instance.
+
+        Returns:
+            Carbon: This Carbon instance.
+        """
+        if other == 0:
+            return self
+        np.subtract(self.values, other.values, out=self.values)
+        self.mask |= other.mask
+        return self
 
     def __radd__(self, other: int) -> "Carbon":
         """
@@ -131,6 +182,24 @@ class Carbon:
         else:
             return self.__add__(other)
 
+    def __mul__(self, scale) -> "Carbon | CarbonArray":
+        """
+        Scale every carbon amount, ex. by the number of identical devices.
+
+        Args:
+            scale: A number, or an array of numbers for each design point.
+
+        Returns:
+            Carbon | CarbonArray: A new Carbon instance, or a CarbonArray if the scale is an array.
+        """
+        if np.ndim(scale) > 0:
+            return CarbonArray(
+                self.values * np.asarray(scale, dtype=float)[..., np.newaxis], self.mask
+            )
+        return Carbon._from_values(self.values * scale, self.mask)
+
+    __rmul__ = __mul__
+
     def partial(self, ctype: SourceType) -> pint.Quantity:
         """
         Get the partial amount of carbon for a given SourceType.
@@ -141,7 +210,7 @@ class Carbon:
         Returns:
             pint.Quantity: The partial amount of carbon.
         """
-        return self.carbon_by_type.get(ctype, 0 * g)
+        return float(self.values[SOURCE_INDEX[ctype]]) * CARBON_UNIT
 
     def total(self) -> pint.Quantity:
         """
@@ -151,7 +220,7 @@ class Carbon:
             pint.Quantity: The total amount of carbon.
         """
         # Return summed total over all carbon contribution components
-        return sum([v for _, v in self.carbon_by_type.items()])
+        return float(self.values.sum()) * CARBON_UNIT
 
     def types(self) -> list[SourceType]:
         """
@@ -160,4 +229,181 @@ class Carbon:
         Returns:
             list[SourceType]: The SourceTypes.
         """
-        return list(self.carbon_by_type.keys())
+        return [src for src, i in SOURCE_INDEX.items() if self.mask >> i & 1]
+
+
+class CarbonArray:
+    """
+    Carbon results over an array of design points.
+
+    The batch companion of Carbon: amounts are stored in a float array of shape (*shape, N_SOURCE_TYPES)
+    in CARBON_UNIT where the last axis is indexed by SourceType. Carbon and CarbonArray instances
+    can be added together following NumPy broadcasting rules.
+
+    Attributes:
+        values (np.ndarray): Carbon amount per design point and SourceType as floats in CARBON_UNIT.
+        mask (int): Bit mask of the SourceTypes present in this result.
+    """
+
+    __slots__ = ("values", "mask")
+
+    def __init__(self, values: np.ndarray, mask: int = None) -> None:
+        """
+        Initializes a new instance of the CarbonArray class.
+
+        Args:
+            values (np.ndarray): Array of shape (*shape, N_SOURCE_TYPES) with carbon amounts as floats in CARBON_UNIT.
+            mask (int, optional): Bit mask of the SourceTypes present. Defaults to all SourceTypes.
+        """
+        assert (
+            values.shape[-1] == N_SOURCE_TYPES
+        ), f"Carbon arrays must have a trailing axis of length {N_SOURCE_TYPES}. Got shape {values.shape}"
+        self.values = values
+        self.mask = (1 << N_SOURCE_TYPES) - 1 if mask is None else mask
+
+    @classmethod
+    def zeros(cls, shape) -> "CarbonArray":
+        """
+        Create an empty CarbonArray to accumulate results into.
+
+        Args:
+            shape: The shape of the array of design points.
+
+        Returns:
+            CarbonArray: A CarbonArray with zero carbon and no SourceTypes present.
+        """
+        shape = (shape,) if isinstance(shape, int) else tuple(shape)
+        return cls(np.zeros((*shape, N_SOURCE_TYPES)), 0)
+
+    @classmethod
+    def _from_amounts(cls, amounts: dict) -> "CarbonArray":
+        """Create a CarbonArray from a dictionary mapping SourceType to broadcastable float arrays in CARBON_UNIT"""
+        shape = np.broadcast_shapes(*[np.shape(v) for v in amounts.values()])
+        carbon = cls.zeros(shape)
+        for k, v in amounts.items():
+            carbon.values[..., SOURCE_INDEX[k]] = v
+            carbon.mask |= 1 << SOURCE_INDEX[k]
+        return carbon
+
+    @property
+    def shape(self) -> tuple:
+        """The shape of the array of design points."""
+        return self.values.shape[:-1]
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __getitem__(self, index) -> "Carbon | CarbonArray":
+        """
+        Index into the array of design points.
+
+        Returns:
+            Carbon: The result for a single design point, or a CarbonArray for a slice of design points.
+        """
+        if not isinstance(index, tuple):
+            index = (index,)
+        values = self.values[(*index, slice(None))]
+        if values.ndim == 1:
+            return Carbon._from_values(values.copy(), self.mask)
+        return CarbonArray(values, self.mask)
+
+    def __add__(self, other) -> "CarbonArray":
+        """
+        Add a Carbon or CarbonArray instance to this one.
+
+        Args:
+            other (Carbon | CarbonArray): The other carbon result.
+
+        Returns:
+            CarbonArray: A new CarbonArray representing the broadcast sum.
+        """
+        if other == 0:
+            return CarbonArray(self.values.copy(), self.mask)
+        return CarbonArray(self.values + other.values, self.mask | other.mask)
+
+    __radd__ = __add__
+
+    def __sub__(self, other) -> "CarbonArray":
+        """
+        Subtract a Carbon or CarbonArray instance from this one.
+
+        Args:
+            other (Carbon | CarbonArray): The other carbon result.
+
+        Returns:
+            CarbonArray: A new CarbonArray representing the broadcast difference.
+        """
+        if other == 0:
+            return CarbonArray(self.values.copy(), self.mask)
+        return CarbonArray(self.values - other.values, self.mask | other.mask)
+
+    def __mul__(self, scale) -> "CarbonArray":
+        """
+        Scale every carbon amount, ex. by the number of identical devices.
+
+        Args:
+            scale: A number, or an array of numbers that broadcasts against the design points.
+
+        Returns:
+            CarbonArray: A new CarbonArray with the broadcast shape.
+        """
+        scale = np.asarray(scale, dtype=float)[..., np.newaxis]
+        return CarbonArray(self.values * scale, self.mask)
+
+    __rmul__ = __mul__
+
+    def __iadd__(self, other) -> "CarbonArray":
+        """
+        Accumulate a Carbon or CarbonArray instance into this one in place.
+
+        Args:
+            other (Carbon | CarbonArray): The other carbon result, which must broadcast to the shape of this one.
+
+        Returns:
+            CarbonArray: This CarbonArray instance.
+        """
+        if other == 0:
+            return self
+        np.add(self.values, other.values, out=self.values)
+        self.mask |= other.mask
+        return self
+
+    def partial(self, ctype: SourceType) -> pint.Quantity:
+        """
+        Get the partial amount of carbon for a given SourceType at every design point.
+
+        Args:
+            ctype (SourceType): The SourceType.
+
+        Returns:
+            pint.Quantity: Array valued partial amounts of carbon.
+        """
+        return self.values[..., SOURCE_INDEX[ctype]] * CARBON_UNIT
+
+    def total(self) -> pint.Quantity:
+        """
+        Get the total amount of carbon at every design point.
+
+        Returns:
+            pint.Quantity: Array valued total amounts of carbon.
+        """
+        return self.values.sum(axis=-1) * CARBON_UNIT
+
+    def types(self) -> list[SourceType]:
+        """
+        Get the SourceTypes present in this CarbonArray instance.
+
+        Returns:
+            list[SourceType]: The SourceTypes.
+        """
+        return [src for src, i in SOURCE_INDEX.items() if self.mask >> i & 1]
+
+
+def _to_float(amount) -> float:
+    """Convert a carbon amount with units of weight to a float in CARBON_UNIT"""
+    if isinstance(amount, pint.Quantity):
+        assert amount.check(
+            CARBON_UNIT
+        ), f"Carbon amount must be in units of weight. Got {amount}"
+        return amount.m_as(CARBON_UNIT)
+    return float(amount)
@@ -6,7 +6,8 @@
 import os
 from enum import Enum
 
-from .units import *
+from . import units as _units
+from .units import CARBON_UNIT, g
 
 """
 Root directory of the project.
@@ -14,6 +15,10 @@ Root directory of the project.
 ACT_ROOT = os.path.dirname(__file__) + "/.."
 
 
+"""Energy sources and locations already looked up, shared across bills of materials."""
+_SRC_OR_LOC = dict()
+
+
 def get_src_or_loc(arg):
     """
     Attempts to create an EnergySource or EnergyLocation instance from the given argument.
@@ -24,10 +29,16 @@ def get_src_or_loc(arg):
     Returns:
         An instance of EnergySource or EnergyLocation.
     """
+    try:
+        return _SRC_OR_LOC[arg]
+    except (KeyError, TypeError):
+        pass
     try:
         ci = EnergySource(arg)
     except ValueError:
         ci = EnergyLocation(arg)
+    # only valid arguments are added so the lookup table is bounded by the enum members
+    _SRC_OR_LOC[arg] = ci
     return ci
 
 
@@ -215,3 +226,20 @@ class ModelType(Enum):
 Carbon per IC package in grams.
 """
 CARBON_PER_IC_PACKAGE = 150 * g
+
+"""
+Carbon per IC package as a float in the canonical carbon unit.
+"""
+PACKAGE_CARBON = CARBON_PER_IC_PACKAGE.m_as(CARBON_UNIT)
+
+
+def __getattr__(name: str):
+    """Forward the unit variables of units, which are created on first use"""
+    if name in _units.__all__:
+        return getattr(_units, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# star imports of this module also export every unit variable
+__all__ = [name for name in globals() if not name.startswith("_")]
+__all__ += [name for name in _units.__all__ if name not in __all__]
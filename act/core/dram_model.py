@@ -3,11 +3,10 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
-import yaml
-
+from .cache import DEFAULT_CACHE_SIZE
 from .common import ACT_ROOT, DRAMProcess
-from .storage_model import StorageModel
-from .units import units
+from .storage_model import CPG_UNIT, StorageModel
+from .utils import load_model_table
 
 DEFAULT_DRAM_CONFIG = f"{ACT_ROOT}/models/dram/dram_hynix.yaml"
 
@@ -19,12 +18,12 @@ class DRAMModel(StorageModel):
         None
     """
 
-    def __init__(self, model_file=DEFAULT_DRAM_CONFIG) -> None:
+    def __init__(
+        self, model_file=DEFAULT_DRAM_CONFIG, cache_size=DEFAULT_CACHE_SIZE
+    ) -> None:
         """
         Initializes a new instance of the DRAMModel class.
         """
         # Load the DRAM model
-        with open(model_file) as f:
-            dram_model: dict = yaml.load(f, Loader=yaml.FullLoader)
-            dram_model = {DRAMProcess(k): units(v) for k, v in dram_model.items()}
-        super().__init__(fab_model=dram_model)
+        dram_model = load_model_table(model_file, DRAMProcess, CPG_UNIT)
+        super().__init__(fab_model=dram_model, cache_size=cache_size)
@@ -4,11 +4,10 @@
 # LICENSE file in the root directory of this source tree.
 
 
-import yaml
-from .units import *
-
+from .cache import DEFAULT_CACHE_SIZE
 from .common import ACT_ROOT, HDDProcess
-from .storage_model import StorageModel
+from .storage_model import CPG_UNIT, StorageModel
+from .utils import load_model_table
 
 DEFAULT_HDD_CONFIG = [
     f"{ACT_ROOT}/models/hdd/hdd_consumer.yaml",
@@ -24,7 +23,9 @@ class HDDModel(StorageModel):
         None
     """
 
-    def __init__(self, model_files=DEFAULT_HDD_CONFIG) -> None:
+    def __init__(
+        self, model_files=DEFAULT_HDD_CONFIG, cache_size=DEFAULT_CACHE_SIZE
+    ) -> None:
         """
         Initializes a new instance of the HDDModel class.
 
@@ -32,14 +33,12 @@ class HDDModel(StorageModel):
 
         Args:
             model_files (list): A list of file paths to the HDD carbon cost models.
+            cache_size (int, optional): Number of memoized carbon per storage values. Defaults to DEFAULT_CACHE_SIZE.
         """
 
         # Load the HDD carbon cost models
         hdd_model = dict()
         for mfile in model_files:
-            with open(mfile) as f:
-                model_data = yaml.load(f, Loader=yaml.FullLoader)
-                hdd_model.update(model_data)
+            hdd_model.update(load_model_table(mfile, HDDProcess, CPG_UNIT))
 
-        hdd_model = {HDDProcess(k): units(v) for k, v in hdd_model.items()}
-        super().__init__(fab_model=hdd_model)
+        super().__init__(fab_model=hdd_model, cache_size=cache_size)
@@ -4,27 +4,32 @@
 # LICENSE file in the root directory of this source tree.
 
 import pint
-import yaml
 
-from .carbon import Carbon, SourceType
+from .carbon import Carbon, CarbonArray, SourceType
 
 from .common import (
     AbatementLevel,
     ACT_ROOT,
-    CARBON_PER_IC_PACKAGE,
+    PACKAGE_CARBON,
     DEFAULT_FAB_YIELD,
     EnergyLocation,
+    get_src_or_loc,
     LogicProcess,
 )
+from .cache import DEFAULT_CACHE_SIZE, LRUCache
 from .logger import log
-from .units import mm2, units
-from .utils import load_ci_model
+from .units import AREA_UNIT, CARBON_UNIT, ENERGY_UNIT, mm2
+from .utils import load_ci_model, load_model_table
 
 DEFAULT_EPA_CONFIG = f"{ACT_ROOT}/models/logic/epa.yaml"
 DEFAULT_MATERIALS_CONFIG = f"{ACT_ROOT}/models/logic/materials.yaml"
 DEFAULT_GPA95_CONFIG = f"{ACT_ROOT}/models/logic/gpa_95.yaml"
 DEFAULT_GPA99_CONFIG = f"{ACT_ROOT}/models/logic/gpa_99.yaml"
 
+"""Canonical units of the carbon per area and energy per area models."""
+CPA_UNIT = CARBON_UNIT / AREA_UNIT
+EPA_UNIT = ENERGY_UNIT / AREA_UNIT
+
 
 class LogicModel:
     """
@@ -35,6 +40,7 @@ class LogicModel:
         materials_model (dict): A dictionary mapping logic processes to raw materials per unit area.
         gpa_model (dict): A dictionary mapping abatement levels to dictionaries of logic processes to gas emissions per unit area.
         ci_model (dict): A dictionary mapping energy locations to carbon intensity models.
+        cpa_cache (LRUCache): Memoized carbon per area by process, yield, abatement level and carbon intensity.
     """
 
     def __init__(
@@ -43,6 +49,7 @@ class LogicModel:
         materials_config=DEFAULT_MATERIALS_CONFIG,
         gpa95_file=DEFAULT_GPA95_CONFIG,
         gpa99_file=DEFAULT_GPA99_CONFIG,
+        cache_size=DEFAULT_CACHE_SIZE,
     ) -> None:
         """
         Initializes a LogicModel instance.
@@ -52,32 +59,23 @@ class LogicModel:
             materials_config (str, optional): The path to the materials configuration file. Defaults to DEFAULT_MATERIALS_CONFIG.
             gpa95_file (str, optional): The path to the GPA 95 configuration file. Defaults to DEFAULT_GPA95_CONFIG.
             gpa99_file (str, optional): The path to the GPA 99 configuration file. Defaults to DEFAULT_GPA99_CONFIG.
+            cache_size (int, optional): Number of memoized carbon per area values. Defaults to DEFAULT_CACHE_SIZE.
         """
         # energy per unit area
-        with open(epa_file) as f:
-            self.epa_model = {
-                LogicProcess(k): units(v)
-                for k, v in yaml.load(f, Loader=yaml.FullLoader).items()
-            }
+        self.epa_model = load_model_table(epa_file, LogicProcess, EPA_UNIT)
 
         # raw materials per unit area
-        with open(materials_config) as f:
-            self.materials_model = {
-                LogicProcess(k): units(v)
-                for k, v in yaml.load(f, Loader=yaml.FullLoader).items()
-            }
+        self.materials_model = load_model_table(
+            materials_config, LogicProcess, CPA_UNIT
+        )
 
         self.gpa_model = dict()
-        with open(gpa95_file) as f:
-            self.gpa_model[AbatementLevel.GPA95] = {
-                LogicProcess(k): units(v)
-                for k, v in yaml.load(f, Loader=yaml.FullLoader).items()
-            }
-        with open(gpa99_file) as f:
-            self.gpa_model[AbatementLevel.GPA99] = {
-                LogicProcess(k): units(v)
-                for k, v in yaml.load(f, Loader=yaml.FullLoader).items()
-            }
+        self.gpa_model[AbatementLevel.GPA95] = load_model_table(
+            gpa95_file, LogicProcess, CPA_UNIT
+        )
+        self.gpa_model[AbatementLevel.GPA99] = load_model_table(
+            gpa99_file, LogicProcess, CPA_UNIT
+        )
         self.gpa_model[AbatementLevel.GPA97] = {
             key: (
                 self.gpa_model[AbatementLevel.GPA95][key]
@@ -90,6 +88,8 @@ class LogicModel:
         # load the carbon intensity model by source/location
         self.ci_model = load_ci_model()
 
+        self.cpa_cache = LRUCache(cache_size)
+
     def get_cpa(
         self,
         logic_process: LogicProcess,
@@ -109,6 +109,45 @@ class LogicModel:
         Returns:
             pint.Quantity: The carbon per area.
 
+        Raises:
+            SystemExit: If the carbon intensity or abatement level is not recognized.
+        """
+        return self._cached_cpa(logic_process, fab_yield, gpa, fab_ci) * CPA_UNIT
+
+    def _cached_cpa(
+        self,
+        logic_process: LogicProcess,
+        fab_yield: float,
+        gpa: AbatementLevel,
+        fab_ci,
+    ) -> float:
+        """Get the carbon per area as a float in CPA_UNIT, validating the arguments on every call"""
+        # validate before the lookup so that a cached entry never stands in for the checks
+        if logic_process not in self.epa_model:
+            log.error(
+                f"Logic process {logic_process} not found in EPA model {self.epa_model}."
+            )
+            exit(-1)
+        if gpa in self.gpa_model and logic_process not in self.gpa_model[gpa]:
+            log.error(
+                f"Logic process {logic_process} not found in GPA model {self.gpa_model}."
+            )
+            exit(-1)
+        if logic_process not in self.materials_model:
+            log.error(
+                f"Logic process {logic_process} not found in materials model {self.materials_model}."
+            )
+            exit(-1)
+        self._check_cpa_args(gpa=gpa, fab_ci=fab_ci)
+        return self.cpa_cache.lookup(
+            (logic_process, fab_yield, gpa, fab_ci),
+            lambda: self._get_cpa(logic_process, fab_yield, gpa, fab_ci),
+        )
+
+    def _check_cpa_args(self, gpa, fab_ci) -> None:
+        """
+        Checks that the carbon intensity and abatement level are valid.
+
         Raises:
             SystemExit: If the carbon intensity or abatement level is not recognized.
         """
@@ -121,9 +160,15 @@ class LogicModel:
             log.error(f"Abatement level {gpa} not recognized...")
             exit(-1)
 
-        fab_ci = self.ci_model[fab_ci]
-
-        carbon_energy = fab_ci * self.epa_model[logic_process]
+    def _get_cpa(
+        self,
+        logic_process: LogicProcess,
+        fab_yield: float,
+        gpa: AbatementLevel,
+        fab_ci,
+    ) -> float:
+        """Get the carbon per area as a float in CPA_UNIT"""
+        carbon_energy = self.ci_model[fab_ci] * self.epa_model[logic_process]
         carbon_gas = self.gpa_model[gpa][logic_process]
         carbon_materials = self.materials_model[logic_process]
 
@@ -160,29 +205,54 @@ class LogicModel:
         """
         assert area.check(mm2)
         """Query the model to get the carbon impact results"""
-        if logic_process not in self.epa_model:
-            log.error(
-                f"Logic process {logic_process} not found in EPA model {self.epa_model}."
-            )
-            exit(-1)
-        if logic_process not in self.gpa_model[gpa]:
-            log.error(
-                f"Logic process {logic_process} not found in GPA model {self.gpa_model}."
-            )
-            exit(-1)
-        if logic_process not in self.materials_model:
-            log.error(
-                f"Logic process {logic_process} not found in materials model {self.materials_model}."
-            )
-            exit(-1)
-        cpa = self.get_cpa(
-            logic_process=logic_process, fab_yield=fab_yield, gpa=gpa, fab_ci=fab_ci
-        )
-        carbon = Carbon(area * cpa, SourceType.FABRICATION) + Carbon(
-            n_ics * CARBON_PER_IC_PACKAGE, SourceType.PACKAGING
+        cpa = self._cached_cpa(logic_process, fab_yield, gpa, fab_ci)
+        carbon = Carbon._from_amounts(
+            {
+                SourceType.FABRICATION: area.m_as(AREA_UNIT) * cpa,
+                SourceType.PACKAGING: n_ics * PACKAGE_CARBON,
+            }
         )
         return carbon
 
+    def get_carbon_batch(
+        self,
+        logic_process,
+        area,
+        fab_yield=DEFAULT_FAB_YIELD,
+        n_ics=0,
+        gpa=AbatementLevel.GPA97,
+        fab_ci=EnergyLocation.TAIWAN,
+    ) -> CarbonArray:
+        """
+        Get the carbon emissions over arrays of logic design points.
+
+        Every argument may either be a scalar or an array and all arguments are broadcast against each other.
+
+        Args:
+            logic_process: Logic process (or array of processes) to calculate carbon emissions for.
+            area: Die area of the logic with units of area (ex., np.array([10, 20]) * mm2).
+            fab_yield: The fabrication yield. Defaults to DEFAULT_FAB_YIELD.
+            n_ics: The number of ICs. Defaults to 0.
+            gpa: Manufacturing gas abatement level. Defaults to AbatementLevel.GPA97.
+            fab_ci: Carbon intensity of logic manufacturing. Defaults to EnergyLocation.TAIWAN.
+
+        Returns:
+            CarbonArray: The carbon emissions for each design point.
+        """
+        from .batch import as_magnitude, map_keys
+
+        def _cpa(process, gpa, fab_ci):
+            return self._cached_cpa(
+                LogicProcess(process), 1.0, AbatementLevel(gpa), get_src_or_loc(fab_ci)
+            )
+
+        cpa = map_keys(_cpa, logic_process, gpa, fab_ci) / as_magnitude(fab_yield)
+        fab_carbon = as_magnitude(area, AREA_UNIT) * cpa
+        pkg_carbon = as_magnitude(n_ics) * PACKAGE_CARBON
+        return CarbonArray._from_amounts(
+            {SourceType.FABRICATION: fab_carbon, SourceType.PACKAGING: pkg_carbon}
+        )
+
     def get_carbon_energy(
         self, logic_process: LogicProcess, fab_ci=EnergyLocation.TAIWAN
     ) -> pint.Quantity:
@@ -197,7 +267,7 @@ class LogicModel:
             pint.Quantity: The carbon emissions from energy consumption.
         """
         carbon_energy = self.ci_model[fab_ci] * self.epa_model[logic_process]
-        return carbon_energy
+        return carbon_energy * CPA_UNIT
 
     def get_carbon_gas(
         self, logic_process: LogicProcess, gpa=AbatementLevel.GPA97
@@ -213,7 +283,7 @@ class LogicModel:
             pint.Quantity: The carbon emissions from gas consumption.
         """
         carbon_gas = self.gpa_model[gpa][logic_process]
-        return carbon_gas
+        return carbon_gas * CPA_UNIT
 
     def get_carbon_materials(self, logic_process: LogicProcess) -> pint.Quantity:
         """
@@ -226,4 +296,4 @@ class LogicModel:
             pint.Quantity: The carbon emissions from materials consumption.
         """
         carbon_materials = self.materials_model[logic_process]
-        return carbon_materials
+        return carbon_materials * CPA_UNIT
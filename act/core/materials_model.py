@@ -3,24 +3,65 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
+import functools
 import os
 from enum import Enum
 
-import yaml
 
-from .carbon import Carbon, SourceType
+from .carbon import Carbon, CarbonArray, SourceType
 from .common import ACT_ROOT
-from .units import g, units
+from .units import CARBON_UNIT, g, units
+from .utils import load_model_table, load_model_yaml
 
 DEFAULT_MATERIALS_CONFIG = f"{ACT_ROOT}/models/materials/materials.yaml"
 
 
+@functools.lru_cache(maxsize=None)
+def make_material_type(members: tuple) -> Enum:
+    """
+    Create the MaterialType enum for the given materials.
+
+    Enums are cached by their members so that every model and bill of materials loaded with the same
+    materials (including ones unpickled in worker processes) share a single MaterialType class.
+
+    Args:
+        members (tuple): The (name, value) pairs of the material types.
+
+    Returns:
+        Enum: The MaterialType enum.
+    """
+    material_type = Enum("MaterialType", dict(members), module=__name__)
+    material_type._material_members = members
+    material_type.__reduce_ex__ = _reduce_material
+    return material_type
+
+
+def _reduce_material(material, protocol):
+    """Pickle materials by value since dynamically generated enums cannot be pickled by reference"""
+    return _load_material, (material._material_members, material.value)
+
+
+def _load_material(members: tuple, value: str):
+    """Unpickle a material of a dynamically generated MaterialType enum"""
+    return make_material_type(members)(value)
+
+
+def get_material_type_state(material_type):
+    """Get a picklable state for a dynamically generated MaterialType enum"""
+    return getattr(material_type, "_material_members", material_type)
+
+
+def set_material_type_state(state):
+    """Restore a MaterialType enum from its state (see get_material_type_state)"""
+    return make_material_type(state) if isinstance(state, tuple) else state
+
+
 class MaterialsModel:
     """
     A model for estimating carbon emissions from materials.
 
     Attributes:
-        model (dict): A dictionary mapping material types to their corresponding carbon costs.
+        model (dict): A dictionary mapping material types to their corresponding carbon costs per weight as floats.
         MaterialType (Enum): An enumeration of material types, dynamically generated from the model file.
     """
 
@@ -33,21 +74,26 @@ class MaterialsModel:
         Args:
             model_file (str, optional): The path to the materials data file. Defaults to DEFAULT_MATERIALS_CONFIG.
         """
-        with open(model_file) as handle:
-            model_data = yaml.load(handle, Loader=yaml.FullLoader)
-        materials_data = model_data["materials"]
+        materials_data = load_model_yaml(model_file)["materials"]
 
         # Dynamically generate the materials enum
-        self.MaterialType = Enum(
-            "MaterialType",
-            {**{x.upper(): x for x in materials_data.keys()}, "NA": "na"},
+        self.MaterialType = make_material_type(
+            (*((x.upper(), x) for x in materials_data.keys()), ("NA", "na"))
+        )
+
+        # materials cost is dimensionless (carbon per weight of material)
+        self.model = load_model_table(
+            model_file, self.MaterialType, g / g, section="materials"
         )
 
-        self.model = {self.MaterialType(k): units(v) for k, v in materials_data.items()}
-        for k, v in self.model.items():
-            assert v.check(
-                g / g
-            ), f"Materials cost must be dimensionless. Got {v} for material {k}."
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state.update(MaterialType=get_material_type_state(self.MaterialType))
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.MaterialType = set_material_type_state(state["MaterialType"])
 
     def get_carbon(self, mat, weight: units) -> Carbon:
         """
@@ -65,5 +111,22 @@ class MaterialsModel:
         """
         assert weight.check(g), f"Weight should be in units of weight but got {weight}"
         c_per_kg = self.model[self.MaterialType(mat)]
-        c = c_per_kg * weight
-        return Carbon(c, SourceType.ENCLOSURE)
+        c = c_per_kg * weight.m_as(CARBON_UNIT)
+        return Carbon._from_amounts({SourceType.ENCLOSURE: c})
+
+    def get_carbon_batch(self, mat, weight) -> CarbonArray:
+        """
+        Get the estimated carbon emissions from materials over arrays of design points.
+
+        Args:
+            mat: Material type (or array of material types).
+            weight: Weight of the material with units of weight (scalar or array).
+
+        Returns:
+            CarbonArray: The carbon emissions from the material for each design point.
+        """
+        from .batch import as_magnitude, map_keys
+
+        c_per_kg = map_keys(lambda m: self.model[self.MaterialType(m)], mat)
+        c = c_per_kg * as_magnitude(weight, CARBON_UNIT)
+        return CarbonArray._from_amounts({SourceType.ENCLOSURE: c})
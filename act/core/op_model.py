@@ -3,9 +3,10 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
+from .common import get_src_or_loc
 from .utils import DEFAULT_LOCATION_CONFIG, DEFAULT_SOURCE_CONFIG, load_ci_model
-from .units import *
-from .carbon import Carbon, SourceType
+from .units import POWER_UNIT, s, TIME_UNIT, units
+from .carbon import Carbon, CarbonArray, SourceType
 from .logger import log
 
 
@@ -52,7 +53,33 @@ class OpModel:
             exit(-1)
 
         op_ci = self.ci_model[op_ci]
-        op_time = lifetime * duty_cycle
-        carbon = op_ci * op_power * op_time
+        op_time = lifetime.m_as(TIME_UNIT) * duty_cycle
+        carbon = op_ci * op_power.m_as(POWER_UNIT) * op_time
 
-        return Carbon(carbon, SourceType.OPERATION)
+        return Carbon._from_amounts({SourceType.OPERATION: carbon})
+
+    def get_carbon_batch(
+        self,
+        lifetime,
+        duty_cycle,
+        op_power,
+        op_ci,
+    ) -> CarbonArray:
+        """Get the estimated carbon operation costs over arrays of operating points.
+
+        Every argument may either be a scalar or an array and all arguments are broadcast against each other.
+
+        Args:
+            lifetime: The estimated device lifetime with units of time.
+            duty_cycle: The estimated device active duty cycle.
+            op_power: The average operating power of the device with units of power.
+            op_ci: The carbon intensity of the energy grid for operation.
+        Returns:
+            CarbonArray: The carbon emissions from operation for each operating point.
+        """
+        from .batch import as_magnitude, map_keys
+
+        op_ci = map_keys(lambda ci: self.ci_model[get_src_or_loc(ci)], op_ci)
+        op_time = as_magnitude(lifetime, TIME_UNIT) * as_magnitude(duty_cycle)
+        carbon = op_ci * as_magnitude(op_power, POWER_UNIT) * op_time
+        return CarbonArray._from_amounts({SourceType.OPERATION: carbon})
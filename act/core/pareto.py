@@ -0,0 +1,413 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+Pareto frontier search over alternatives of bill of materials slots
+- A slot is a device of the bill of materials (ex., silicon.cpu) with a list of alternative field overrides
+- Each alternative may add operating power (op_power) and user metrics (ex., cost) to the design
+- Every alternative is evaluated once into a carbon vector by SourceType, and since the carbon of a design is
+  the sum of its slot vectors, the frontier is built by merging one slot at a time and pruning dominated
+  partial designs after each merge (the frontier of a sum is contained in the sum of the frontiers)
+- The cross product of alternatives is never enumerated
+"""
+
+import copy
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from .batch import as_magnitude
+from .bom import load_bom, MATERIALS, PASSIVES, SILICON
+from .carbon import CarbonArray, N_SOURCE_TYPES, SOURCE_INDEX, SourceType
+from .common import DEFAULT_OP_LOCATION
+from .units import CARBON_UNIT, POWER_UNIT, W, year
+from .utils import load_yaml
+
+"""Alternative key for the operating power added by an alternative."""
+OP_POWER = "op_power"
+
+"""Alternative key for the user metrics of an alternative (ex., {cost: 40})."""
+METRICS = "metrics"
+
+"""Objectives computed from the carbon of a design."""
+CARBON_OBJECTIVES = ("embodied", "operational", "total")
+
+"""Default objectives of the frontier."""
+DEFAULT_OBJECTIVES = ("embodied", "operational")
+
+
+def pareto_mask(points: np.ndarray) -> np.ndarray:
+    """
+    Find the points that are not dominated by any other point when minimizing every objective.
+
+    Duplicate points are only kept once.
+
+    Args:
+        points (np.ndarray): The objective values of each point, shape (n_points, n_objectives).
+
+    Returns:
+        np.ndarray: Boolean mask of the non-dominated points.
+    """
+    n_points, n_objectives = points.shape
+    mask = np.zeros(n_points, dtype=bool)
+    if n_points == 0:
+        return mask
+
+    # sort lexicographically so no point can be dominated by a later point
+    order = np.lexsort(points.T[::-1])
+    if n_objectives == 1:
+        mask[order[0]] = True
+    elif n_objectives == 2:
+        # a sorted point is non-dominated if it improves on the best second objective so far
+        second = points[order, 1]
+        best = np.minimum.accumulate(second)
+        keep = np.ones(n_points, dtype=bool)
+        keep[1:] = second[1:] < best[:-1]
+        mask[order[keep]] = True
+    else:
+        kept = np.empty((n_points, n_objectives))
+        n_kept = 0
+        for i in order:
+            if not np.any(np.all(kept[:n_kept] <= points[i], axis=1)):
+                kept[n_kept] = points[i]
+                n_kept += 1
+                mask[i] = True
+    return mask
+
+
+@dataclass
+class Slot:
+    """
+    The alternatives of a single bill of materials device.
+
+    Attributes:
+        name (str): The device name with its section (ex., silicon.cpu).
+        alternatives (list[dict]): The field overrides, operating power and metrics of each alternative.
+        carbon (np.ndarray): The carbon of each alternative by SourceType in CARBON_UNIT, shape (n_alternatives, N_SOURCE_TYPES).
+        metrics (np.ndarray): The user metrics of each alternative, shape (n_alternatives, n_metrics).
+    """
+
+    name: str
+    alternatives: list
+    carbon: np.ndarray = None
+    metrics: np.ndarray = None
+
+
+@dataclass
+class ParetoFrontier:
+    """
+    The Pareto frontier of the designs built from slot alternatives.
+
+    Attributes:
+        objectives (tuple): The minimized objectives.
+        slots (list[Slot]): The evaluated slots.
+        values (np.ndarray): The objective values of each frontier design, shape (n_designs, n_objectives).
+            Carbon objectives are in CARBON_UNIT.
+        choices (np.ndarray): The alternative index of each slot for each frontier design, shape (n_designs, n_slots).
+        carbon (CarbonArray): The carbon of each frontier design by SourceType.
+        n_combinations (int): The number of designs in the cross product of all alternatives.
+    """
+
+    objectives: tuple
+    slots: list
+    values: np.ndarray
+    choices: np.ndarray
+    carbon: CarbonArray
+    n_combinations: int
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def designs(self) -> list:
+        """The slot alternatives of each frontier design"""
+        return [
+            {
+                slot.name: copy.deepcopy(slot.alternatives[i])
+                for slot, i in zip(self.slots, choice)
+            }
+            for choice in self.choices
+        ]
+
+    def to_list(self, weight_unit) -> list:
+        """Summarize each frontier design and its objectives in weight_unit for reporting"""
+        results = []
+        for values, design in zip(self.values, self.designs()):
+            objectives = {
+                name: (
+                    str((value * CARBON_UNIT).to(weight_unit))
+                    if name in CARBON_OBJECTIVES
+                    else float(value)
+                )
+                for name, value in zip(self.objectives, values)
+            }
+            results.append(dict(objectives=objectives, design=design))
+        return results
+
+
+def combine_alternatives(first: dict, second: dict) -> dict:
+    """
+    Combine two alternatives of the same device into one.
+
+    Field overrides are merged, operating powers and metrics are added.
+
+    Raises:
+        ValueError: If both alternatives override the same field.
+    """
+    fields = (set(first) & set(second)) - {OP_POWER, METRICS}
+    if fields:
+        raise ValueError(f"Alternatives both override the fields {sorted(fields)}.")
+    combined = {**first, **second}
+    if OP_POWER in first and OP_POWER in second:
+        op_power = as_magnitude([first[OP_POWER], second[OP_POWER]], POWER_UNIT)
+        combined[OP_POWER] = float(op_power.sum()) * POWER_UNIT
+    if METRICS in first and METRICS in second:
+        metrics = dict(first[METRICS])
+        for name, value in second[METRICS].items():
+            metrics[name] = float(metrics.get(name, 0.0)) + float(value)
+        combined[METRICS] = metrics
+    return combined
+
+
+def parse_alternatives(spec: dict) -> list:
+    """
+    Parse the slots of an alternatives specification.
+
+    Entries for the same device (ex., silicon.cpu.process and silicon.cpu.area) are merged into one slot
+    whose alternatives are the cross product of the alternatives of each entry.
+
+    Args:
+        spec (dict): Maps each device (ex., silicon.cpu) to a list of alternatives, each a dictionary of field
+            overrides with optional op_power and metrics (ex., {process: 7nm, area: 80 mm2, op_power: 3 W,
+            metrics: {cost: 40}}). A single field can also be given directly (ex., silicon.ssd.process: [nand_10nm, nand_30nm]).
+
+    Returns:
+        list[Slot]: The slots of the specification.
+    """
+    slots = dict()
+    for name, alternatives in spec.items():
+        if not isinstance(alternatives, list) or len(alternatives) == 0:
+            raise ValueError(f"Slot {name} must have a non-empty list of alternatives.")
+        if name.count(".") >= 2 and not isinstance(alternatives[0], dict):
+            name, _, field = name.rpartition(".")
+            alternatives = [{field: value} for value in alternatives]
+        alternatives = [dict(a) for a in alternatives]
+        if name in slots:
+            alternatives = [
+                combine_alternatives(a, b)
+                for a in slots[name].alternatives
+                for b in alternatives
+            ]
+        slots[name] = Slot(name, alternatives)
+    return list(slots.values())
+
+
+def load_alternatives_spec(spec_file: str) -> dict:
+    """Load an alternatives specification file mapping devices to their alternatives"""
+    return load_yaml(spec_file)
+
+
+class ParetoSearch:
+    """
+    Pareto frontier search over alternatives of bill of materials devices.
+
+    Attributes:
+        bom_file (str): The base bill of materials file.
+        slots (list[Slot]): The devices with alternatives.
+        objectives (tuple): The minimized objectives: embodied, operational or total carbon, or any user metric.
+        op_args (dict): The operating parameters. Alternatives add their op_power to the base op_power.
+    """
+
+    def __init__(
+        self,
+        bom_file: str,
+        spec: dict,
+        objectives=DEFAULT_OBJECTIVES,
+        op_power=0 * W,
+        op_ci=DEFAULT_OP_LOCATION,
+        duty_cycle: float = 1.0,
+        hw_lifetime=2 * year,
+    ) -> None:
+        """
+        Initializes a new instance of the ParetoSearch class.
+
+        Args:
+            bom_file (str): The base bill of materials file.
+            spec (dict): The alternatives specification (see parse_alternatives).
+            objectives (optional): The minimized objectives. Defaults to embodied and operational carbon.
+            op_power: Base operating power of the device
+            op_ci: Operational carbon intensity setting
+            duty_cycle: Device utilization rate between 0 and 1
+            hw_lifetime: Expected hardware life cycle
+        """
+        self.bom_file = bom_file
+        self.slots = parse_alternatives(spec)
+        self.objectives = tuple(objectives)
+        self.op_args = dict(
+            op_power=op_power,
+            op_ci=op_ci,
+            duty_cycle=duty_cycle,
+            hw_lifetime=hw_lifetime,
+        )
+
+    @property
+    def metric_names(self) -> list:
+        """The user metric objectives."""
+        return [o for o in self.objectives if o not in CARBON_OBJECTIVES]
+
+    def _op_carbon(self, model, op_power) -> np.ndarray:
+        """Operational carbon in CARBON_UNIT of the given operating powers"""
+        carbon = model.op_model.get_carbon_batch(
+            lifetime=self.op_args["hw_lifetime"],
+            duty_cycle=self.op_args["duty_cycle"],
+            op_power=op_power,
+            op_ci=self.op_args["op_ci"],
+        )
+        return carbon.values[..., SOURCE_INDEX[SourceType.OPERATION]]
+
+    def evaluate_slots(self, model, bom) -> np.ndarray:
+        """
+        Evaluate the carbon vector and metrics of every slot alternative.
+
+        Args:
+            model (ACTModel): The model to evaluate with.
+            bom (BOM): The base bill of materials.
+
+        Returns:
+            np.ndarray: The carbon by SourceType of the rest of the design (base operating power and devices without alternatives).
+        """
+        sections = {
+            SILICON: bom.silicon,
+            PASSIVES: bom.passives,
+            MATERIALS: bom.materials,
+        }
+        for slot in self.slots:
+            section, _, device = slot.name.partition(".")
+            if section not in sections or device not in sections[section]:
+                raise KeyError(
+                    f"Slot {slot.name} does not match any device in {bom.name}."
+                )
+
+            # evaluate all alternatives of the slot in one batch
+            fields = {
+                k for a in slot.alternatives for k in a if k not in (OP_POWER, METRICS)
+            }
+            base = sections[section][device]
+            params = dict()
+            for field in fields:
+                values = np.empty(len(slot.alternatives), dtype=object)
+                values[:] = [
+                    a.get(field, getattr(base, field)) for a in slot.alternatives
+                ]
+                params[f"{slot.name}.{field}"] = values
+            results = dict(
+                zip([SILICON, PASSIVES, MATERIALS], model.batch_analysis(bom, params))
+            )
+            carbon = np.broadcast_to(
+                results[section][device].values,
+                (len(slot.alternatives), N_SOURCE_TYPES),
+            ).copy()
+
+            op_power = as_magnitude(
+                [a.get(OP_POWER, 0 * W) for a in slot.alternatives], POWER_UNIT
+            )
+            carbon[:, SOURCE_INDEX[SourceType.OPERATION]] += self._op_carbon(
+                model, op_power * POWER_UNIT
+            )
+            slot.carbon = carbon
+            slot.metrics = np.array(
+                [
+                    [
+                        float(a.get(METRICS, dict()).get(m, 0.0))
+                        for m in self.metric_names
+                    ]
+                    for a in slot.alternatives
+                ]
+            ).reshape(len(slot.alternatives), len(self.metric_names))
+
+        # carbon of the devices without alternatives and of the base operating power
+        slot_names = {slot.name for slot in self.slots}
+        offset = np.zeros(N_SOURCE_TYPES)
+        for section, results in zip(
+            [SILICON, PASSIVES, MATERIALS], model.batch_analysis(bom)
+        ):
+            for device, carbon in results.items():
+                if f"{section}.{device}" not in slot_names:
+                    offset += carbon.values
+        offset[SOURCE_INDEX[SourceType.OPERATION]] += self._op_carbon(
+            model, self.op_args["op_power"]
+        )
+        return offset
+
+    def _objective_values(self, carbon: np.ndarray, metrics: np.ndarray) -> np.ndarray:
+        """Objective values of designs from their carbon vectors and metrics"""
+        operational = carbon[..., SOURCE_INDEX[SourceType.OPERATION]]
+        total = carbon.sum(axis=-1)
+        columns = dict(
+            embodied=total - operational, operational=operational, total=total
+        )
+        metric_index = {m: i for i, m in enumerate(self.metric_names)}
+        return np.stack(
+            [
+                columns[o] if o in columns else metrics[..., metric_index[o]]
+                for o in self.objectives
+            ],
+            axis=-1,
+        )
+
+    def run(self, model=None) -> ParetoFrontier:
+        """
+        Search the Pareto frontier of the designs built from the slot alternatives.
+
+        Args:
+            model (ACTModel, optional): The model to evaluate with. Defaults to a new ACTModel.
+
+        Returns:
+            ParetoFrontier: The non-dominated designs.
+        """
+        if model is None:
+            from ..act_model import ACTModel
+
+            model = ACTModel()
+        bom = load_bom(self.bom_file, model.materials_model.MaterialType)
+        offset = self.evaluate_slots(model, bom)
+
+        # partial designs: carbon vectors, metrics and the alternative chosen for each merged slot
+        carbon = offset[None]
+        metrics = np.zeros((1, len(self.metric_names)))
+        choices = np.zeros((1, 0), dtype=np.int64)
+        for slot in self.slots:
+            # prune the slot alternatives, then merge them with every partial design and prune again
+            keep = np.flatnonzero(
+                pareto_mask(self._objective_values(slot.carbon, slot.metrics))
+            )
+            n_partial = len(carbon)
+            carbon = (carbon[:, None] + slot.carbon[keep][None]).reshape(
+                -1, N_SOURCE_TYPES
+            )
+            metrics = (metrics[:, None] + slot.metrics[keep][None]).reshape(
+                len(carbon), len(self.metric_names)
+            )
+            choices = np.concatenate(
+                [
+                    np.repeat(choices, len(keep), axis=0),
+                    np.tile(keep, n_partial)[:, None],
+                ],
+                axis=1,
+            )
+            mask = pareto_mask(self._objective_values(carbon, metrics))
+            carbon, metrics, choices = carbon[mask], metrics[mask], choices[mask]
+
+        values = self._objective_values(carbon, metrics)
+        order = np.lexsort(values.T[::-1])
+        mask = (1 << N_SOURCE_TYPES) - 1
+        return ParetoFrontier(
+            objectives=self.objectives,
+            slots=self.slots,
+            values=values[order],
+            choices=choices[order],
+            carbon=CarbonArray(carbon[order], mask),
+            n_combinations=math.prod(len(s.alternatives) for s in self.slots),
+        )
@@ -3,18 +3,20 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
-import yaml
-
-from .carbon import Carbon, SourceType
+from .carbon import Carbon, CarbonArray, SourceType
 from .common import ACT_ROOT
 from .logger import log
 
-from .units import mm2, units
+from .units import AREA_UNIT, CARBON_UNIT, mm2
+from .utils import load_model_table
 
 DEFAULT_PCB_MODEL_FILE = f"{ACT_ROOT}/models/materials/pcb.yaml"
 
 INTERPOLATED_AVERAGE_KEY = "cpla"
 
+"""Canonical unit of the PCB carbon per area model."""
+CPA_UNIT = CARBON_UNIT / AREA_UNIT
+
 
 class PCBModel:
     """
@@ -31,13 +33,10 @@ class PCBModel:
         Args:
             model_file (str): The path to the model file. Defaults to DEFAULT_PCB_MODEL_FILE.
         """
-        with open(model_file) as handle:
-            model_data = yaml.load(handle, Loader=yaml.FullLoader)
-
-        self.model = {k: units(v) for k, v in model_data.items()}
-        if INTERPOLATED_AVERAGE_KEY in self.model:
-            self.interpolated_cpla = self.model[INTERPOLATED_AVERAGE_KEY]
-            del self.model[INTERPOLATED_AVERAGE_KEY]
+        table = load_model_table(model_file, None, CPA_UNIT)
+        self.model = {k: v for k, v in table.items() if k != INTERPOLATED_AVERAGE_KEY}
+        if INTERPOLATED_AVERAGE_KEY in table:
+            self.interpolated_cpla = table[INTERPOLATED_AVERAGE_KEY]
         else:
             log.warn(
                 "PCB model does not have a default interpolated average carbon / area / layer. If an unregistered number of layers is provided, the model will throw an error."
@@ -60,6 +59,27 @@ class PCBModel:
         """
         assert area.check(mm2), f"Expected area units for PCB model but got {area}"
 
+        c = self._get_cpa(layers) * area.m_as(AREA_UNIT)
+        return Carbon._from_amounts({SourceType.FABRICATION: c})
+
+    def get_carbon_batch(self, area, layers) -> CarbonArray:
+        """
+        Calculates the carbon emissions of PCBs over arrays of areas and numbers of layers.
+
+        Args:
+            area: The area of the PCB with units of area (scalar or array).
+            layers: The number of layers in the PCB (scalar or array).
+
+        Returns:
+            CarbonArray: The carbon emissions of the PCB for each design point.
+        """
+        from .batch import as_magnitude, map_keys
+
+        c = map_keys(self._get_cpa, layers) * as_magnitude(area, AREA_UNIT)
+        return CarbonArray._from_amounts({SourceType.FABRICATION: c})
+
+    def _get_cpa(self, layers: int) -> float:
+        """Get the carbon per area in CPA_UNIT of a PCB with the given number of layers"""
         # if the CPA for the number of layers is provided, use it directly
         if layers in self.model:
             cpa = self.model[layers]
@@ -70,6 +90,4 @@ class PCBModel:
                 f"No PCB model for number of layers {layers} and not default carbon per area per layer provided. Cannot continue."
             )
             exit(-1)
-
-        c = cpa * area
-        return Carbon(c, SourceType.FABRICATION)
+        return cpa
@@ -0,0 +1,96 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from dataclasses import dataclass, field
+
+import pint
+
+from .bom import BOM
+from .carbon import Carbon, CarbonArray
+from .common import EnergyLocation
+from .op_model import OpModel
+from .units import year
+
+
+@dataclass
+class CompiledBOM:
+    """
+    A bill of materials compiled into its embodied carbon and a closed form operational term.
+
+    The embodied carbon only depends on the bill of materials so it is evaluated once at compile time.
+    Re-evaluating the plan under new operating parameters only computes the operational carbon.
+
+    Attributes:
+        bom (BOM): The bill of materials this plan was compiled from.
+        op_model (OpModel): The operational model used to evaluate the operating parameters.
+        silicon_results (dict): Embodied carbon by silicon device.
+        passives_results (dict): Embodied carbon by passive device.
+        materials_results (dict): Embodied carbon by material.
+        embodied (Carbon): Total embodied carbon over all devices.
+    """
+
+    bom: BOM
+    op_model: OpModel
+    silicon_results: dict
+    passives_results: dict
+    materials_results: dict
+    embodied: Carbon = field(init=False)
+
+    def __post_init__(self):
+        self.embodied = Carbon(result_dict=dict())
+        for carbon in [
+            *self.silicon_results.values(),
+            *self.passives_results.values(),
+            *self.materials_results.values(),
+        ]:
+            self.embodied += carbon
+
+    def get_carbon(
+        self,
+        op_power: pint.Quantity,
+        op_ci=EnergyLocation.USA,
+        duty_cycle: float = 1.0,
+        hw_lifetime=2 * year,
+    ) -> Carbon:
+        """
+        Calculate the aggregate carbon cost under the given operating parameters.
+
+        Args:
+            op_power: Operating power of the device
+            op_ci: Operational carbon intensity setting
+            duty_cycle: Device utilization rate between 0 and 1
+            hw_lifetime: Expected hardware life cycle
+
+        Returns:
+            Carbon: The embodied and operational carbon.
+        """
+        op_carbon = self.op_model.get_carbon(
+            lifetime=hw_lifetime, duty_cycle=duty_cycle, op_power=op_power, op_ci=op_ci
+        )
+        return self.embodied + op_carbon
+
+    def get_carbon_batch(
+        self,
+        op_power,
+        op_ci=EnergyLocation.USA,
+        duty_cycle=1.0,
+        hw_lifetime=2 * year,
+    ) -> CarbonArray:
+        """
+        Calculate the aggregate carbon cost over arrays of operating parameters.
+
+        Args:
+            op_power: Operating power of the device
+            op_ci: Operational carbon intensity setting
+            duty_cycle: Device utilization rate between 0 and 1
+            hw_lifetime: Expected hardware life cycle
+
+        Returns:
+            CarbonArray: The carbon results for each operating point.
+        """
+        op_carbon = self.op_model.get_carbon_batch(
+            lifetime=hw_lifetime, duty_cycle=duty_cycle, op_power=op_power, op_ci=op_ci
+        )
+        return op_carbon + self.embodied
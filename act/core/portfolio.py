@@ -0,0 +1,222 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+Evaluation of a portfolio of bills of materials with shared operating parameters
+- The portfolio is a list of bill of materials files, given by directories and glob patterns (see find_boms)
+- Files are evaluated chunk by chunk on a process pool, each worker loading the model once
+- Results stream back in file order into one consolidated CSV report (see write_csv), or into a report stream
+  with the full report of each bill of materials (see write_reports)
+- A bill of materials that fails to load or evaluate is reported with its error instead of stopping the run
+"""
+
+import csv
+import glob
+import os
+
+from .bom import load_bom
+from .carbon import SourceType
+from .common import DEFAULT_OP_LOCATION
+from .logger import log
+from .report import build_report, EXPORT_NONE
+from .sweep import run_chunks
+from .units import kg, W, year
+
+"""Default number of bills of materials evaluated per worker task."""
+DEFAULT_CHUNK_SIZE = 64
+
+
+def find_boms(patterns: list) -> list:
+    """
+    Expand directories and glob patterns into bill of materials files.
+
+    Args:
+        patterns (list): Files, directories (every YAML file below them) or glob patterns (** matches subdirectories).
+
+    Returns:
+        list: The sorted bill of materials files, each listed once.
+
+    Raises:
+        ValueError: If a pattern does not match any file.
+    """
+    files = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = glob.glob(os.path.join(pattern, "**", "*.yaml"), recursive=True)
+        else:
+            matches = glob.glob(pattern, recursive=True)
+        if not matches:
+            raise ValueError(f"No bill of materials found for {pattern}")
+        files.update(os.path.abspath(file) for file in matches)
+    return sorted(files)
+
+
+class Portfolio:
+    """
+    A set of bills of materials evaluated with the same operating parameters.
+
+    Attributes:
+        bom_files (list[str]): The bill of materials files.
+        op_args (dict): Operating parameters shared by every bill of materials.
+        reports (bool): Whether the full report of each bill of materials is built by the workers.
+    """
+
+    def __init__(
+        self,
+        bom_files: list,
+        op_power=0 * W,
+        op_ci=DEFAULT_OP_LOCATION,
+        duty_cycle: float = 1.0,
+        hw_lifetime=2 * year,
+        reports: bool = False,
+    ) -> None:
+        """
+        Initializes a new instance of the Portfolio class.
+
+        Args:
+            bom_files (list): The bill of materials files.
+            op_power: Operating power of each device
+            op_ci: Operational carbon intensity setting
+            duty_cycle: Device utilization rate between 0 and 1
+            hw_lifetime: Expected hardware life cycle
+            reports: Build the full report of each bill of materials (see build_report) in the workers
+        """
+        self.bom_files = list(bom_files)
+        self.op_args = dict(
+            op_power=op_power,
+            op_ci=op_ci,
+            duty_cycle=duty_cycle,
+            hw_lifetime=hw_lifetime,
+        )
+        self.reports = reports
+
+    def __len__(self) -> int:
+        return len(self.bom_files)
+
+    def chunks(self, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """Generate the lists of bill of materials files of each chunk of the portfolio"""
+        for start in range(0, len(self.bom_files), chunk_size):
+            yield (self.bom_files[start : start + chunk_size],)
+
+    def evaluate(self, model, _bom, bom_files: list) -> list:
+        """
+        Evaluate a chunk of bills of materials.
+
+        Args:
+            model (ACTModel): The model to evaluate with.
+            _bom: Unused, the bills of materials are loaded from their files.
+            bom_files (list): The bill of materials files of the chunk.
+
+        Returns:
+            list: The file, the Carbon result (None on failure), the error message (None on success) and the report
+                (None unless reports is set) of each bill of materials.
+        """
+        results = []
+        for file in bom_files:
+            report = None
+            try:
+                bom = load_bom(file, model.materials_model.MaterialType)
+                if self.reports:
+                    carbon = model.get_carbon(bom, export=EXPORT_NONE, **self.op_args)
+                    report = build_report(**model.report_data(carbon))
+                    report.update(bom=file)
+                else:
+                    # compiled plans are evaluated without building a report
+                    carbon = model.compile_bom(bom).get_carbon(**self.op_args)
+            except (Exception, SystemExit) as e:
+                # the models log invalid devices and exit, which only fails this bill of materials
+                if isinstance(e, SystemExit):
+                    error = f"SystemExit: the model rejected a device (exit code {e.code}), see the log"
+                else:
+                    error = f"{type(e).__name__}: {e}"
+                log.warning(f"Unable to evaluate bill of materials {file}: {error}")
+                results.append((file, None, error, None))
+            else:
+                results.append((file, carbon, None, report))
+        return results
+
+    def run(
+        self, workers: int = None, chunk_size: int = DEFAULT_CHUNK_SIZE, model=None
+    ):
+        """
+        Evaluate the portfolio and stream the results chunk by chunk in file order.
+
+        The model is loaded once and shipped to each worker as a pickled snapshot so workers do not
+        re-parse the model files.
+
+        Args:
+            workers (int, optional): Number of worker processes. Evaluates in this process if 0. Defaults to the number of CPUs.
+            chunk_size (int, optional): Number of bills of materials per chunk. Defaults to DEFAULT_CHUNK_SIZE.
+            model (ACTModel, optional): The model to evaluate with. Defaults to a new ACTModel.
+
+        Yields:
+            list: The results of each chunk (see evaluate).
+        """
+        if model is None:
+            from ..act_model import ACTModel
+
+            model = ACTModel()
+
+        yield from run_chunks(self, self.chunks(chunk_size), workers, model, None)
+
+
+def write_csv(results, handle, weight_unit=kg) -> tuple:
+    """
+    Stream portfolio results to a CSV file as they are produced.
+
+    Each row holds the bill of materials file, its total carbon and its carbon by source type in weight_unit,
+    and the error message of bills of materials that could not be evaluated.
+
+    Args:
+        results: The chunks yielded by Portfolio.run.
+        handle: A writable text file handle.
+        weight_unit (optional): Unit of the carbon columns. Defaults to kg.
+
+    Returns:
+        tuple: The number of bills of materials written and the number of them that failed.
+    """
+    writer = csv.writer(handle)
+    writer.writerow(["bom", "total_carbon", *[src.name for src in SourceType], "error"])
+    n_boms = n_failed = 0
+    for chunk in results:
+        for file, carbon, error, _ in chunk:
+            if carbon is None:
+                writer.writerow([file, *[""] * (len(SourceType) + 1), error])
+                n_failed += 1
+            else:
+                writer.writerow(
+                    [
+                        file,
+                        carbon.total().m_as(weight_unit),
+                        *[carbon.partial(src).m_as(weight_unit) for src in SourceType],
+                        "",
+                    ]
+                )
+            n_boms += 1
+    return n_boms, n_failed
+
+
+def write_reports(results, stream) -> tuple:
+    """
+    Stream the full report of each bill of materials as it is produced.
+
+    Bills of materials that could not be evaluated are logged by the workers and skipped.
+
+    Args:
+        results: The chunks yielded by Portfolio.run with reports set.
+        stream: The report stream (see open_report_stream). Reports have an additional bom field.
+
+    Returns:
+        tuple: The number of bills of materials and the number of them that failed.
+    """
+    n_boms = n_failed = 0
+    for chunk in results:
+        for _, _, _, report in chunk:
+            if report is None:
+                n_failed += 1
+            else:
+                stream.write(report)
+            n_boms += 1
+    return n_boms, n_failed
@@ -0,0 +1,348 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+Result reports of ACTModel.get_carbon
+- A report lists the query settings, the total carbon, the carbon by source type and the carbon of each device
+- Reports are written in one of the EXPORT_MODES: synchronously, on a background thread, or not at all
+- The background ReportWriter builds and writes reports from a snapshot of the results, in submission order,
+  so the caller only pays for the snapshot
+- Report streams write the reports of many estimates line by line to JSON Lines or CSV files, so long runs
+  use constant memory and can be piped into other tools
+"""
+
+import csv
+import datetime
+import json
+import os
+import queue
+import sys
+import threading
+import weakref
+
+import yaml
+
+from .carbon import SOURCE_INDEX, SourceType
+from .logger import log
+from .units import CARBON_UNIT, units
+from .utils import YAML_DUMPER
+
+"""Report export modes: write each report before returning, write it on a background thread, or skip it."""
+EXPORT_SYNC = "sync"
+EXPORT_ASYNC = "async"
+EXPORT_NONE = "none"
+EXPORT_MODES = (EXPORT_SYNC, EXPORT_ASYNC, EXPORT_NONE)
+
+"""Report stream formats."""
+STREAM_FORMATS = ("jsonl", "csv")
+
+"""Settings reported in the query_settings of a report."""
+QUERY_SETTINGS = ("op_power", "op_ci", "duty_cycle", "hw_lifetime")
+
+"""Default number of reports buffered by a ReportWriter before submit blocks."""
+DEFAULT_MAX_PENDING = 256
+
+
+def check_export_mode(mode: str) -> str:
+    """Check that mode is one of the EXPORT_MODES"""
+    if mode not in EXPORT_MODES:
+        raise ValueError(f"Unknown export mode {mode}. Options: {EXPORT_MODES}")
+    return mode
+
+
+class CarbonFormatter:
+    """
+    Formats carbon results as strings in a weight unit, converting with a single scale factor.
+
+    Attributes:
+        scale (float): The factor converting CARBON_UNIT to the weight unit.
+        unit (str): The name of the weight unit.
+    """
+
+    def __init__(self, weight_unit) -> None:
+        self.scale = (1 * CARBON_UNIT).m_as(weight_unit)
+        self.unit = str(units.Quantity(1, weight_unit).units)
+
+    def total(self, carbon) -> str:
+        """The total carbon"""
+        return f"{float(carbon.values.sum()) * self.scale} {self.unit}"
+
+    def by_type(self, carbon, scale: float = 1.0) -> dict:
+        """The carbon of each source type present in the result, scaled by scale"""
+        values = carbon.values * scale * self.scale
+        return {
+            src.name: f"{float(values[SOURCE_INDEX[src]])} {self.unit}"
+            for src in carbon.types()
+        }
+
+    def summary(self, carbon) -> dict:
+        """The total_carbon and result_by_category fields of a report, which lists every source type"""
+        values = carbon.values * self.scale
+        return dict(
+            total_carbon=self.total(carbon),
+            result_by_category={
+                src.name: f"{float(values[SOURCE_INDEX[src]])} {self.unit}"
+                for src in SourceType
+            },
+        )
+
+
+def build_report(
+    query_settings: dict,
+    total_carbon,
+    device_results: dict,
+    weight_unit,
+    expand_instances: bool = False,
+    cl_args: str = None,
+    generated: datetime.datetime = None,
+) -> dict:
+    """
+    Build the report of a carbon estimate.
+
+    Args:
+        query_settings (dict): The operating settings of the estimate, as strings.
+        total_carbon (Carbon): The total carbon of the estimate.
+        device_results (dict): Maps each report section (ex., silicon_results) to a dictionary mapping device
+            names to their Carbon result and count.
+        weight_unit: The unit of weight the carbon is reported in.
+        expand_instances (bool, optional): Report each of the identical devices of a device with a count separately
+            as <device>[<instance>], leaving out devices with a count of 0. Defaults to False.
+        cl_args (str, optional): The command line of the process. Defaults to the current command line.
+        generated (datetime.datetime, optional): The time the report was generated. Defaults to now.
+
+    Returns:
+        dict: The report data.
+    """
+    if generated is None:
+        generated = datetime.datetime.now()
+    formatter = CarbonFormatter(weight_unit)
+
+    report = dict(report_generated=generated.strftime("%m/%d/%Y %H:%M:%S"))
+    report.update(cl_args=" ".join(sys.argv) if cl_args is None else cl_args)
+    report.update(query_settings=query_settings)
+    report.update(formatter.summary(total_carbon))
+
+    result_by_device = dict()
+    for section, devices in device_results.items():
+        section_results = dict()
+        for dev, (carbon, count) in devices.items():
+            if expand_instances and count != 1:
+                # identical devices are reported once each as <device>[<instance>]
+                instance = formatter.by_type(carbon, 1 / count) if count else None
+                for i in range(count):
+                    section_results[f"{dev}[{i}]"] = dict(instance)
+            else:
+                section_results[dev] = formatter.by_type(carbon)
+        result_by_device[section] = section_results
+    report.update(result_by_device=result_by_device)
+    return report
+
+
+def dump_report(export_file: str, report: dict) -> None:
+    """Write a report to a YAML file"""
+    with open(export_file, "w") as handle:
+        yaml.dump(report, handle, Dumper=YAML_DUMPER)
+    log.info(f"ACT results exported to: {export_file}")
+
+
+def _write_reports(reports: queue.Queue, errors: list) -> None:
+    """Build and write the queued reports until the None sentinel, collecting their errors"""
+    while True:
+        item = reports.get()
+        try:
+            if item is None:
+                return
+            export_file, build = item
+            dump_report(export_file, build())
+        except Exception as e:
+            errors.append(e)
+        finally:
+            reports.task_done()
+
+
+def _stop_writer(reports: queue.Queue, thread: threading.Thread) -> None:
+    """Write the queued reports and stop the writer thread"""
+    reports.put(None)
+    thread.join()
+
+
+class ReportWriter:
+    """
+    Writes reports on a background thread.
+
+    Reports are built and written in submission order. At most max_pending reports are buffered, after which
+    submit waits for the writer to catch up. Errors are raised by the next flush. The thread is started by the
+    first submit and stopped by close, when the writer is garbage collected, or when the process exits, after
+    writing the queued reports. The writer is not pickled: a model shipped to a worker process starts with a
+    new writer.
+
+    Attributes:
+        max_pending (int): The maximum number of buffered reports.
+    """
+
+    def __init__(self, max_pending: int = DEFAULT_MAX_PENDING) -> None:
+        self.max_pending = max_pending
+        self._queue = queue.Queue(max_pending)
+        self._errors = []
+        self._lock = threading.Lock()
+        self._finalizer = None
+
+    def submit(self, export_file: str, build) -> None:
+        """
+        Queue a report to be built and written.
+
+        Args:
+            export_file (str): The file to write the report to.
+            build: Function without arguments that builds the report data on the writer thread.
+        """
+        with self._lock:
+            if self._finalizer is None:
+                # the thread only holds the queue, so it does not keep the writer alive
+                thread = threading.Thread(
+                    target=_write_reports,
+                    args=(self._queue, self._errors),
+                    name="act-report-writer",
+                    daemon=True,
+                )
+                thread.start()
+                self._finalizer = weakref.finalize(
+                    self, _stop_writer, self._queue, thread
+                )
+        self._queue.put((export_file, build))
+
+    def flush(self) -> None:
+        """
+        Wait until every submitted report is written.
+
+        Raises:
+            Exception: The first error raised while writing the reports since the last flush.
+        """
+        self._queue.join()
+        if self._errors:
+            errors = list(self._errors)
+            self._errors.clear()
+            raise errors[0]
+
+    def close(self) -> None:
+        """
+        Write the submitted reports and stop the writer thread. A later submit starts a new thread.
+
+        Raises:
+            Exception: The first error raised while writing the reports since the last flush.
+        """
+        with self._lock:
+            finalizer, self._finalizer = self._finalizer, None
+        if finalizer is not None:
+            finalizer()
+        self.flush()
+
+    def __getstate__(self) -> dict:
+        return dict(max_pending=self.max_pending)
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["max_pending"])
+
+
+class JSONLinesReportStream:
+    """
+    Writes each report as one JSON object per line.
+
+    Attributes:
+        handle: The writable text file handle.
+        n_reports (int): The number of reports written.
+    """
+
+    def __init__(self, handle) -> None:
+        self.handle = handle
+        self.n_reports = 0
+
+    def write(self, report: dict) -> None:
+        """Write a report (see build_report), with any additional fields (ex., the bill of materials file)"""
+        self.handle.write(json.dumps(report) + "\n")
+        self.n_reports += 1
+
+
+class CSVReportStream:
+    """
+    Writes reports as rows of a CSV file with a fixed header.
+
+    Each report is written as one row per carbon amount: its total (section total), its carbon by source type
+    (section result_by_category) and the carbon of each device by source type (sections silicon_results,
+    materials_results and passives_results). Every row repeats the index of the report, its query settings and
+    the additional fields given by keys. Carbon amounts are split into their magnitude and unit.
+
+    Attributes:
+        handle: The writable text file handle.
+        keys (tuple): Additional report fields written as columns (ex., bom).
+        n_reports (int): The number of reports written.
+    """
+
+    def __init__(self, handle, keys: tuple = ()) -> None:
+        self.handle = handle
+        self.keys = tuple(keys)
+        self.n_reports = 0
+        self._writer = csv.writer(handle)
+        self._writer.writerow(
+            [
+                "report",
+                *self.keys,
+                "report_generated",
+                *QUERY_SETTINGS,
+                "section",
+                "device",
+                "source_type",
+                "carbon",
+                "unit",
+            ]
+        )
+
+    def write(self, report: dict) -> None:
+        """Write a report (see build_report), with any additional fields given by keys"""
+        settings = report["query_settings"]
+        prefix = [
+            self.n_reports,
+            *(report.get(key, "") for key in self.keys),
+            report["report_generated"],
+            *(settings[name] for name in QUERY_SETTINGS),
+        ]
+        rows = [("total", "", "", report["total_carbon"])]
+        rows.extend(
+            ("result_by_category", "", src, amount)
+            for src, amount in report["result_by_category"].items()
+        )
+        for section, devices in report["result_by_device"].items():
+            rows.extend(
+                (section, dev, src, amount)
+                for dev, amounts in devices.items()
+                for src, amount in amounts.items()
+            )
+        self._writer.writerows(
+            [*prefix, section, dev, src, *amount.split(" ", 1)]
+            for section, dev, src, amount in rows
+        )
+        self.n_reports += 1
+
+
+def open_report_stream(handle, format: str = None, keys: tuple = ()):
+    """
+    Create a report stream writing to a file handle.
+
+    Args:
+        handle: A writable text file handle (open CSV files with newline="").
+        format (str, optional): One of the STREAM_FORMATS. Defaults to the extension of the file name of the handle.
+        keys (tuple, optional): Additional report fields written as columns of CSV streams. Defaults to none.
+
+    Returns:
+        The JSONLinesReportStream or CSVReportStream.
+    """
+    if format is None:
+        format = os.path.splitext(getattr(handle, "name", ""))[1].lstrip(".")
+    if format == "jsonl":
+        return JSONLinesReportStream(handle)
+    if format == "csv":
+        return CSVReportStream(handle, keys)
+    raise ValueError(
+        f"Unknown report stream format {format}. Options: {STREAM_FORMATS}"
+    )
@@ -0,0 +1,275 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+Uniform sample generators in [0, 1)^dims for uncertainty propagation
+- Samples are addressed by index range so any chunk of a design can be generated independently in a worker
+- Low discrepancy sequences (Halton, Sobol) and Latin hypercube designs cover the unit cube more evenly
+  than independent random samples and converge faster for smooth carbon models
+- Every sampler only uses numpy
+"""
+
+import functools
+import math
+import os
+
+import numpy as np
+
+"""Number of bits of the digits of Sobol samples."""
+SOBOL_BITS = 52
+
+"""Direction numbers of the Sobol sequence in the format of S. Joe and F. Y. Kuo (first rows of new-joe-kuo-6.21201)."""
+SOBOL_DIRECTIONS_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "sobol_directions.txt"
+)
+
+
+class Sampler:
+    """
+    Base class for uniform sample generators.
+
+    Attributes:
+        dims (int): The number of dimensions of each sample.
+        n_samples (int): The total number of samples of the design.
+        seed (np.random.SeedSequence): The root seed of the sampler randomization.
+    """
+
+    def __init__(self, dims: int, n_samples: int, seed=None) -> None:
+        self.dims = dims
+        self.n_samples = n_samples
+        self.seed = np.random.SeedSequence(seed)
+
+    def chunk_seeds(self, n_chunks: int) -> list:
+        """Independent seeds for each chunk of samples"""
+        return self.seed.spawn(n_chunks)
+
+    def sample(self, start: int, stop: int, seed) -> np.ndarray:
+        """
+        Generate the samples with indices start to stop.
+
+        Args:
+            start (int): Index of the first sample.
+            stop (int): Index after the last sample.
+            seed (np.random.SeedSequence): The seed of this chunk (see chunk_seeds).
+
+        Returns:
+            np.ndarray: Uniform samples of shape (stop - start, dims).
+        """
+        raise NotImplementedError
+
+
+class RandomSampler(Sampler):
+    """Independent uniform random samples drawn from a separate random stream per chunk"""
+
+    def sample(self, start, stop, seed):
+        return np.random.default_rng(seed).random((stop - start, self.dims))
+
+
+class LatinHypercubeSampler(Sampler):
+    """
+    Latin hypercube design: each dimension has exactly one sample in each of n_samples equal strata.
+
+    The design couples every sample so it is generated once for all n_samples.
+    """
+
+    def __init__(self, dims: int, n_samples: int, seed=None) -> None:
+        super().__init__(dims, n_samples, seed)
+        rng = np.random.default_rng(self.seed)
+        strata = np.argsort(rng.random((dims, n_samples)), axis=1).T
+        self.design = (strata + rng.random((n_samples, dims))) / n_samples
+
+    def sample(self, start, stop, seed):
+        return self.design[start:stop]
+
+
+def first_primes(n: int) -> list:
+    """The first n prime numbers"""
+    primes = []
+    candidate = 2
+    while len(primes) < n:
+        if all(candidate % p for p in primes if p * p <= candidate):
+            primes.append(candidate)
+        candidate += 1
+    return primes
+
+
+def radical_inverse(indices: np.ndarray, base: int) -> np.ndarray:
+    """Van der Corput radical inverse of integer indices in the given base"""
+    indices = np.array(indices, dtype=np.int64)
+    result = np.zeros(indices.shape)
+    scale = 1.0 / base
+    while np.any(indices > 0):
+        result += scale * (indices % base)
+        indices //= base
+        scale /= base
+    return result
+
+
+class HaltonSampler(Sampler):
+    """
+    Halton sequence with one prime base per dimension.
+
+    With scramble, each digit of the radical inverse of every dimension is mapped through its own random
+    permutation of the digits of the base (digit-permutation scrambling), which breaks the correlation between
+    dimensions of high dimension Halton sequences so independent seeds give independent unbiased estimates.
+    """
+
+    def __init__(
+        self, dims: int, n_samples: int, seed=None, scramble: bool = True
+    ) -> None:
+        super().__init__(dims, n_samples, seed)
+        self.bases = first_primes(dims)
+        self.permutations = None
+        if scramble:
+            rng = np.random.default_rng(self.seed)
+            # permute enough digits to reach double precision
+            self.permutations = [
+                np.stack(
+                    [
+                        rng.permutation(b)
+                        for _ in range(math.ceil(np.finfo(float).nmant / math.log2(b)))
+                    ]
+                )
+                for b in self.bases
+            ]
+
+    def sample(self, start, stop, seed):
+        indices = np.arange(start, stop)
+        if self.permutations is None:
+            points = [radical_inverse(indices, b) for b in self.bases]
+        else:
+            points = [
+                scrambled_radical_inverse(indices, b, p)
+                for b, p in zip(self.bases, self.permutations)
+            ]
+        return np.stack(points, axis=-1)
+
+
+def scrambled_radical_inverse(
+    indices: np.ndarray, base: int, permutations: np.ndarray
+) -> np.ndarray:
+    """Radical inverse of integer indices with the k-th digit mapped through permutations[k]"""
+    indices = np.array(indices, dtype=np.int64)
+    result = np.zeros(indices.shape)
+    scale = 1.0 / base
+    for permutation in permutations:
+        result += scale * permutation[indices % base]
+        indices //= base
+        scale /= base
+    return np.minimum(result, 1.0 - np.finfo(float).epsneg)
+
+
+@functools.lru_cache(maxsize=None)
+def load_sobol_directions() -> tuple:
+    """
+    Load the primitive polynomials and initial direction numbers of each Sobol dimension after the first.
+
+    Returns:
+        tuple: The degree, polynomial coefficients (as an integer with one bit per coefficient) and initial
+            direction numbers of each dimension.
+    """
+    directions = []
+    with open(SOBOL_DIRECTIONS_FILE) as handle:
+        next(handle)
+        for line in handle:
+            _, degree, coefficients, *initial = map(int, line.split())
+            directions.append((degree, coefficients, tuple(initial)))
+    return tuple(directions)
+
+
+def sobol_directions(dims: int) -> np.ndarray:
+    """
+    Direction numbers of the first dims dimensions of the Sobol sequence.
+
+    Returns:
+        np.ndarray: The direction numbers as SOBOL_BITS bit integers of shape (dims, SOBOL_BITS).
+    """
+    table = load_sobol_directions()
+    if not 0 < dims <= len(table) + 1:
+        raise ValueError(
+            f"Sobol samples have 1 to {len(table) + 1} dimensions. Got {dims}."
+        )
+    # the first dimension is the van der Corput sequence in base 2
+    directions = [[1 << (SOBOL_BITS - 1 - k) for k in range(SOBOL_BITS)]]
+    for degree, coefficients, initial in table[: dims - 1]:
+        m = list(initial)
+        for k in range(degree, SOBOL_BITS):
+            value = m[k - degree] ^ (m[k - degree] << degree)
+            for j in range(1, degree):
+                if (coefficients >> (degree - 1 - j)) & 1:
+                    value ^= m[k - j] << j
+            m.append(value)
+        directions.append([m[k] << (SOBOL_BITS - 1 - k) for k in range(SOBOL_BITS)])
+    return np.array(directions, dtype=np.uint64)
+
+
+class SobolSampler(Sampler):
+    """
+    Sobol sequence with the Joe-Kuo direction numbers. Use a power of 2 number of samples for balanced designs.
+
+    With scramble, the sequence is randomized with a random linear matrix scrambling of the direction numbers
+    and a random digital shift, which keeps the balance of the design so independent seeds give independent
+    unbiased estimates.
+    """
+
+    def __init__(
+        self, dims: int, n_samples: int, seed=None, scramble: bool = True
+    ) -> None:
+        super().__init__(dims, n_samples, seed)
+        directions = sobol_directions(dims)
+        self.shift = np.zeros(dims, dtype=np.uint64)
+        if scramble:
+            rng = np.random.default_rng(self.seed)
+            # random lower triangular matrices with a unit diagonal over the digits of each dimension
+            lower = np.tril(rng.integers(0, 2, (dims, SOBOL_BITS, SOBOL_BITS)), -1)
+            lower[:, np.arange(SOBOL_BITS), np.arange(SOBOL_BITS)] = 1
+            digits = (
+                directions[:, :, None]
+                >> np.arange(SOBOL_BITS - 1, -1, -1, dtype=np.uint64)
+            ) & np.uint64(1)
+            scrambled = np.einsum("dkl,djl->djk", lower, digits.astype(np.int64)) % 2
+            weights = np.uint64(1) << np.arange(SOBOL_BITS - 1, -1, -1, dtype=np.uint64)
+            directions = np.bitwise_or.reduce(
+                scrambled.astype(np.uint64) * weights, axis=-1
+            )
+            self.shift = rng.integers(0, 1 << SOBOL_BITS, dims, dtype=np.uint64)
+        self.directions = directions
+
+    def sample(self, start, stop, seed):
+        # the point of index i is the XOR of the direction numbers of the set bits of its Gray code
+        indices = np.arange(start, stop, dtype=np.uint64)
+        gray = indices ^ (indices >> np.uint64(1))
+        points = np.broadcast_to(self.shift, (len(indices), self.dims)).copy()
+        for bit in range(int(stop).bit_length()):
+            mask = (gray >> np.uint64(bit)) & np.uint64(1)
+            points ^= mask[:, None] * self.directions[:, bit]
+        return points.astype(float) * 2.0**-SOBOL_BITS
+
+
+"""Samplers by the name used on the command line."""
+SAMPLERS = dict(
+    random=RandomSampler,
+    lhs=LatinHypercubeSampler,
+    halton=HaltonSampler,
+    sobol=SobolSampler,
+)
+
+
+def get_sampler(name: str, dims: int, n_samples: int, seed=None) -> Sampler:
+    """
+    Create a sampler by name.
+
+    Args:
+        name (str): One of SAMPLERS.
+        dims (int): The number of dimensions of each sample.
+        n_samples (int): The total number of samples.
+        seed (int, optional): Seed of the sampler randomization.
+
+    Returns:
+        Sampler: The sampler.
+    """
+    if name not in SAMPLERS:
+        raise ValueError(f"Sampler {name} must be one of {list(SAMPLERS)}.")
+    return SAMPLERS[name](dims, n_samples, seed)
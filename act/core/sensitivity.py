@@ -0,0 +1,409 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+Global sensitivity analysis of the total carbon of a bill of materials
+- By default every numeric field of the bill of materials and every operating parameter is varied uniformly
+  within a relative spread around its value (see default_sensitivity_spec)
+- Parameters can also be given as an uncertainty spec (see uncertainty.parse_distribution), including
+  categorical parameters such as processes or fab locations
+- Sobol indices use the Saltelli (first order) and Jansen (total order) estimators over N * (dims + 2) samples
+- Morris screening ranks parameters by their mean absolute elementary effect over N * (dims + 1) samples
+- All samples are evaluated in vectorized chunks through ACTModel.batch_analysis
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pint
+
+from .bom import load_bom, MATERIALS, PASSIVES, SILICON
+from .common import ComponentCategory, DEFAULT_OP_LOCATION, ModelType
+from .sampling import get_sampler
+from .sweep import run_chunks
+from .uncertainty import DEFAULT_CHUNK_SIZE, MonteCarlo, Uniform
+from .units import CARBON_UNIT, W, year
+
+"""Default relative spread of each parameter around its value."""
+DEFAULT_SPREAD = 0.2
+
+"""Parameters that are fractions and cannot exceed 1."""
+FRACTION_FIELDS = ("fab_yield", "duty_cycle")
+
+
+def numeric_parameters(bom, op_args: dict) -> dict:
+    """
+    List the numeric parameters of a bill of materials and its operating parameters.
+
+    Args:
+        bom (BOM): The bill of materials.
+        op_args (dict): The operating parameters (op_power, duty_cycle, hw_lifetime).
+
+    Returns:
+        dict: The value of each numeric parameter by name (ex., silicon.cpu.area). Parameters with a value of
+            zero do not contribute to the carbon and are skipped.
+    """
+    values = dict()
+    for name, spec in bom.silicon.items():
+        if spec.model is ModelType.LOGIC:
+            fields = ["area"]
+        elif spec.model is ModelType.MANUAL:
+            fields = ["carbon"]
+        else:
+            fields = ["capacity"]
+        for field in [*fields, "fab_yield", "n_ics"]:
+            values[f"{SILICON}.{name}.{field}"] = getattr(spec, field)
+    for name, spec in bom.passives.items():
+        for field in ["weight", "quantity"]:
+            values[f"{PASSIVES}.{name}.{field}"] = getattr(spec, field)
+    for name, spec in bom.materials.items():
+        if spec.category is ComponentCategory.PCB:
+            field = "area"
+        elif spec.category is ComponentCategory.BATTERY:
+            field = "capacity"
+        else:
+            field = "weight"
+        values[f"{MATERIALS}.{name}.{field}"] = getattr(spec, field)
+    for name in ["op_power", "duty_cycle", "hw_lifetime"]:
+        values[name] = op_args[name]
+
+    def _is_zero(value):
+        return value is None or (
+            value.magnitude == 0 if isinstance(value, pint.Quantity) else value == 0
+        )
+
+    return {name: value for name, value in values.items() if not _is_zero(value)}
+
+
+def default_sensitivity_spec(bom, op_args: dict, spread: float = DEFAULT_SPREAD):
+    """
+    Vary every numeric parameter uniformly within a relative spread around its value.
+
+    Args:
+        bom (BOM): The bill of materials.
+        op_args (dict): The operating parameters (op_power, duty_cycle, hw_lifetime).
+        spread (float, optional): The relative spread. Defaults to DEFAULT_SPREAD.
+
+    Returns:
+        dict: The distribution of each parameter by name.
+    """
+    spec = dict()
+    for name, value in numeric_parameters(bom, op_args).items():
+        unit = value.units if isinstance(value, pint.Quantity) else None
+        value = value.magnitude if isinstance(value, pint.Quantity) else float(value)
+        high = value * (1 + spread)
+        if name.rpartition(".")[2] in FRACTION_FIELDS:
+            high = min(high, 1.0)
+        spec[name] = Uniform(low=value * (1 - spread), high=high, unit=unit)
+    return spec
+
+
+@dataclass
+class SobolIndices:
+    """
+    First order and total Sobol indices of each parameter.
+
+    Attributes:
+        names (list[str]): The parameter names.
+        first_order (np.ndarray): Fraction of the variance explained by each parameter alone.
+        total_order (np.ndarray): Fraction of the variance explained by each parameter and its interactions.
+        first_order_conf (np.ndarray): Half width of the bootstrapped 95% confidence interval of first_order.
+        total_order_conf (np.ndarray): Half width of the bootstrapped 95% confidence interval of total_order.
+    """
+
+    names: list
+    first_order: np.ndarray
+    total_order: np.ndarray
+    first_order_conf: np.ndarray
+    total_order_conf: np.ndarray
+
+    def ranking(self) -> list:
+        """Parameter names from the most to the least influential by total index"""
+        return [self.names[i] for i in np.argsort(-self.total_order, kind="stable")]
+
+    def to_dict(self) -> dict:
+        """Summarize the indices by parameter in ranking order for reporting"""
+        index = {name: i for i, name in enumerate(self.names)}
+        return {
+            name: dict(
+                first_order=float(self.first_order[index[name]]),
+                first_order_conf=float(self.first_order_conf[index[name]]),
+                total_order=float(self.total_order[index[name]]),
+                total_order_conf=float(self.total_order_conf[index[name]]),
+            )
+            for name in self.ranking()
+        }
+
+
+@dataclass
+class MorrisEffects:
+    """
+    Morris elementary effects of each parameter on the total carbon.
+
+    Effects are changes of the total carbon per change of a parameter over its full range.
+
+    Attributes:
+        names (list[str]): The parameter names.
+        mu (pint.Quantity): Mean elementary effect of each parameter.
+        mu_star (pint.Quantity): Mean absolute elementary effect of each parameter (overall influence).
+        sigma (pint.Quantity): Standard deviation of the elementary effects (non-linearity and interactions).
+    """
+
+    names: list
+    mu: pint.Quantity
+    mu_star: pint.Quantity
+    sigma: pint.Quantity
+
+    def ranking(self) -> list:
+        """Parameter names from the most to the least influential by mu_star"""
+        order = np.argsort(-self.mu_star.magnitude, kind="stable")
+        return [self.names[i] for i in order]
+
+    def to_dict(self, weight_unit) -> dict:
+        """Summarize the effects in weight_unit by parameter in ranking order for reporting"""
+        index = {name: i for i, name in enumerate(self.names)}
+        return {
+            name: dict(
+                mu=str(self.mu[index[name]].to(weight_unit)),
+                mu_star=str(self.mu_star[index[name]].to(weight_unit)),
+                sigma=str(self.sigma[index[name]].to(weight_unit)),
+            )
+            for name in self.ranking()
+        }
+
+
+def sobol_indices(f_a, f_b, f_ab, n_bootstrap: int = 100, seed=None) -> tuple:
+    """
+    Estimate first order (Saltelli 2010) and total (Jansen 1999) Sobol indices.
+
+    Args:
+        f_a (np.ndarray): Model outputs for the samples of matrix A, shape (N,).
+        f_b (np.ndarray): Model outputs for the samples of matrix B, shape (N,).
+        f_ab (np.ndarray): Model outputs for A with column i taken from B, shape (dims, N).
+        n_bootstrap (int, optional): Number of bootstrap resamples for the confidence intervals. Defaults to 100.
+        seed (optional): Seed of the bootstrap resampling.
+
+    Returns:
+        tuple: The first order and total indices and the half widths of their 95% confidence intervals.
+    """
+
+    def _estimate(a, b, ab):
+        # center the outputs which reduces the variance of the first order estimator
+        outputs = np.concatenate([a, b], axis=-1)
+        mean = outputs.mean(axis=-1, keepdims=True)
+        a, b, ab = a - mean, b - mean, ab - mean[..., None, :]
+        variance = np.var(outputs, axis=-1)
+        variance = np.where(variance > 0, variance, np.inf)[..., None]
+        first = np.mean(b[..., None, :] * (ab - a[..., None, :]), axis=-1) / variance
+        total = 0.5 * np.mean((a[..., None, :] - ab) ** 2, axis=-1) / variance
+        return first, total
+
+    first_order, total_order = _estimate(f_a, f_b, f_ab)
+
+    # bootstrap all resamples at once
+    rng = np.random.default_rng(seed)
+    index = rng.integers(0, len(f_a), size=(n_bootstrap, len(f_a)))
+    first_boot, total_boot = _estimate(
+        f_a[index], f_b[index], np.moveaxis(f_ab[:, index], 0, 1)
+    )
+    z = 1.959963984540054
+    return (
+        first_order,
+        total_order,
+        z * first_boot.std(axis=0, ddof=1),
+        z * total_boot.std(axis=0, ddof=1),
+    )
+
+
+def morris_design(dims: int, n_trajectories: int, levels: int = 4, seed=None):
+    """
+    Generate Morris one-at-a-time trajectories on a grid with the given number of levels.
+
+    Args:
+        dims (int): The number of parameters.
+        n_trajectories (int): The number of trajectories.
+        levels (int, optional): The (even) number of grid levels. Defaults to 4.
+        seed (optional): Seed of the design.
+
+    Returns:
+        tuple: The samples of shape (n_trajectories, dims + 1, dims), the parameter changed at each step of shape
+            (n_trajectories, dims) and the signed step size of each parameter of shape (n_trajectories, dims).
+    """
+    rng = np.random.default_rng(seed)
+    delta = levels / (2 * (levels - 1))
+    low = rng.integers(0, levels // 2, size=(n_trajectories, dims)) / (levels - 1)
+    steps = np.where(rng.random((n_trajectories, dims)) < 0.5, -delta, delta)
+    order = np.argsort(rng.random((n_trajectories, dims)), axis=1)
+
+    rows = np.arange(n_trajectories)
+    points = np.empty((n_trajectories, dims + 1, dims))
+    points[:, 0] = np.where(steps > 0, low, low + delta)
+    for k in range(dims):
+        points[:, k + 1] = points[:, k]
+        points[rows, k + 1, order[:, k]] += steps[rows, order[:, k]]
+    return np.clip(points, 0.0, 1.0), order, steps
+
+
+class _TotalCarbon:
+    """Evaluate the total carbon of chunks of uniform samples (see sweep.run_chunks)"""
+
+    def __init__(self, monte_carlo: MonteCarlo) -> None:
+        self.monte_carlo = monte_carlo
+
+    def evaluate(self, model, bom, u):
+        carbon, _ = self.monte_carlo.evaluate_samples(model, bom, u)
+        return carbon.values.sum(axis=-1)
+
+
+class SensitivityAnalysis:
+    """
+    Global sensitivity analysis of the total carbon of a bill of materials.
+
+    Attributes:
+        bom_file (str): The bill of materials file to analyze.
+        spec (dict): Distributions of the analyzed parameters. Defaults to every numeric parameter (see default_sensitivity_spec).
+        spread (float): Relative spread of the default parameter distributions.
+        op_args (dict): Operating parameters used for any operating parameter that is not analyzed.
+    """
+
+    def __init__(
+        self,
+        bom_file: str,
+        spec: dict = None,
+        spread: float = DEFAULT_SPREAD,
+        op_power=0 * W,
+        op_ci=DEFAULT_OP_LOCATION,
+        duty_cycle: float = 1.0,
+        hw_lifetime=2 * year,
+    ) -> None:
+        """
+        Initializes a new instance of the SensitivityAnalysis class.
+
+        Args:
+            bom_file (str): The bill of materials file to analyze.
+            spec (dict, optional): Parameter distributions as in an uncertainty spec. Defaults to every numeric parameter.
+            spread (float, optional): Relative spread of the default parameter distributions. Defaults to DEFAULT_SPREAD.
+            op_power: Operating power of the device
+            op_ci: Operational carbon intensity setting
+            duty_cycle: Device utilization rate between 0 and 1
+            hw_lifetime: Expected hardware life cycle
+        """
+        self.bom_file = bom_file
+        self.spec = spec
+        self.spread = spread
+        self.op_args = dict(
+            op_power=op_power,
+            op_ci=op_ci,
+            duty_cycle=duty_cycle,
+            hw_lifetime=hw_lifetime,
+        )
+
+    def _prepare(self, model):
+        """Load the model and bill of materials and set up the sample evaluation"""
+        if model is None:
+            from ..act_model import ACTModel
+
+            model = ACTModel()
+        bom = load_bom(self.bom_file, model.materials_model.MaterialType)
+
+        spec = self.spec
+        if spec is None:
+            spec = default_sensitivity_spec(bom, self.op_args, self.spread)
+        return model, bom, MonteCarlo(self.bom_file, spec, **self.op_args)
+
+    def _evaluate(self, model, bom, monte_carlo, u, workers, chunk_size):
+        """Evaluate the total carbon in CARBON_UNIT of uniform samples of shape (n, dims)"""
+        chunks = ((u[i : i + chunk_size],) for i in range(0, len(u), chunk_size))
+        engine = _TotalCarbon(monte_carlo)
+        return np.concatenate(list(run_chunks(engine, chunks, workers, model, bom)))
+
+    def sobol(
+        self,
+        n_samples: int,
+        seed=None,
+        sampler: str = "random",
+        workers: int = 0,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        model=None,
+    ) -> SobolIndices:
+        """
+        Estimate the first order and total Sobol indices of every parameter.
+
+        Args:
+            n_samples (int): Number of base samples N. The model is evaluated N * (dims + 2) times.
+            seed (int, optional): Seed of the samples.
+            sampler (str, optional): Uniform sample generator from sampling.SAMPLERS. Defaults to random.
+            workers (int, optional): Number of worker processes. Defaults to 0 to evaluate in this process.
+            chunk_size (int, optional): Number of samples per chunk. Defaults to DEFAULT_CHUNK_SIZE.
+            model (ACTModel, optional): The model to evaluate with. Defaults to a new ACTModel.
+
+        Returns:
+            SobolIndices: The Sobol indices of each parameter.
+        """
+        model, bom, monte_carlo = self._prepare(model)
+        dims = monte_carlo.dims
+
+        sampler = get_sampler(sampler, 2 * dims, n_samples, seed)
+        u = sampler.sample(0, n_samples, sampler.chunk_seeds(1)[0])
+        a, b = u[:, :dims], u[:, dims:]
+        ab = np.repeat(a[None], dims, axis=0)
+        ab[np.arange(dims), :, np.arange(dims)] = b.T
+
+        f = self._evaluate(
+            model,
+            bom,
+            monte_carlo,
+            np.concatenate([a, b, ab.reshape(-1, dims)]),
+            workers,
+            chunk_size,
+        )
+        f_a, f_b = f[:n_samples], f[n_samples : 2 * n_samples]
+        f_ab = f[2 * n_samples :].reshape(dims, n_samples)
+        return SobolIndices(
+            list(monte_carlo.names), *sobol_indices(f_a, f_b, f_ab, seed=seed)
+        )
+
+    def morris(
+        self,
+        n_trajectories: int,
+        levels: int = 4,
+        seed=None,
+        workers: int = 0,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        model=None,
+    ) -> MorrisEffects:
+        """
+        Screen every parameter by its Morris elementary effects.
+
+        Args:
+            n_trajectories (int): Number of trajectories N. The model is evaluated N * (dims + 1) times.
+            levels (int, optional): The (even) number of grid levels of each parameter. Defaults to 4.
+            seed (int, optional): Seed of the trajectories.
+            workers (int, optional): Number of worker processes. Defaults to 0 to evaluate in this process.
+            chunk_size (int, optional): Number of samples per chunk. Defaults to DEFAULT_CHUNK_SIZE.
+            model (ACTModel, optional): The model to evaluate with. Defaults to a new ACTModel.
+
+        Returns:
+            MorrisEffects: The elementary effect statistics of each parameter.
+        """
+        model, bom, monte_carlo = self._prepare(model)
+        dims = monte_carlo.dims
+
+        points, order, steps = morris_design(dims, n_trajectories, levels, seed)
+        f = self._evaluate(
+            model, bom, monte_carlo, points.reshape(-1, dims), workers, chunk_size
+        )
+        f = f.reshape(n_trajectories, dims + 1)
+
+        rows = np.arange(n_trajectories)[:, None]
+        effects = np.empty((n_trajectories, dims))
+        effects[rows, order] = np.diff(f, axis=1) / steps[rows, order]
+        sigma = effects.std(axis=0, ddof=1) if n_trajectories > 1 else np.zeros(dims)
+        return MorrisEffects(
+            list(monte_carlo.names),
+            effects.mean(axis=0) * CARBON_UNIT,
+            np.abs(effects).mean(axis=0) * CARBON_UNIT,
+            sigma * CARBON_UNIT,
+        )
@@ -0,0 +1,343 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+Long-running query server that keeps the ACT model resident
+- The server answers HTTP requests on a TCP port or a Unix socket with asyncio
+- POST /carbon with a JSON query (or a list of queries) returns the report of each query as JSON
+- GET /health returns the server status and statistics
+- Queries arriving together are evaluated in batches on a single model thread, and the number of queries
+  in flight is bounded so a burst of requests waits instead of exhausting the server
+
+A query is a JSON object with a bill of materials, either inline (bom, with the silicon, passives and materials
+sections of a bill of materials file) or as a file (bom_file), and optional operating parameters op_power (ex., "10 W"),
+op_ci, duty_cycle and hw_lifetime (ex., "3 years"). Set devices to false to leave the carbon of each device out of the report.
+"""
+
+import asyncio
+import concurrent.futures
+import json
+import os
+import time
+
+from .bom import BOM, load_bom
+from .cache import LRUCache
+from .common import DEFAULT_OP_LOCATION, get_src_or_loc
+from .logger import log
+from .report import build_report, EXPORT_NONE
+from .units import parse_quantity
+
+"""Default TCP port of the server."""
+DEFAULT_PORT = 8765
+
+"""Default maximum number of queries evaluated together."""
+DEFAULT_MAX_BATCH = 64
+
+"""Default time in seconds to wait for more queries before evaluating a batch."""
+DEFAULT_BATCH_WINDOW = 0.002
+
+"""Default maximum number of queries in flight."""
+DEFAULT_MAX_CONCURRENCY = 256
+
+"""Default number of bill of materials files kept loaded."""
+DEFAULT_BOM_CACHE_SIZE = 1024
+
+"""Largest accepted request body in bytes."""
+MAX_BODY_SIZE = 16 * 1024 * 1024
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large"}
+
+
+class QueryError(ValueError):
+    """A query that cannot be evaluated"""
+
+
+class CarbonServer:
+    """
+    Answers carbon queries with a resident ACTModel.
+
+    Attributes:
+        model (ACTModel): The model every query is evaluated with.
+        max_batch (int): The maximum number of queries evaluated together.
+        batch_window (float): The time in seconds to wait for more queries before evaluating a batch.
+        max_concurrency (int): The maximum number of queries in flight.
+        stats (dict): The number of requests, queries, batches and failed queries served.
+    """
+
+    def __init__(
+        self,
+        model=None,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        batch_window: float = DEFAULT_BATCH_WINDOW,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        bom_cache_size: int = DEFAULT_BOM_CACHE_SIZE,
+    ) -> None:
+        """
+        Initializes a new instance of the CarbonServer class.
+
+        Args:
+            model (ACTModel, optional): The model to evaluate with. Defaults to a new ACTModel.
+            max_batch (int, optional): The maximum number of queries evaluated together. Defaults to DEFAULT_MAX_BATCH.
+            batch_window (float, optional): The time in seconds to wait for more queries. Defaults to DEFAULT_BATCH_WINDOW.
+            max_concurrency (int, optional): The maximum number of queries in flight. Defaults to DEFAULT_MAX_CONCURRENCY.
+            bom_cache_size (int, optional): The number of bill of materials files kept loaded. Defaults to DEFAULT_BOM_CACHE_SIZE.
+        """
+        if model is None:
+            from ..act_model import ACTModel
+
+            model = ACTModel(export_mode=EXPORT_NONE)
+        self.model = model
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.max_concurrency = max_concurrency
+        self.bom_cache = LRUCache(bom_cache_size)
+        self.stats = dict(requests=0, queries=0, batches=0, errors=0)
+
+        # the model is not thread safe, so every batch is evaluated on the same thread
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="act-server"
+        )
+        self._queue = None
+        self._semaphore = None
+        self._batcher = None
+        self._servers = []
+        self._socket = None
+
+    def _load_bom(self, bom_file: str) -> BOM:
+        """Load a bill of materials file, reusing it until the file changes"""
+        path = os.path.abspath(bom_file)
+        key = (path, os.stat(path).st_mtime_ns)
+        bom = self.bom_cache.get(key)
+        if bom is None:
+            bom = load_bom(path, self.model.materials_model.MaterialType)
+            self.bom_cache.put(key, bom)
+        return bom
+
+    def evaluate(self, query: dict) -> dict:
+        """
+        Evaluate a single query.
+
+        Args:
+            query (dict): The query (see the module documentation).
+
+        Returns:
+            dict: The report of the query (see build_report), without the command line.
+
+        Raises:
+            QueryError: If the query is not valid or cannot be evaluated.
+        """
+        if not isinstance(query, dict):
+            raise QueryError(f"A query must be a JSON object. Got {query!r}")
+        try:
+            if "bom_file" in query:
+                bom = self._load_bom(query["bom_file"])
+            elif isinstance(query.get("bom"), dict):
+                bom = BOM(
+                    **query["bom"],
+                    material_type=self.model.materials_model.MaterialType,
+                )
+            else:
+                raise QueryError("A query needs a bom object or a bom_file.")
+
+            carbon = self.model.get_carbon(
+                bom,
+                op_power=parse_quantity(query.get("op_power", "0 W")),
+                op_ci=get_src_or_loc(query.get("op_ci", DEFAULT_OP_LOCATION)),
+                duty_cycle=float(query.get("duty_cycle", 1.0)),
+                hw_lifetime=parse_quantity(query.get("hw_lifetime", "2 years")),
+                export=EXPORT_NONE,
+            )
+            report = build_report(**self.model.report_data(carbon))
+        except QueryError:
+            raise
+        except Exception as e:
+            raise QueryError(f"{type(e).__name__}: {e}") from e
+
+        del report["cl_args"]
+        if not query.get("devices", True):
+            del report["result_by_device"]
+        return report
+
+    def evaluate_batch(self, queries: list) -> list:
+        """
+        Evaluate a batch of queries.
+
+        Returns:
+            list: The report of each query, or a dictionary with its error message.
+        """
+        results = []
+        for query in queries:
+            try:
+                results.append(self.evaluate(query))
+            except QueryError as e:
+                results.append(dict(error=str(e)))
+        return results
+
+    async def query(self, query) -> dict:
+        """
+        Queue a query for the next batch and wait for its result.
+
+        Returns:
+            dict: The report of the query, or a dictionary with its error message.
+        """
+        async with self._semaphore:
+            future = asyncio.get_running_loop().create_future()
+            await self._queue.put((query, future))
+            return await future
+
+    async def _run_batches(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            # collect the queries arriving within the batch window
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            queries = [query for query, _ in batch]
+            try:
+                results = await loop.run_in_executor(
+                    self._executor, self.evaluate_batch, queries
+                )
+            except Exception as e:
+                results = [dict(error=f"{type(e).__name__}: {e}")] * len(batch)
+
+            # the statistics are only updated on the event loop thread
+            self.stats["batches"] += 1
+            self.stats["queries"] += len(batch)
+            self.stats["errors"] += sum("error" in result for result in results)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    async def _respond(self, writer, status: int, body, keep_alive: bool) -> None:
+        data = json.dumps(body).encode()
+        headers = [
+            f"HTTP/1.1 {status} {_REASONS[status]}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(data)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode() + data)
+        await writer.drain()
+
+    async def handle(self, reader, writer) -> None:
+        """Serve the HTTP requests of a connection"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode("latin-1").split(" ", 2)
+                headers = dict()
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = (
+                    headers.get("connection", "").lower() != "close"
+                    and version.strip() == "HTTP/1.1"
+                )
+
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY_SIZE:
+                    await self._respond(
+                        writer, 413, dict(error="Request body too large."), False
+                    )
+                    break
+                body = await reader.readexactly(length) if length else b""
+                self.stats["requests"] += 1
+
+                status, response = await self._route(method, target, body)
+                await self._respond(writer, status, response, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError) as e:
+            log.debug(f"ACT server connection closed: {e}")
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, target: str, body: bytes) -> tuple:
+        path = target.split("?", 1)[0]
+        if method == "GET" and path == "/health":
+            return 200, dict(status="ok", **self.stats)
+        if method != "POST" or path != "/carbon":
+            return 404, dict(error=f"Unknown endpoint {method} {path}.")
+        try:
+            queries = json.loads(body)
+        except json.JSONDecodeError as e:
+            return 400, dict(error=f"Invalid JSON: {e}")
+
+        # a list of queries is answered with the list of their results
+        if isinstance(queries, list):
+            return 200, list(await asyncio.gather(*map(self.query, queries)))
+        result = await self.query(queries)
+        return (400 if "error" in result else 200), result
+
+    async def start(self, host: str = None, port: int = None, path: str = None) -> None:
+        """
+        Start listening for requests.
+
+        Args:
+            host (str, optional): The host to listen on over TCP.
+            port (int, optional): The TCP port to listen on (0 for any free port).
+            path (str, optional): The Unix socket to listen on, instead of or in addition to the TCP port.
+        """
+        self._queue = asyncio.Queue()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._batcher = asyncio.create_task(self._run_batches())
+        if path is not None:
+            self._servers.append(await asyncio.start_unix_server(self.handle, path))
+            self._socket = path
+            log.info(f"ACT server listening on {path}")
+        if port is not None:
+            server = await asyncio.start_server(self.handle, host, port)
+            self._servers.append(server)
+            for sock in server.sockets:
+                log.info(f"ACT server listening on {sock.getsockname()}")
+
+    @property
+    def addresses(self) -> list:
+        """The addresses the server listens on"""
+        return [sock.getsockname() for s in self._servers for sock in s.sockets]
+
+    async def close(self) -> None:
+        """Stop listening and stop the batch loop"""
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        self._servers = []
+        if self._socket is not None and os.path.exists(self._socket):
+            os.unlink(self._socket)
+            self._socket = None
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+            self._batcher = None
+
+    async def serve_forever(
+        self, host: str = None, port: int = None, path: str = None
+    ) -> None:
+        """Start the server and answer requests until cancelled"""
+        await self.start(host, port, path)
+        started = time.perf_counter()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await self.close()
+            log.info(
+                f"ACT server stopped after {time.perf_counter() - started:.0f}s and {self.stats['queries']} queries"
+            )
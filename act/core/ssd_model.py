@@ -4,11 +4,10 @@
 # LICENSE file in the root directory of this source tree.
 
 
-import yaml
-
+from .cache import DEFAULT_CACHE_SIZE
 from .common import ACT_ROOT, SSDProcess
-from .storage_model import StorageModel
-from .units import units
+from .storage_model import CPG_UNIT, StorageModel
+from .utils import load_model_table
 
 
 class SSDModel(StorageModel):
@@ -16,28 +15,24 @@ class SSDModel(StorageModel):
     A model for calculating SSD-related carbon emissions.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, cache_size=DEFAULT_CACHE_SIZE) -> None:
         """
         Initializes a new instance of the SSDModel class.
         """
         # Load the SSD storage model configuration
-        with open(f"{ACT_ROOT}/models/ssd/ssd_hynix.yaml", "r") as f:
-            ssd_model: dict[SSDProcess, units] = {
-                SSDProcess(k): units(v)
-                for k, v in yaml.load(f, Loader=yaml.FullLoader).items()
-            }
-        with open(f"{ACT_ROOT}/models/ssd/ssd_seagate.yaml", "r") as f:
-            ssd_model.update(
-                {
-                    SSDProcess(k): units(v)
-                    for k, v in yaml.load(f, Loader=yaml.FullLoader).items()
-                }
+        ssd_model = dict(
+            load_model_table(
+                f"{ACT_ROOT}/models/ssd/ssd_hynix.yaml", SSDProcess, CPG_UNIT
+            )
+        )
+        ssd_model.update(
+            load_model_table(
+                f"{ACT_ROOT}/models/ssd/ssd_seagate.yaml", SSDProcess, CPG_UNIT
             )
-        with open(f"{ACT_ROOT}/models/ssd/ssd_western.yaml", "r") as f:
-            ssd_model.update(
-                {
-                    SSDProcess(k): units(v)
-                    for k, v in yaml.load(f, Loader=yaml.FullLoader).items()
-                }
+        )
+        ssd_model.update(
+            load_model_table(
+                f"{ACT_ROOT}/models/ssd/ssd_western.yaml", SSDProcess, CPG_UNIT
             )
-        super().__init__(fab_model=ssd_model)
+        )
+        super().__init__(fab_model=ssd_model, cache_size=cache_size)
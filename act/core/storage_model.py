@@ -3,11 +3,17 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
-from .carbon import Carbon, SourceType
-from .common import CARBON_PER_IC_PACKAGE, DEFAULT_FAB_YIELD
+import pint
 
+from .carbon import Carbon, CarbonArray, SourceType
+from .common import DEFAULT_FAB_YIELD, PACKAGE_CARBON
+
+from .cache import DEFAULT_CACHE_SIZE, LRUCache
 from .logger import log
-from .units import byte
+from .units import byte, CARBON_UNIT, STORAGE_UNIT
+
+"""Canonical unit of the carbon per storage models."""
+CPG_UNIT = CARBON_UNIT / STORAGE_UNIT
 
 
 class StorageModel:
@@ -15,17 +21,21 @@ class StorageModel:
     A model for calculating storage-related carbon emissions.
 
     Attributes:
-        fab_model (dict): A dictionary representing the fabrication model.
+        fab_model (dict): A dictionary mapping processes to carbon per storage as floats in CPG_UNIT.
+        cpg_cache (LRUCache): Memoized carbon per storage by process and yield.
     """
 
-    def __init__(self, fab_model: dict) -> None:
+    def __init__(self, fab_model: dict, cache_size=DEFAULT_CACHE_SIZE) -> None:
         """
         Initializes a new instance of the StorageModel class.
 
         Args:
-            fab_model (dict): A dictionary representing the fabrication model.
+            fab_model (dict): A dictionary mapping processes to carbon per storage as floats in CPG_UNIT.
+            cache_size (int, optional): Number of memoized carbon per storage values. Defaults to DEFAULT_CACHE_SIZE.
         """
         self.fab_model = fab_model
+        self.process_type = type(next(iter(fab_model)))
+        self.cpg_cache = LRUCache(cache_size)
 
     def _check_process(self, process: str) -> None:
         """
@@ -59,7 +69,7 @@ class StorageModel:
             )
             exit(-1)
 
-    def get_cpg(self, process: str, fab_yield: float) -> float:
+    def get_cpg(self, process: str, fab_yield: float) -> pint.Quantity:
         """
         Calculates the carbon per gigabyte for a given process and fabrication yield.
 
@@ -68,11 +78,22 @@ class StorageModel:
             fab_yield (float): The fabrication yield.
 
         Returns:
-            float: The carbon per gigabyte.
+            pint.Quantity: The carbon per gigabyte.
         """
+        return self._cached_cpg(process, fab_yield) * CPG_UNIT
+
+    def _get_cpg(self, process: str, fab_yield: float) -> float:
+        """Calculates the carbon per storage as a float in CPG_UNIT"""
+        return self.fab_model[process] / fab_yield
+
+    def _cached_cpg(self, process: str, fab_yield: float) -> float:
+        """Calculates the carbon per storage as a float in CPG_UNIT, validating the arguments on every call"""
+        # validate before the lookup since equal keys (ex., 1 and 1.0) need not both be valid
         self._check_process(process)
         self._check_yield(fab_yield)
-        return self.fab_model[process] / fab_yield
+        return self.cpg_cache.lookup(
+            (process, fab_yield), lambda: self._get_cpg(process, fab_yield)
+        )
 
     def get_carbon(
         self,
@@ -93,11 +114,53 @@ class StorageModel:
         Returns:
             Carbon: The total carbon emissions.
         """
-        self._check_yield(fab_yield)
+        cpg = self._cached_cpg(process, fab_yield)
         if not capacity.check(byte):
             log.error(f"Capacity must have units of storage. Got {capacity}")
             exit(-1)
-        self._check_process(process)
-        return Carbon(
-            capacity * self.get_cpg(process, fab_yield), SourceType.FABRICATION
-        ) + Carbon(n_ics * CARBON_PER_IC_PACKAGE, SourceType.PACKAGING)
+        return Carbon._from_amounts(
+            {
+                SourceType.FABRICATION: capacity.m_as(STORAGE_UNIT) * cpg,
+                SourceType.PACKAGING: n_ics * PACKAGE_CARBON,
+            }
+        )
+
+    def get_carbon_batch(
+        self,
+        process,
+        capacity,
+        fab_yield=DEFAULT_FAB_YIELD,
+        n_ics=0,
+    ) -> CarbonArray:
+        """
+        Calculates the carbon emissions over arrays of storage design points.
+
+        Every argument may either be a scalar or an array and all arguments are broadcast against each other.
+
+        Args:
+            process: The process (or array of processes).
+            capacity: The capacity of the storage device with units of storage (ex., np.array([1, 2]) * GB).
+            fab_yield: The fabrication yield. Defaults to DEFAULT_FAB_YIELD.
+            n_ics: The number of ICs. Defaults to 0.
+
+        Returns:
+            CarbonArray: The carbon emissions for each design point.
+        """
+        from .batch import as_magnitude, map_keys
+
+        def _cpg(process):
+            return self._cached_cpg(self.process_type(process), 1.0)
+
+        fab_yield = as_magnitude(fab_yield)
+        if (fab_yield <= 0).any() or (fab_yield > 1).any():
+            log.error(
+                f"Fab yield must be a float greater than 0 up to 1.0. Got {fab_yield}."
+            )
+            exit(-1)
+
+        cpg = map_keys(_cpg, process) / fab_yield
+        fab_carbon = as_magnitude(capacity, STORAGE_UNIT) * cpg
+        pkg_carbon = as_magnitude(n_ics) * PACKAGE_CARBON
+        return CarbonArray._from_amounts(
+            {SourceType.FABRICATION: fab_carbon, SourceType.PACKAGING: pkg_carbon}
+        )
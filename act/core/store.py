@@ -0,0 +1,268 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+Columnar on-disk store for the design points of large sweeps
+- A store is a directory with a schema.json file and one raw binary array file per column
+- Parameter columns hold the value of each swept parameter: magnitudes in a fixed unit for quantities, floats
+  for plain numbers and integer codes into a list of categories for categorical parameters (ex., processes)
+- Carbon columns hold the carbon of each SourceType in CARBON_UNIT
+- Appends hold an exclusive lock on the store, so many processes can append to the same store
+- Columns are read back as read-only memory maps, without copying
+"""
+
+import json
+import os
+from enum import Enum
+
+import numpy as np
+import pint
+
+from .carbon import SOURCE_INDEX, SourceType
+from .units import CARBON_UNIT, units
+
+try:
+    import fcntl
+except ImportError:  # appends from several processes are not locked without fcntl
+    fcntl = None
+
+"""Format version of the store, bumped when the layout changes."""
+STORE_VERSION = 1
+
+SCHEMA_FILE = "schema.json"
+LOCK_FILE = ".lock"
+
+"""Column kinds."""
+QUANTITY = "quantity"
+NUMBER = "number"
+CATEGORY = "category"
+CARBON = "carbon"
+
+"""Data type of each column kind."""
+COLUMN_DTYPES = {QUANTITY: "<f8", NUMBER: "<f8", CATEGORY: "<i4", CARBON: "<f8"}
+
+
+def carbon_column(src: SourceType) -> str:
+    """The name of the carbon column of a SourceType"""
+    return f"carbon.{src.name}"
+
+
+def _category(value) -> str:
+    """The category name of a categorical value"""
+    return str(value.value) if isinstance(value, Enum) else str(value)
+
+
+class _StoreLock:
+    """Exclusive lock of a store, held across processes"""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def __enter__(self):
+        self._handle = open(self.path, "a")
+        if fcntl is not None:
+            fcntl.flock(self._handle, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if fcntl is not None:
+            fcntl.flock(self._handle, fcntl.LOCK_UN)
+        self._handle.close()
+
+
+class ResultStore:
+    """
+    A columnar store of evaluated design points.
+
+    Attributes:
+        path (str): The store directory.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Open a store, creating its directory if it does not exist.
+
+        Args:
+            path (str): The store directory.
+        """
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    @property
+    def schema(self) -> dict:
+        """The store schema: its version and the kind, data type, unit and categories of each column."""
+        try:
+            with open(os.path.join(self.path, SCHEMA_FILE)) as handle:
+                schema = json.load(handle)
+        except FileNotFoundError:
+            return dict(version=STORE_VERSION, columns=dict())
+        if schema.get("version") != STORE_VERSION:
+            raise ValueError(
+                f"Result store {self.path} has version {schema.get('version')}, expected {STORE_VERSION}."
+            )
+        return schema
+
+    @property
+    def columns(self) -> list:
+        """The names of the columns, parameter columns first."""
+        return list(self.schema["columns"])
+
+    def __len__(self) -> int:
+        return self._n_rows(self.schema)
+
+    def _column_file(self, name: str) -> str:
+        return os.path.join(self.path, f"{name}.bin")
+
+    def _n_rows(self, schema: dict) -> int:
+        # an interrupted append may leave some columns longer than others
+        sizes = [
+            os.path.getsize(self._column_file(name))
+            // np.dtype(column["dtype"]).itemsize
+            for name, column in schema["columns"].items()
+            if os.path.exists(self._column_file(name))
+        ]
+        return min(sizes) if len(sizes) == len(schema["columns"]) and sizes else 0
+
+    def _write_schema(self, schema: dict) -> None:
+        tmp_file = os.path.join(self.path, f"{SCHEMA_FILE}.{os.getpid()}")
+        with open(tmp_file, "w") as handle:
+            json.dump(schema, handle, indent=2)
+        os.replace(tmp_file, os.path.join(self.path, SCHEMA_FILE))
+
+    def _encode(self, name: str, values, schema: dict) -> np.ndarray:
+        """Encode the values of a parameter column, adding the column or its new categories to the schema"""
+        if isinstance(values, pint.Quantity):
+            column = dict(kind=QUANTITY, unit=str(values.units))
+        else:
+            values = np.asarray(values)
+            column = dict(kind=NUMBER if values.dtype.kind in "biuf" else CATEGORY)
+        column = schema["columns"].setdefault(name, column)
+        if column["kind"] == CATEGORY:
+            column.setdefault("categories", [])
+        elif column["kind"] != (
+            QUANTITY if isinstance(values, pint.Quantity) else NUMBER
+        ):
+            raise ValueError(
+                f"Parameter {name} does not match the {column['kind']} column of {self.path}."
+            )
+
+        if column["kind"] == QUANTITY:
+            return np.asarray(values.m_as(column["unit"]), dtype=float).reshape(-1)
+        if column["kind"] == NUMBER:
+            return values.astype(float).reshape(-1)
+
+        categories = column["categories"]
+        codes = {category: i for i, category in enumerate(categories)}
+        values = values.reshape(-1)
+        encoded = np.empty(len(values), dtype=np.int32)
+        for i, value in enumerate(values):
+            category = _category(value)
+            if category not in codes:
+                codes[category] = len(categories)
+                categories.append(category)
+            encoded[i] = codes[category]
+        return encoded
+
+    def append(self, points: dict, carbon) -> int:
+        """
+        Append design points and their carbon results.
+
+        Every append must have the same parameters. Appends from several processes are serialized by a lock on the store.
+
+        Args:
+            points (dict): Maps each parameter name to the array of its values at each design point (see Sweep.points).
+            carbon (CarbonArray): The carbon results of the design points.
+
+        Returns:
+            int: The number of design points in the store after the append.
+        """
+        values = np.asarray(carbon.values, dtype=float).reshape(-1, len(SourceType))
+        with _StoreLock(os.path.join(self.path, LOCK_FILE)):
+            schema = self.schema
+            existing = set(schema["columns"])
+            encoded = {
+                name: self._encode(name, v, schema) for name, v in points.items()
+            }
+            for src in SourceType:
+                schema["columns"].setdefault(
+                    carbon_column(src), dict(kind=CARBON, unit=str(CARBON_UNIT.units))
+                )
+                encoded[carbon_column(src)] = values[:, SOURCE_INDEX[src]]
+
+            if existing and set(encoded) != existing:
+                raise ValueError(
+                    f"Design points with parameters {list(points)} do not match the columns of {self.path}."
+                )
+            for name, data in encoded.items():
+                if len(data) != len(values):
+                    raise ValueError(
+                        f"Parameter {name} has {len(data)} values for {len(values)} design points."
+                    )
+
+            for column in schema["columns"].values():
+                column["dtype"] = COLUMN_DTYPES[column["kind"]]
+            n_rows = self._n_rows(schema)
+            self._write_schema(schema)
+            for name, data in encoded.items():
+                dtype = np.dtype(schema["columns"][name]["dtype"])
+                with open(self._column_file(name), "ab") as handle:
+                    # drop the rows of an interrupted append before writing
+                    handle.truncate(n_rows * dtype.itemsize)
+                    handle.write(np.ascontiguousarray(data, dtype=dtype).tobytes())
+            return n_rows + len(values)
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Read a column without copying it.
+
+        Args:
+            name (str): The column name.
+
+        Returns:
+            np.ndarray: A read-only memory map of the column (category codes for categorical columns, see categories).
+        """
+        schema = self.schema
+        dtype = np.dtype(schema["columns"][name]["dtype"])
+        n_rows = self._n_rows(schema)
+        if n_rows == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(
+            self._column_file(name), dtype=dtype, mode="r", shape=(n_rows,)
+        )
+
+    def categories(self, name: str) -> list:
+        """The categories of a categorical column, indexed by its codes"""
+        return self.schema["columns"][name]["categories"]
+
+    def quantity(self, name: str) -> pint.Quantity:
+        """A quantity or carbon column as a quantity array, without copying it"""
+        return units.Quantity(self.column(name), self.schema["columns"][name]["unit"])
+
+    def partial(self, src: SourceType) -> np.ndarray:
+        """The carbon of a SourceType at every design point in CARBON_UNIT, without copying it"""
+        return self.column(carbon_column(src))
+
+    def total(self) -> np.ndarray:
+        """The total carbon of every design point in CARBON_UNIT"""
+        return sum(self.partial(src) for src in SourceType)
+
+
+def write_store(results, path: str) -> int:
+    """
+    Stream sweep results to a columnar store as they are produced.
+
+    Args:
+        results: The chunks yielded by Sweep.run.
+        path (str): The store directory.
+
+    Returns:
+        int: The number of design points written.
+    """
+    store = ResultStore(path)
+    n_points = 0
+    for points, carbon in results:
+        store.append(points, carbon)
+        n_points += len(carbon)
+    return n_points
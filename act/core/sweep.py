@@ -0,0 +1,336 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+Cartesian design space sweeps over a bill of materials
+- A sweep spec maps parameter names to a list of values or a range (see parse_axis)
+- Parameter names are either operating parameters (op_power, op_ci, duty_cycle, hw_lifetime),
+  silicon device fields (ex., silicon.cpu.area), or bare silicon fields that apply to every silicon device (ex., fab_ci)
+- The grid is never materialized: design points are generated chunk by chunk from their flat index
+- Each chunk is evaluated with one vectorized ACTModel.get_carbon_batch call
+"""
+
+import collections
+import concurrent.futures
+import csv
+import json
+import os
+from dataclasses import dataclass
+from enum import Enum
+
+import numpy as np
+
+from .batch import CATEGORICAL_FIELDS, QUANTITY_FIELDS, split_params
+from .bom import load_bom
+from .carbon import SourceType
+from .common import DEFAULT_OP_LOCATION
+from .report import CarbonFormatter
+from .units import units, kg, W, year
+from .utils import load_yaml
+
+"""Default number of design points evaluated per vectorized call."""
+DEFAULT_CHUNK_SIZE = 65536
+
+
+@dataclass
+class SweepAxis:
+    """
+    A single swept parameter.
+
+    Attributes:
+        name (str): The parameter name (ex., silicon.cpu.area or hw_lifetime).
+        values: The values of the parameter as a quantity array, float array or object array for categorical values.
+    """
+
+    name: str
+    values: object
+
+    @property
+    def field(self) -> str:
+        """The BOM or operating field this axis sweeps."""
+        return self.name.rpartition(".")[2]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+def parse_axis(name: str, spec) -> SweepAxis:
+    """
+    Parse the values of a single sweep parameter.
+
+    Args:
+        name (str): The parameter name.
+        spec: Either a list of values (ex., ["7nm", "5nm"] or ["10 mm2", "20 mm2"]), or a range given as a dictionary
+            with start, stop and either num (evenly spaced, stop included) or step (stop included if reached).
+
+    Returns:
+        SweepAxis: The parsed sweep axis.
+    """
+    field = name.rpartition(".")[2]
+    quantity = field in QUANTITY_FIELDS
+
+    def _parse(v):
+        return units(v) if quantity and isinstance(v, str) else v
+
+    if isinstance(spec, dict):
+        if field in CATEGORICAL_FIELDS:
+            raise ValueError(f"Sweep parameter {name} is categorical and needs a list.")
+        start, stop = _parse(spec["start"]), _parse(spec["stop"])
+        unit = start.units if quantity else None
+        start = start.m_as(unit) if quantity else float(start)
+        stop = stop.m_as(unit) if quantity else float(stop)
+        if "num" in spec:
+            values = np.linspace(start, stop, int(spec["num"]))
+        else:
+            step = _parse(spec["step"])
+            step = step.m_as(unit) if quantity else float(step)
+            values = np.arange(start, stop + step / 2, step)
+        return SweepAxis(name, values * unit if quantity else values)
+
+    if not isinstance(spec, list) or len(spec) == 0:
+        raise ValueError(
+            f"Sweep parameter {name} must be a non-empty list or a range. Got {spec}."
+        )
+    if field in CATEGORICAL_FIELDS:
+        values = np.empty(len(spec), dtype=object)
+        values[:] = spec
+        return SweepAxis(name, values)
+    if quantity:
+        values = [_parse(v) for v in spec]
+        unit = values[0].units
+        return SweepAxis(name, np.array([v.m_as(unit) for v in values]) * unit)
+    return SweepAxis(name, np.array(spec, dtype=float))
+
+
+def load_sweep_spec(sweep_file: str) -> dict:
+    """Load a sweep specification file mapping parameter names to values or ranges"""
+    return load_yaml(sweep_file)
+
+
+class Sweep:
+    """
+    A cartesian sweep over operating parameters and silicon device fields of a bill of materials.
+
+    Attributes:
+        bom_file (str): The bill of materials file the sweep is based on.
+        axes (list[SweepAxis]): The swept parameters.
+        op_args (dict): Operating parameters used for any operating parameter that is not swept.
+    """
+
+    def __init__(
+        self,
+        bom_file: str,
+        spec: dict,
+        op_power=0 * W,
+        op_ci=DEFAULT_OP_LOCATION,
+        duty_cycle: float = 1.0,
+        hw_lifetime=2 * year,
+    ) -> None:
+        """
+        Initializes a new instance of the Sweep class.
+
+        Args:
+            bom_file (str): The bill of materials file the sweep is based on.
+            spec (dict): The sweep specification mapping parameter names to values or ranges.
+            op_power: Operating power of the device when it is not swept
+            op_ci: Operational carbon intensity setting when it is not swept
+            duty_cycle: Device utilization rate between 0 and 1 when it is not swept
+            hw_lifetime: Expected hardware life cycle when it is not swept
+        """
+        self.bom_file = bom_file
+        self.axes = [parse_axis(name, values) for name, values in spec.items()]
+        self.op_args = dict(
+            op_power=op_power,
+            op_ci=op_ci,
+            duty_cycle=duty_cycle,
+            hw_lifetime=hw_lifetime,
+        )
+
+    @property
+    def shape(self) -> tuple:
+        """The shape of the sweep grid."""
+        return tuple(len(axis) for axis in self.axes)
+
+    @property
+    def size(self) -> int:
+        """The number of design points in the sweep."""
+        return int(np.prod(self.shape, dtype=np.int64))
+
+    def chunks(self, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """Generate the (start, stop) flat index ranges of each chunk of the sweep"""
+        for start in range(0, self.size, chunk_size):
+            yield start, min(start + chunk_size, self.size)
+
+    def points(self, start: int, stop: int) -> dict:
+        """
+        Generate the design points of the grid with flat indices start to stop.
+
+        Returns:
+            dict: A dictionary mapping each parameter name to the array of its values at each design point.
+        """
+        indices = np.unravel_index(np.arange(start, stop), self.shape)
+        return {axis.name: axis.values[i] for axis, i in zip(self.axes, indices)}
+
+    def evaluate(self, model, bom, start: int, stop: int):
+        """
+        Evaluate the design points of the grid with flat indices start to stop.
+
+        Args:
+            model (ACTModel): The model to evaluate with.
+            bom (BOM): The bill of materials loaded from bom_file.
+            start (int): The flat index of the first design point.
+            stop (int): The flat index after the last design point.
+
+        Returns:
+            tuple: The design points (see points) and their CarbonArray results.
+        """
+        points = self.points(start, stop)
+        op_args, params = split_params(points, bom)
+        op_args = {**self.op_args, **op_args}
+        return points, model.get_carbon_batch(bom=bom, params=params, **op_args)
+
+    def run(
+        self, workers: int = None, chunk_size: int = DEFAULT_CHUNK_SIZE, model=None
+    ):
+        """
+        Evaluate the sweep and stream the results chunk by chunk in grid order.
+
+        The model and bill of materials are loaded once and shipped to each worker as a pickled snapshot
+        so workers do not re-parse the model and bill of materials files.
+
+        Args:
+            workers (int, optional): Number of worker processes. Evaluates in this process if 0. Defaults to the number of CPUs.
+            chunk_size (int, optional): Number of design points per chunk. Defaults to DEFAULT_CHUNK_SIZE.
+            model (ACTModel, optional): The model to evaluate with. Defaults to a new ACTModel.
+
+        Yields:
+            tuple: The design points of each chunk and their CarbonArray results.
+        """
+        if model is None:
+            from ..act_model import ACTModel
+
+            model = ACTModel()
+        bom = load_bom(self.bom_file, model.materials_model.MaterialType)
+
+        yield from run_chunks(self, self.chunks(chunk_size), workers, model, bom)
+
+
+def run_chunks(engine, chunks, workers: int, model, bom):
+    """
+    Evaluate chunks of work on a process pool and stream the results in order.
+
+    Args:
+        engine: Object whose evaluate(model, bom, *chunk) method evaluates one chunk (ex., a Sweep).
+        chunks: Iterable of chunk arguments. Only a bounded number of chunks is in flight at any time.
+        workers (int): Number of worker processes. Evaluates in this process if 0, uses every CPU if None.
+        model (ACTModel): The model to evaluate with, shipped once to each worker.
+        bom (BOM): The bill of materials to evaluate, shipped once to each worker.
+
+    Yields:
+        The result of each chunk.
+    """
+    if workers == 0:
+        for chunk in chunks:
+            yield engine.evaluate(model, bom, *chunk)
+        return
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    # bound the number of chunks in flight so the work is expanded lazily
+    max_pending = 2 * workers
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(engine, model, bom)
+    ) as executor:
+        pending = collections.deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_evaluate_chunk, *chunk))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+# per process state set up by _init_worker
+_worker = dict()
+
+
+def _init_worker(engine, model, bom) -> None:
+    """Set up the model and bill of materials snapshot of a worker process"""
+    _worker.update(engine=engine, model=model, bom=bom)
+
+
+def _evaluate_chunk(*chunk):
+    """Evaluate one chunk in a worker process"""
+    return _worker["engine"].evaluate(_worker["model"], _worker["bom"], *chunk)
+
+
+def _format_value(value) -> str:
+    """Format a swept parameter value for a results table"""
+    if isinstance(value, Enum):
+        return str(value.value)
+    return str(value)
+
+
+def write_csv(results, handle, weight_unit=kg) -> int:
+    """
+    Stream sweep results to a CSV file as they are produced.
+
+    Each row holds the swept parameter values of a design point followed by its total carbon
+    and its carbon by source type in weight_unit.
+
+    Args:
+        results: The chunks yielded by Sweep.run.
+        handle: A writable text file handle.
+        weight_unit (optional): Unit of the carbon columns. Defaults to kg.
+
+    Returns:
+        int: The number of design points written.
+    """
+    writer = csv.writer(handle)
+    n_points = 0
+    for points, carbon in results:
+        if n_points == 0:
+            writer.writerow(
+                [*points.keys(), "total_carbon", *[src.name for src in SourceType]]
+            )
+        columns = [carbon.total().m_as(weight_unit)]
+        columns.extend(carbon.partial(src).m_as(weight_unit) for src in SourceType)
+        values = np.stack(columns, axis=-1)
+        for i, row in enumerate(values):
+            writer.writerow(
+                [*(_format_value(v[i]) for v in points.values()), *row.tolist()]
+            )
+        n_points += len(values)
+    return n_points
+
+
+def write_jsonl(results, handle, weight_unit=kg) -> int:
+    """
+    Stream sweep results to a JSON Lines file as they are produced.
+
+    Each line holds the swept parameter values of a design point (parameters) followed by the total_carbon and
+    result_by_category fields of an ACTModel report.
+
+    Args:
+        results: The chunks yielded by Sweep.run.
+        handle: A writable text file handle.
+        weight_unit (optional): Unit of the carbon fields. Defaults to kg.
+
+    Returns:
+        int: The number of design points written.
+    """
+    formatter = CarbonFormatter(weight_unit)
+    n_points = 0
+    for points, carbon in results:
+        for i in range(len(carbon)):
+            record = dict(
+                parameters={
+                    name: _format_value(values[i]) for name, values in points.items()
+                }
+            )
+            record.update(formatter.summary(carbon[i]))
+            handle.write(json.dumps(record) + "\n")
+        n_points += len(carbon)
+    return n_points
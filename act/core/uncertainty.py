@@ -0,0 +1,497 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+Monte Carlo uncertainty propagation over a bill of materials
+- An uncertainty spec maps parameter names (same names as sweeps, see batch.split_params) to distributions
+- Distributions are sampled by inverse transform (ppf) of uniform samples in [0, 1), which are either random
+  or drawn from a Latin hypercube or low discrepancy design (see sampling)
+- Each chunk of samples is evaluated in one vectorized pass and random samples are seeded from their own
+  SeedSequence child, so results only depend on the seed and chunk size, not on the number of workers
+"""
+
+import functools
+import math
+import operator
+import statistics
+from dataclasses import dataclass
+
+import numpy as np
+import pint
+
+from .batch import CATEGORICAL_FIELDS, QUANTITY_FIELDS, split_params
+from .bom import load_bom, MATERIALS, PASSIVES, SILICON
+from .carbon import CarbonArray
+from .common import DEFAULT_OP_LOCATION
+from .sampling import get_sampler
+from .sweep import run_chunks
+from .units import CARBON_UNIT, units, W, year
+from .utils import load_yaml
+
+"""Default number of samples evaluated per vectorized call."""
+DEFAULT_CHUNK_SIZE = 16384
+
+"""Default percentiles reported for each result."""
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+# coefficients of the rational approximations of the normal quantile function (P. J. Acklam)
+_NORM_A = (
+    -3.969683028665376e01,
+    2.209460984245205e02,
+    -2.759285104469687e02,
+    1.383577518672690e02,
+    -3.066479806614716e01,
+    2.506628277459239e00,
+)
+_NORM_B = (
+    -5.447609879822406e01,
+    1.615858368580409e02,
+    -1.556989798598866e02,
+    6.680131188771972e01,
+    -1.328068155288572e01,
+    1.0,
+)
+_NORM_C = (
+    -7.784894002430293e-03,
+    -3.223964580411365e-01,
+    -2.400758277161838e00,
+    -2.549671010173491e00,
+    4.374664141464968e00,
+    2.938163982698783e00,
+)
+_NORM_D = (
+    7.784695709041462e-03,
+    3.224671290700398e-01,
+    2.445134137142996e00,
+    3.754408661907416e00,
+    1.0,
+)
+_NORM_P_LOW = 0.02425
+
+_erfc = np.frompyfunc(math.erfc, 1, 1)
+
+
+def norm_ppf(u) -> np.ndarray:
+    """
+    Vectorized quantile function of the standard normal distribution.
+
+    Uses Acklam's rational approximation, refined with one Halley step in the tails. Samples of exactly 0 or 1
+    are clipped to the nearest representable probabilities so the result is always finite.
+
+    Args:
+        u: Probabilities in [0, 1].
+
+    Returns:
+        np.ndarray: The standard normal quantiles.
+    """
+    u = np.clip(np.asarray(u, dtype=float), 1e-300, 1.0 - np.finfo(float).epsneg)
+    x = np.empty_like(u)
+
+    central = np.abs(u - 0.5) <= 0.5 - _NORM_P_LOW
+    q = u[central] - 0.5
+    r = q * q
+    x[central] = q * np.polyval(_NORM_A, r) / np.polyval(_NORM_B, r)
+
+    # evaluate both tails on the lower tail and refine with one step of Halley's method
+    tails = ~central
+    p = np.minimum(u[tails], 1.0 - u[tails])
+    q = np.sqrt(-2.0 * np.log(p))
+    t = np.polyval(_NORM_C, q) / np.polyval(_NORM_D, q)
+    e = 0.5 * _erfc(-t / np.sqrt(2.0)).astype(float) - p
+    h = e * np.sqrt(2.0 * np.pi) * np.exp(0.5 * t * t)
+    t = t - h / (1.0 + 0.5 * t * h)
+    x[tails] = np.where(u[tails] < 0.5, t, -t)
+    return x
+
+
+class Distribution:
+    """
+    Base class for input distributions.
+
+    Attributes:
+        unit: The unit of the sampled values or None for unitless values.
+    """
+
+    unit = None
+
+    def ppf(self, u: np.ndarray) -> np.ndarray:
+        """Map uniform samples in [0, 1) to samples of the distribution"""
+        raise NotImplementedError
+
+    def sample(self, u: np.ndarray):
+        """Map uniform samples in [0, 1) to samples of the distribution with units"""
+        values = self.ppf(u)
+        return values if self.unit is None else values * self.unit
+
+
+@dataclass
+class Uniform(Distribution):
+    low: float
+    high: float
+    unit: object = None
+
+    def ppf(self, u):
+        return self.low + u * (self.high - self.low)
+
+
+@dataclass
+class Triangular(Distribution):
+    """Triangular distribution over [low, high] peaking at mode, or the constant low if low equals high"""
+
+    low: float
+    mode: float
+    high: float
+    unit: object = None
+
+    def __post_init__(self):
+        if not self.low <= self.mode <= self.high:
+            raise ValueError(
+                f"Triangular distribution needs low <= mode <= high. Got {self.low}, {self.mode}, {self.high}."
+            )
+
+    def ppf(self, u):
+        width = self.high - self.low
+        if width == 0:
+            return np.full(np.shape(u), float(self.low))
+        split = (self.mode - self.low) / width
+        lower = self.low + np.sqrt(u * width * (self.mode - self.low))
+        upper = self.high - np.sqrt((1.0 - u) * width * (self.high - self.mode))
+        return np.where(u < split, lower, upper)
+
+
+@dataclass
+class Normal(Distribution):
+    """Normal distribution, optionally truncated to [low, high] (ex., yields truncated to 1.0)"""
+
+    mean: float
+    std: float
+    low: float = -np.inf
+    high: float = np.inf
+    unit: object = None
+
+    def ppf(self, u):
+        dist = statistics.NormalDist(self.mean, self.std)
+        lower = dist.cdf(self.low) if np.isfinite(self.low) else 0.0
+        upper = dist.cdf(self.high) if np.isfinite(self.high) else 1.0
+        values = self.mean + self.std * norm_ppf(lower + u * (upper - lower))
+        return np.clip(values, self.low, self.high)
+
+
+@dataclass
+class LogNormal(Distribution):
+    """Log-normal distribution given by its median and the standard deviation of its logarithm"""
+
+    median: float
+    sigma: float
+    unit: object = None
+
+    def ppf(self, u):
+        return self.median * np.exp(self.sigma * norm_ppf(u))
+
+
+@dataclass
+class Choice(Distribution):
+    """Discrete distribution over a list of values (ex., fab locations or process nodes)"""
+
+    values: list
+    weights: list = None
+
+    def ppf(self, u):
+        weights = np.ones(len(self.values)) if self.weights is None else self.weights
+        cdf = np.cumsum(weights, dtype=float)
+        index = np.searchsorted(cdf / cdf[-1], u, side="right")
+        values = np.empty(len(self.values), dtype=object)
+        values[:] = self.values
+        return values[np.minimum(index, len(self.values) - 1)]
+
+
+"""Distributions by the name used in uncertainty spec files."""
+DISTRIBUTIONS = dict(
+    uniform=Uniform,
+    triangular=Triangular,
+    normal=Normal,
+    lognormal=LogNormal,
+    choice=Choice,
+)
+
+"""Distribution arguments that are not in the units of the sampled values."""
+UNITLESS_ARGS = ("sigma", "weights", "values")
+
+
+def parse_distribution(name: str, spec) -> Distribution:
+    """
+    Parse the distribution of a single parameter.
+
+    Args:
+        name (str): The parameter name (ex., silicon.cpu.fab_yield or hw_lifetime).
+        spec: Either a Distribution, a list of values sampled with equal probability, or a dictionary with the distribution name
+            under "dist" and its arguments (ex., {dist: triangular, low: 0.8, mode: 0.875, high: 0.95}).
+            Arguments of parameters with units are quantity strings (ex., {dist: uniform, low: 2 years, high: 5 years}).
+
+    Returns:
+        Distribution: The parsed distribution.
+    """
+    if isinstance(spec, Distribution):
+        return spec
+    if isinstance(spec, list):
+        return Choice(values=spec)
+    if not isinstance(spec, dict) or spec.get("dist") not in DISTRIBUTIONS:
+        raise ValueError(
+            f"Parameter {name} must be a list or a distribution from {list(DISTRIBUTIONS)}. Got {spec}."
+        )
+
+    args = {k: v for k, v in spec.items() if k != "dist"}
+    dist = DISTRIBUTIONS[spec["dist"]]
+    field = name.rpartition(".")[2]
+    if dist is Choice:
+        return Choice(**args)
+    if field in CATEGORICAL_FIELDS:
+        raise ValueError(f"Parameter {name} is categorical and needs a choice.")
+    if field not in QUANTITY_FIELDS:
+        return dist(
+            **{k: v if k in UNITLESS_ARGS else float(v) for k, v in args.items()}
+        )
+
+    quantities = {
+        k: v if k in UNITLESS_ARGS else units(str(v)) for k, v in args.items()
+    }
+    unit = next(q.units for q in quantities.values() if isinstance(q, pint.Quantity))
+    return dist(
+        **{
+            k: q.m_as(unit) if isinstance(q, pint.Quantity) else q
+            for k, q in quantities.items()
+        },
+        unit=unit,
+    )
+
+
+def load_uncertainty_spec(spec_file: str) -> dict:
+    """Load an uncertainty specification file mapping parameter names to distributions"""
+    return load_yaml(spec_file)
+
+
+@dataclass
+class UncertaintyResult:
+    """
+    Percentiles of the carbon results over all samples.
+
+    Attributes:
+        n_samples (int): The number of samples.
+        percentiles (tuple): The reported percentiles.
+        carbon (CarbonArray): The total carbon of every sample.
+        devices (dict): The total carbon of each device (ex., silicon.cpu) in every sample as floats in CARBON_UNIT.
+    """
+
+    n_samples: int
+    percentiles: tuple
+    carbon: CarbonArray
+    devices: dict
+
+    @property
+    def total(self) -> pint.Quantity:
+        """Percentiles of the total carbon."""
+        return np.percentile(self.carbon.total(), self.percentiles)
+
+    @property
+    def mean(self) -> pint.Quantity:
+        """Mean of the total carbon."""
+        return self.carbon.total().mean()
+
+    @property
+    def by_type(self) -> dict:
+        """Percentiles of the carbon by SourceType."""
+        return {
+            src: np.percentile(self.carbon.partial(src), self.percentiles)
+            for src in self.carbon.types()
+        }
+
+    @property
+    def by_device(self) -> dict:
+        """Percentiles of the total carbon by device."""
+        return {
+            device: np.percentile(carbon, self.percentiles) * CARBON_UNIT
+            for device, carbon in self.devices.items()
+        }
+
+    def to_dict(self, weight_unit) -> dict:
+        """Summarize the percentiles in weight_unit as a dictionary of strings for reporting"""
+
+        def _summary(values):
+            return {
+                f"p{p:g}": str(v.to(weight_unit))
+                for p, v in zip(self.percentiles, values)
+            }
+
+        return dict(
+            n_samples=self.n_samples,
+            mean=str(self.mean.to(weight_unit)),
+            total_carbon=_summary(self.total),
+            result_by_category={
+                src.name: _summary(v) for src, v in self.by_type.items()
+            },
+            result_by_device={
+                device: _summary(v) for device, v in self.by_device.items()
+            },
+        )
+
+
+class MonteCarlo:
+    """
+    Monte Carlo propagation of input distributions through the carbon model of a bill of materials.
+
+    Attributes:
+        bom_file (str): The bill of materials file the samples are based on.
+        names (list[str]): The names of the uncertain parameters.
+        distributions (list[Distribution]): The distribution of each uncertain parameter.
+        sampler (Sampler): The uniform sample generator of the current run.
+        op_args (dict): Operating parameters used for any operating parameter that is not uncertain.
+    """
+
+    def __init__(
+        self,
+        bom_file: str,
+        spec: dict,
+        op_power=0 * W,
+        op_ci=DEFAULT_OP_LOCATION,
+        duty_cycle: float = 1.0,
+        hw_lifetime=2 * year,
+    ) -> None:
+        """
+        Initializes a new instance of the MonteCarlo class.
+
+        Args:
+            bom_file (str): The bill of materials file the samples are based on.
+            spec (dict): The uncertainty specification mapping parameter names to distributions.
+            op_power: Operating power of the device when it is not uncertain
+            op_ci: Operational carbon intensity setting when it is not uncertain
+            duty_cycle: Device utilization rate between 0 and 1 when it is not uncertain
+            hw_lifetime: Expected hardware life cycle when it is not uncertain
+        """
+        self.bom_file = bom_file
+        self.names = list(spec)
+        self.distributions = [parse_distribution(n, d) for n, d in spec.items()]
+        self.sampler = None
+        self.op_args = dict(
+            op_power=op_power,
+            op_ci=op_ci,
+            duty_cycle=duty_cycle,
+            hw_lifetime=hw_lifetime,
+        )
+
+    @property
+    def dims(self) -> int:
+        """The number of uncertain parameters."""
+        return len(self.distributions)
+
+    def sample(self, u: np.ndarray) -> dict:
+        """
+        Map uniform samples to samples of each uncertain parameter.
+
+        Args:
+            u (np.ndarray): Uniform samples in [0, 1) of shape (n_samples, dims).
+
+        Returns:
+            dict: The samples of each parameter by name.
+        """
+        return {
+            name: dist.sample(u[:, i])
+            for i, (name, dist) in enumerate(zip(self.names, self.distributions))
+        }
+
+    def evaluate_samples(self, model, bom, u: np.ndarray) -> tuple:
+        """
+        Evaluate the carbon model over a batch of samples in one vectorized pass.
+
+        Args:
+            model (ACTModel): The model to evaluate with.
+            bom (BOM): The bill of materials loaded from bom_file.
+            u (np.ndarray): Uniform samples in [0, 1) of shape (n_samples, dims).
+
+        Returns:
+            tuple: The total CarbonArray and the total carbon of each device as floats in CARBON_UNIT.
+        """
+        n_samples = len(u)
+        op_args, params = split_params(self.sample(u), bom)
+        op_args = {**self.op_args, **op_args}
+        silicon, passives, materials = model.batch_analysis(bom, params)
+        op_carbon = model.op_model.get_carbon_batch(
+            lifetime=op_args["hw_lifetime"],
+            duty_cycle=op_args["duty_cycle"],
+            op_power=op_args["op_power"],
+            op_ci=op_args["op_ci"],
+        )
+
+        carbon = CarbonArray.zeros((n_samples,))
+        carbon += op_carbon
+        devices = dict()
+        for section, results in [
+            (SILICON, silicon),
+            (PASSIVES, passives),
+            (MATERIALS, materials),
+        ]:
+            for device, result in results.items():
+                carbon += result
+                devices[f"{section}.{device}"] = np.broadcast_to(
+                    result.values.sum(axis=-1), (n_samples,)
+                )
+        return carbon, devices
+
+    def evaluate(self, model, bom, start: int, stop: int, seed):
+        """Evaluate the samples start to stop of the current sampler"""
+        return self.evaluate_samples(model, bom, self.sampler.sample(start, stop, seed))
+
+    def chunks(self, n_samples: int, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """Generate the (start, stop, seed) arguments of each chunk of samples"""
+        starts = range(0, n_samples, chunk_size)
+        seeds = self.sampler.chunk_seeds(len(starts))
+        for start, chunk_seed in zip(starts, seeds):
+            yield start, min(start + chunk_size, n_samples), chunk_seed
+
+    def run(
+        self,
+        n_samples: int,
+        seed=None,
+        workers: int = 0,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        percentiles=DEFAULT_PERCENTILES,
+        model=None,
+        sampler: str = "random",
+    ) -> UncertaintyResult:
+        """
+        Propagate the input distributions through the carbon model.
+
+        Args:
+            n_samples (int): Number of samples.
+            seed (int, optional): Seed of the random streams. Results are reproducible for a given seed and chunk size.
+            workers (int, optional): Number of worker processes. Defaults to 0 to evaluate in this process.
+            chunk_size (int, optional): Number of samples per chunk. Defaults to DEFAULT_CHUNK_SIZE.
+            percentiles (tuple, optional): Percentiles to report. Defaults to DEFAULT_PERCENTILES.
+            model (ACTModel, optional): The model to evaluate with. Defaults to a new ACTModel.
+            sampler (str, optional): Uniform sample generator from sampling.SAMPLERS (random, lhs, halton or sobol).
+                Defaults to random.
+
+        Returns:
+            UncertaintyResult: The carbon results of every sample and their percentiles.
+        """
+        if n_samples <= 0:
+            raise ValueError(f"n_samples must be positive. Got {n_samples}.")
+        self.sampler = get_sampler(sampler, self.dims, n_samples, seed)
+        if model is None:
+            from ..act_model import ACTModel
+
+            model = ACTModel()
+        bom = load_bom(self.bom_file, model.materials_model.MaterialType)
+
+        chunks = self.chunks(n_samples, chunk_size)
+        results = list(run_chunks(self, chunks, workers, model, bom))
+        carbon = CarbonArray(
+            np.concatenate([c.values for c, _ in results]),
+            functools.reduce(operator.or_, [c.mask for c, _ in results]),
+        )
+        devices = {
+            device: np.concatenate([d[device] for _, d in results])
+            for device in results[0][1]
+        }
+        return UncertaintyResult(n_samples, tuple(percentiles), carbon, devices)
@@ -13,202 +13,249 @@ Defines pint unit constants
 - If you need 2^10 instead of 10^3 units, add the "i" to the prefix (ex., GiB)
 - This file defines the units as variable to provide a short hand
 - Most of these variables are already in the UnitRegistry but some may not be
+- Shorthands missing from pint are registered from act_units.txt
+- The unit variables are created on first use, so importing this module only pays for the registry
+
+Registry modes, selected with the ACT_UNIT_REGISTRY environment variable
+- full (default): every pint default definition
+- lean: only the units ACT models and BOMs use, from lean_units.txt, which is several times faster to load
+- Set ACT_UNIT_CACHE to a directory, or :auto: for the user cache directory, to also cache the parsed definitions
+- Quantities pickled in one mode load in the other as long as their units are defined in both
 """
 
+import os
+import sys
+
 import pint
 
-units = pint.UnitRegistry()
+from .cache import DEFAULT_CACHE_SIZE, LRUCache
+
+"""Unit definition files."""
+UNITS_DIR = os.path.dirname(os.path.abspath(__file__))
+ACT_DEFINITIONS = f"{UNITS_DIR}/act_units.txt"
+LEAN_DEFINITIONS = f"{UNITS_DIR}/lean_units.txt"
+
+"""Unit registry modes."""
+UNIT_REGISTRY_MODES = ("full", "lean")
+
+
+def make_registry(mode: str = "full", cache_folder: str = None) -> pint.UnitRegistry:
+    """
+    Create a unit registry with the ACT shorthands.
+
+    Args:
+        mode (str, optional): The registry mode, full or lean. Defaults to "full".
+        cache_folder (str, optional): Directory to cache the parsed definitions in, :auto: for the user cache
+            directory. Defaults to None for no cache.
+
+    Returns:
+        pint.UnitRegistry: The unit registry.
+    """
+    if mode not in UNIT_REGISTRY_MODES:
+        raise ValueError(
+            f"Unknown unit registry mode {mode}. Expected one of {UNIT_REGISTRY_MODES}"
+        )
+    if mode == "lean":
+        # the lean definitions import the ACT shorthands so they are cached with them
+        return pint.UnitRegistry(filename=LEAN_DEFINITIONS, cache_folder=cache_folder)
+    registry = pint.UnitRegistry(cache_folder=cache_folder)
+    registry.load_definitions(ACT_DEFINITIONS)
+    return registry
+
+
+UNIT_REGISTRY = os.environ.get("ACT_UNIT_REGISTRY", "full")
+units = make_registry(UNIT_REGISTRY, os.environ.get("ACT_UNIT_CACHE") or None)
 pint.set_application_registry(units)  # required for multiprocessing
 
-# Time units
-fs = units("femtosecond")
-ps = units("picosecond")
-ns = units("nanosecond")
-us = units("microsecond")
-ms = units("millisecond")
-s = units("second")
-minute = units("minute")
-hour = units("hour")
-hr = hour
-day = units("day")
-week = units("week")
-month = units("month")
-year = units("year")
-
-# Power units
-fW = units("femtowatt")
-pW = units("picowatt")
-nW = units("nanowatt")
-uW = units("microwatt")
-mW = units("milliwatt")
-W = units("watt")
-KW = units("kilowatt")
-MW = units("megawatt")
-GW = units("gigawatt")
-TW = units("terawatt")
-
-# Energy units
-fJ = units("femtojoule")
-pJ = units("picojoule")
-nJ = units("nanojoule")
-uJ = units("microjoule")
-mJ = units("millijoule")
-J = units("joule")
-KJ = units("kilojoule")
-MJ = units("megajoule")
-GJ = units("gigajoule")
-TJ = units("terajoule")
-
-# shorthand not defined in registry, define it
-units.define("mWh = milliwatt hour")
-units.define("kWh = kilowatt hour")
-mWh = units("milliwatt hour")
-kWh = units("kilowatt hour")
-
-# Memory units
-bit = units("bit")
-byte = units("byte")
-Kb = units("kilobit")
-KB = units("kilobyte")
-KiB = units("kibibyte")
-Mb = units("megabit")
-MB = units("megabyte")
-MiB = units("mebibyte")
-Gb = units("gigabit")
-GB = units("gigabyte")
-GiB = units("gibibyte")
-Tb = units("terabit")
-TB = units("terabyte")
-TiB = units("tebibyte")
-Eb = units("exabit")
-EB = units("exabyte")
-EiB = units("exabyte")
-Pb = units("petabit")
-PB = units("petabyte")
-PiB = units("pebibyte")
-
-# Bandwidth units
-bps = units("bit/s")
-Bps = units("byte/s")
-Kbps = units("kilobit/s")
-KBps = units("kilobyte/s")
-KiBps = units("kibibyte/s")
-Mbps = units("megabit/s")
-MBps = units("megabyte/s")
-MiBps = units("mebibyte/s")
-Gbps = units("gigabit/s")
-GBps = units("gigabyte/s")
-GiBps = units("gibibyte/s")
-Tbps = units("terabit/s")
-TBps = units("terabyte/s")
-TiBps = units("tebibyte/s")
-Ebps = units("exabit/s")
-EBps = units("exabyte/s")
-EiBps = units("exbibyte/s")
-Pbps = units("petabit/s")
-PBps = units("petabyte/s")
-PiBps = units("pebibyte/s")
-
-# Compute units
-FLOPS = units("Hz")
-kFLOPS = units("kHz")
-MFLOPS = units("MHz")
-GFLOPS = units("GHz")
-TFLOPS = units("THz")
-PFLOPS = units("PHz")
-EFLOPS = units("EHz")
-OPS = units("Hz")
-kOPS = units("kHz")
-MOPS = units("MHz")
-GOPS = units("GHz")
-TOPS = units("THz")
-POPS = units("PHz")
-EOPS = units("EHz")
-
-
-# pint does not recognize this shorthand by default so it needs to be registered
-units.define("bps = bit /s")
-units.define("Bps = byte / s")
-units.define("Kbps = kilobits / s")
-units.define("KBps = kilobyte / s")
-units.define("KiBps = kibibyte / s")
-units.define("Mbps = megabits / s")
-units.define("MBps = megabyte / s")
-units.define("MiBps = mebibyte / s")
-units.define("Gbps = gigabits / s")
-units.define("GBps = gigabyte / s")
-units.define("GiBps = gibibyte / s")
-units.define("Tbps = terabits / s")
-units.define("TBps = terabyte / s")
-units.define("TiBps = tebibyte / s")
-units.define("Ebps = exabits / s")
-units.define("EBps = exabyte / s")
-units.define("EiBps = exbibyte / s")
-units.define("Pbps = petabits / s")
-units.define("PBps = petabyte / s")
-units.define("PiBps = pebibyte / s")
-
-units.define("FLOPS = Hz")
-units.define("kFLOPS = kHz")
-units.define("MFLOPS = MHz")
-units.define("GFLOPS = GHz")
-units.define("TFLOPS = THz")
-units.define("PFLOPS = PHz")
-units.define("EFLOPS = EHz")
-units.define("OPS = Hz")
-units.define("kOPS = kHz")
-units.define("MOPS = MHz")
-units.define("GOPS = GHz")
-units.define("TOPS = THz")
-units.define("POPS = PHz")
-units.define("EOPS = EHz")
-
-# Frequency units
-Hz = units("Hz")
-kHz = units("kHz")
-MHz = units("MHz")
-GHz = units("GHz")
-THz = units("THz")
-
-# voltage
-nV = units("nanovolt")
-uV = units("microvolt")
-mV = units("millivolt")
-V = units("volt")
-KV = units("kilovolt")
-MV = units("megavolt")
-GV = units("gigavolt")
-
-nA = units("nanoamp")
-uA = units("microamp")
-mA = units("milliamp")
-A = units("amp")
-KA = units("kiloamp")
-MA = units("megaamp")
-GA = units("gigaamp")
-
-# temperature
-C = units("degC")
-F = units("degF")
-
-# area units for silicon die sizes
-units.define("um2 = um ** 2")
-units.define("mm2 = mm ** 2")
-units.define("cm2 = cm ** 2")
-units.define("m2 = m ** 2")
-
-um2 = units("um ** 2")
-mm2 = units("mm ** 2")
-cm2 = units("cm ** 2")
-m2 = units("m ** 2")
-
-# weight for emissions estimates
-g = units("g")
-kg = units("kg")
-ton = units("metric_ton")
-Mton = 1000000 * ton
-
-# distance
-m = units("meter")
-km = units("kilometer")
-mi = units("mile")
+"""Unit variables and the expression they are parsed from on first use."""
+_UNIT_EXPRESSIONS = dict(
+    # Time units
+    fs="femtosecond",
+    ps="picosecond",
+    ns="nanosecond",
+    us="microsecond",
+    ms="millisecond",
+    s="second",
+    minute="minute",
+    hour="hour",
+    day="day",
+    week="week",
+    month="month",
+    year="year",
+    # Power units
+    fW="femtowatt",
+    pW="picowatt",
+    nW="nanowatt",
+    uW="microwatt",
+    mW="milliwatt",
+    W="watt",
+    KW="kilowatt",
+    MW="megawatt",
+    GW="gigawatt",
+    TW="terawatt",
+    # Energy units
+    fJ="femtojoule",
+    pJ="picojoule",
+    nJ="nanojoule",
+    uJ="microjoule",
+    mJ="millijoule",
+    J="joule",
+    KJ="kilojoule",
+    MJ="megajoule",
+    GJ="gigajoule",
+    TJ="terajoule",
+    mWh="milliwatt hour",
+    kWh="kilowatt hour",
+    # Memory units
+    bit="bit",
+    byte="byte",
+    Kb="kilobit",
+    KB="kilobyte",
+    KiB="kibibyte",
+    Mb="megabit",
+    MB="megabyte",
+    MiB="mebibyte",
+    Gb="gigabit",
+    GB="gigabyte",
+    GiB="gibibyte",
+    Tb="terabit",
+    TB="terabyte",
+    TiB="tebibyte",
+    Eb="exabit",
+    EB="exabyte",
+    EiB="exabyte",
+    Pb="petabit",
+    PB="petabyte",
+    PiB="pebibyte",
+    # Bandwidth units
+    bps="bit/s",
+    Bps="byte/s",
+    Kbps="kilobit/s",
+    KBps="kilobyte/s",
+    KiBps="kibibyte/s",
+    Mbps="megabit/s",
+    MBps="megabyte/s",
+    MiBps="mebibyte/s",
+    Gbps="gigabit/s",
+    GBps="gigabyte/s",
+    GiBps="gibibyte/s",
+    Tbps="terabit/s",
+    TBps="terabyte/s",
+    TiBps="tebibyte/s",
+    Ebps="exabit/s",
+    EBps="exabyte/s",
+    EiBps="exbibyte/s",
+    Pbps="petabit/s",
+    PBps="petabyte/s",
+    PiBps="pebibyte/s",
+    # Compute units
+    FLOPS="Hz",
+    kFLOPS="kHz",
+    MFLOPS="MHz",
+    GFLOPS="GHz",
+    TFLOPS="THz",
+    PFLOPS="PHz",
+    EFLOPS="EHz",
+    OPS="Hz",
+    kOPS="kHz",
+    MOPS="MHz",
+    GOPS="GHz",
+    TOPS="THz",
+    POPS="PHz",
+    EOPS="EHz",
+    # Frequency units
+    Hz="Hz",
+    kHz="kHz",
+    MHz="MHz",
+    GHz="GHz",
+    THz="THz",
+    # voltage
+    nV="nanovolt",
+    uV="microvolt",
+    mV="millivolt",
+    V="volt",
+    KV="kilovolt",
+    MV="megavolt",
+    GV="gigavolt",
+    nA="nanoamp",
+    uA="microamp",
+    mA="milliamp",
+    A="amp",
+    KA="kiloamp",
+    MA="megaamp",
+    GA="gigaamp",
+    # temperature
+    C="degC",
+    F="degF",
+    # area units for silicon die sizes
+    um2="um ** 2",
+    mm2="mm ** 2",
+    cm2="cm ** 2",
+    m2="m ** 2",
+    # weight for emissions estimates
+    g="g",
+    kg="kg",
+    ton="metric_ton",
+    Mton="1000000 metric_ton",
+    # distance
+    m="meter",
+    km="kilometer",
+    mi="mile",
+)
+
+"""Unit variables that are another unit variable."""
+_UNIT_ALIASES = dict(
+    hr="hour",
+    # canonical units of the unit-free model core
+    # model tables are converted to plain floats in these units when they are loaded and all internal
+    # computation runs on floats, quantities are only converted where user input enters and results leave
+    # these are the units the model tables are authored in so loaded values match the model files exactly
+    CARBON_UNIT="g",
+    AREA_UNIT="cm2",
+    STORAGE_UNIT="GB",
+    ENERGY_UNIT="kWh",
+    POWER_UNIT="KW",
+    TIME_UNIT="hour",
+)
+
+__all__ = ["units", *_UNIT_EXPRESSIONS, *_UNIT_ALIASES]
+
+"""Parsed quantity strings, shared across bills of materials."""
+quantity_cache = LRUCache(DEFAULT_CACHE_SIZE)
+
+
+def parse_quantity(value) -> pint.Quantity:
+    """
+    Parse a quantity string, reusing the parse of strings seen before.
+
+    Bills of materials repeat the same strings (ex., the "0 mm2" defaults) for every device, and parsing
+    a string costs far more than creating a quantity from a parsed magnitude and unit.
+
+    Args:
+        value: The quantity string (ex., "10 mm2"). Other values are passed to the unit registry as is.
+
+    Returns:
+        pint.Quantity: A new quantity, so it can be modified without affecting other devices.
+    """
+    if not isinstance(value, str):
+        return units(value)
+    parsed = quantity_cache.lookup(value, lambda: units(value))
+    if isinstance(parsed, pint.Quantity):
+        return units.Quantity(parsed.magnitude, parsed._units)
+    return parsed
+
+
+def __getattr__(name: str):
+    """Create a unit variable on first use"""
+    if name in _UNIT_ALIASES:
+        value = getattr(sys.modules[__name__], _UNIT_ALIASES[name])
+    elif name in _UNIT_EXPRESSIONS:
+        value = units(_UNIT_EXPRESSIONS[name])
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(__all__))
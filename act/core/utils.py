@@ -4,9 +4,11 @@
 # LICENSE file in the root directory of this source tree.
 
 import yaml
-from .units import *
+from .units import CARBON_UNIT, cm2, ENERGY_UNIT, mm2, units
 
 import math
+import os
+import threading
 from enum import auto, Enum
 
 from .common import ACT_ROOT, EnergyLocation, EnergySource
@@ -16,6 +18,176 @@ from .logger import log
 DEFAULT_LOCATION_CONFIG = f"{ACT_ROOT}/models/carbon_intensity/location.yaml"
 DEFAULT_SOURCE_CONFIG = f"{ACT_ROOT}/models/carbon_intensity/source.yaml"
 
+"""YAML loader, accelerated by libyaml when PyYAML is built with it."""
+YAML_LOADER = getattr(yaml, "CFullLoader", yaml.FullLoader)
+
+"""YAML dumper, accelerated by libyaml when PyYAML is built with it."""
+YAML_DUMPER = getattr(yaml, "CDumper", yaml.Dumper)
+
+
+class FrozenTable(dict):
+    """
+    A read-only model table.
+
+    Model tables are shared by every model loaded in the process (see load_model_table), so they cannot be
+    modified in place. Copy a table with dict(table) to modify it.
+    """
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError(
+            "Model tables are shared between models and cannot be modified. Copy the table with dict(table) first."
+        )
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return (FrozenTable, (dict(self),))
+
+
+"""Process-wide registry of the data loaded from model files, by path: (modification time, data by key)."""
+_MODEL_DATA = dict()
+_MODEL_DATA_LOCK = threading.Lock()
+
+
+def load_model_data(model_file: str, key, build):
+    """
+    Load data derived from a model file once per process.
+
+    Data is registered by the absolute path and modification time of the model file, so every model constructed
+    in the process shares it, and it is loaded again if the file changes.
+
+    Args:
+        model_file (str): The path to the model file.
+        key: Hashable key of the data derived from the file (ex., the key type and unit of a table).
+        build: Function of the absolute path of the model file returning the data.
+
+    Returns:
+        The registered data, which must not be modified.
+    """
+    path = os.path.abspath(model_file)
+    mtime = os.stat(path).st_mtime_ns
+    entry = _MODEL_DATA.get(path)
+    if entry is not None and entry[0] == mtime and key in entry[1]:
+        return entry[1][key]
+
+    data = build(path)
+    with _MODEL_DATA_LOCK:
+        entry = _MODEL_DATA.get(path)
+        if entry is None or entry[0] != mtime:
+            entry = _MODEL_DATA[path] = (mtime, dict())
+        return entry[1].setdefault(key, data)
+
+
+def register_model_data(model_file: str, data: dict) -> None:
+    """
+    Register data derived from a model file (ex., loaded from a model bundle) for its current modification time.
+
+    Args:
+        model_file (str): The path to the model file.
+        data (dict): The data derived from the file by key (see load_model_data).
+    """
+    path = os.path.abspath(model_file)
+    mtime = os.stat(path).st_mtime_ns
+    with _MODEL_DATA_LOCK:
+        entry = _MODEL_DATA.get(path)
+        if entry is None or entry[0] != mtime:
+            entry = _MODEL_DATA[path] = (mtime, dict())
+        for key, value in data.items():
+            entry[1].setdefault(key, value)
+
+
+def registered_model_data() -> dict:
+    """The data registered for each model file by absolute path"""
+    with _MODEL_DATA_LOCK:
+        return {path: dict(entry[1]) for path, entry in _MODEL_DATA.items()}
+
+
+def clear_model_data() -> None:
+    """Clear the registry of model data so model files are loaded again"""
+    with _MODEL_DATA_LOCK:
+        _MODEL_DATA.clear()
+
+
+def load_yaml(path: str):
+    """
+    Load a YAML file with the fastest available loader.
+
+    Args:
+        path (str): The path to the YAML file.
+
+    Returns:
+        The parsed data.
+    """
+    with open(path) as handle:
+        return yaml.load(handle, Loader=YAML_LOADER)
+
+
+def load_model_yaml(model_file: str):
+    """
+    Load the YAML data of a model file once per process.
+
+    Args:
+        model_file (str): The path to the model file.
+
+    Returns:
+        The parsed data, which must not be modified.
+    """
+    return load_model_data(model_file, "yaml", load_yaml)
+
+
+def to_table(data: dict, key_type, unit, source: str = None) -> dict:
+    """
+    Convert a model table of quantity strings to plain floats in the given unit.
+
+    Args:
+        data (dict): The model table mapping keys to quantity strings (ex., "583 g / kWh").
+        key_type: Callable converting the raw keys to the model keys (ex., an enum type), or None to keep the raw keys.
+        unit: The canonical unit to convert the values to.
+        source (str, optional): The model file the data was loaded from for error reporting.
+
+    Returns:
+        dict: A dictionary mapping the converted keys to floats in the canonical unit.
+    """
+    table = dict()
+    for k, v in data.items():
+        quantity = units(v)
+        assert quantity.check(
+            unit
+        ), f"Model value for {k} in {source} must have units of {unit}. Got {v}."
+        table[key_type(k) if key_type is not None else k] = quantity.m_as(unit)
+    return table
+
+
+def load_model_table(model_file: str, key_type, unit, section: str = None) -> dict:
+    """
+    Load a model table file and convert its values to plain floats in the given unit.
+
+    The table is loaded once per process and shared by every model (see load_model_data).
+
+    Args:
+        model_file (str): The path to the model file.
+        key_type: Callable converting the raw keys to the model keys (ex., an enum type), or None to keep the raw keys.
+        unit: The canonical unit to convert the values to.
+        section (str, optional): The key of the table in the model file. Defaults to the whole file.
+
+    Returns:
+        FrozenTable: A read-only dictionary mapping the converted keys to floats in the canonical unit.
+    """
+
+    def _build(path):
+        data = load_model_yaml(path)
+        data = data[section] if section is not None else data
+        return FrozenTable(to_table(data, key_type, unit, source=model_file))
+
+    # hashing a quantity converts it to base units, its magnitude and units are much faster to hash
+    unit_key = (getattr(unit, "magnitude", 1), unit._units)
+    return load_model_data(model_file, ("table", key_type, unit_key, section), _build)
+
+
+"""Canonical unit of the carbon intensity models."""
+CI_UNIT = CARBON_UNIT / ENERGY_UNIT
+
 
 def load_ci_model(
     loc_ci_config=DEFAULT_LOCATION_CONFIG, src_ci_config=DEFAULT_SOURCE_CONFIG
@@ -28,20 +200,14 @@ def load_ci_model(
         src_ci_config (str): The source configuration file path. Defaults to DEFAULT_SOURCE_CONFIG.
 
     Returns:
-        dict: A dictionary mapping EnergyLocation or EnergySource to carbon intensity.
+        dict: A dictionary mapping EnergyLocation or EnergySource to carbon intensity as floats in CI_UNIT.
     """
-    ci_model = {}
-    with open(loc_ci_config) as f:
-        loc_model = yaml.load(f, Loader=yaml.FullLoader)
-        loc_model = {EnergyLocation(k): units(v) for k, v in loc_model.items()}
-        ci_model.update(loc_model)
-
-    with open(src_ci_config) as f:
-        src_model = yaml.load(f, Loader=yaml.FullLoader)
-        src_model = {EnergySource(k): units(v) for k, v in src_model.items()}
-        ci_model.update(src_model)
-
-    return ci_model
+    return FrozenTable(
+        {
+            **load_model_table(loc_ci_config, EnergyLocation, CI_UNIT),
+            **load_model_table(src_ci_config, EnergySource, CI_UNIT),
+        }
+    )
 
 
 DEFAULT_DEFECT_DENSITY = 0.15 / cm2
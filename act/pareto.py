@@ -0,0 +1,120 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import argparse
+import datetime
+import logging
+import sys
+
+import yaml
+
+from .core.arg_parser import add_lifetime_args
+from .core.common import DEFAULT_OP_LOCATION, get_src_or_loc
+from .core.logger import log, setup_logger
+from .core.pareto import DEFAULT_OBJECTIVES, load_alternatives_spec, ParetoSearch
+from .core.units import kg, units
+
+
+def get_parser():
+    """
+    Returns an ArgumentParser instance for the ACT Pareto frontier search tool.
+
+    The parser includes arguments for the base bill of materials, the alternatives specification,
+    the objectives, the output report and the base operating parameters.
+    """
+    parser = argparse.ArgumentParser(description="ACT Pareto frontier search tool.")
+
+    add_lifetime_args(parser)
+
+    parser.add_argument(
+        "-m",
+        "--materials",
+        type=str,
+        required=True,
+        help="Base bill of materials file.",
+    )
+    parser.add_argument(
+        "-a",
+        "--alternatives",
+        type=str,
+        required=True,
+        help="Alternatives specification file mapping devices (ex., silicon.cpu) to lists of alternatives.",
+    )
+    parser.add_argument(
+        "--objectives",
+        type=str,
+        nargs="+",
+        default=list(DEFAULT_OBJECTIVES),
+        help="Objectives to minimize: embodied, operational or total carbon, or any metric of the alternatives (ex., cost).",
+    )
+    parser.add_argument(
+        "--op-power",
+        default="0mW",
+        type=str,
+        help="Base device operating power. Alternatives add their op_power to it. Must have units of power (ex. 100mW, 10W etc.).",
+    )
+    parser.add_argument(
+        "--op-ci",
+        default=DEFAULT_OP_LOCATION,
+        type=str,
+        help=f"Carbon intensity configuration for device operation. By default will use {DEFAULT_OP_LOCATION}.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        default="pareto.yaml",
+        help="Output report file for the frontier designs.",
+    )
+    parser.add_argument(
+        "-l",
+        "--loglevel",
+        type=str,
+        default="info",
+        help="Log level to report messages and telemetry.",
+    )
+
+    return parser
+
+
+def main():
+    # parse arguments and sanitize them
+    parser = get_parser()
+    args = parser.parse_args()
+
+    # setup logging and telemetry
+    loglevel = getattr(logging, args.loglevel.upper())
+    setup_logger(loglevel=loglevel)
+
+    log.info("ACT pareto called with: " + " ".join(sys.argv))
+
+    search = ParetoSearch(
+        bom_file=args.materials,
+        spec=load_alternatives_spec(args.alternatives),
+        objectives=args.objectives,
+        op_power=units(args.op_power),
+        op_ci=get_src_or_loc(args.op_ci),
+        duty_cycle=float(args.duty_cycle),
+        hw_lifetime=units(args.lifetime),
+    )
+    frontier = search.run()
+
+    now = datetime.datetime.now()
+    export_data = dict(report_generated=now.strftime("%m/%d/%Y %H:%M:%S"))
+    export_data.update(cl_args=" ".join(sys.argv))
+    export_data.update(n_combinations=frontier.n_combinations)
+    export_data.update(frontier=frontier.to_list(kg))
+    with open(args.output, "w") as handle:
+        yaml.dump(export_data, handle, sort_keys=False)
+    log.info(f"ACT pareto results exported to: {args.output}")
+
+    log.info(
+        f"{len(frontier)} Pareto optimal designs out of {frontier.n_combinations} combinations"
+    )
+    log.info("ACT pareto done executing...")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import argparse
+import logging
+import sys
+
+from .core.arg_parser import add_lifetime_args
+from .core.common import DEFAULT_OP_LOCATION, get_src_or_loc
+from .core.logger import log, setup_logger
+from .core.portfolio import (
+    DEFAULT_CHUNK_SIZE,
+    find_boms,
+    Portfolio,
+    write_csv,
+    write_reports,
+)
+from .core.report import open_report_stream, STREAM_FORMATS
+from .core.units import units
+
+
+def get_parser():
+    """
+    Returns an ArgumentParser instance for the ACT bill of materials portfolio tool.
+
+    The parser includes arguments for the bill of materials files, directories or glob patterns,
+    the output file and format, the worker pool and the operating parameters shared by every bill of materials.
+    """
+    parser = argparse.ArgumentParser(
+        description="ACT evaluation of many bills of materials with shared operating parameters."
+    )
+
+    add_lifetime_args(parser)
+
+    parser.add_argument(
+        "-m",
+        "--materials",
+        type=str,
+        nargs="+",
+        required=True,
+        help="Bill of materials files, directories (every YAML file below them) or glob patterns (ex., 'boms/**/*.yaml').",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        default="portfolio.csv",
+        help="Output file: a CSV file with one row per bill of materials, or a report stream with --format.",
+    )
+    parser.add_argument(
+        "--format",
+        type=str,
+        default="summary",
+        choices=["summary", *STREAM_FORMATS],
+        help="Output format: the total carbon and carbon by source type of each bill of materials (summary), or its full report as JSON Lines (jsonl) or CSV rows (csv).",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes. Use 0 to run in this process. Defaults to the number of CPUs.",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Number of bills of materials evaluated per worker task.",
+    )
+    parser.add_argument(
+        "--op-power",
+        default="0mW",
+        type=str,
+        help="Device operating power. Must have units of power (ex. 100mW, 10W etc.).",
+    )
+    parser.add_argument(
+        "--op-ci",
+        default=DEFAULT_OP_LOCATION,
+        type=str,
+        help=f"Carbon intensity configuration for device operation. By default will use {DEFAULT_OP_LOCATION}.",
+    )
+    parser.add_argument(
+        "-l",
+        "--loglevel",
+        type=str,
+        default="info",
+        help="Log level to report messages and telemetry.",
+    )
+
+    return parser
+
+
+def main():
+    # parse arguments and sanitize them
+    parser = get_parser()
+    args = parser.parse_args()
+
+    # setup logging and telemetry
+    loglevel = getattr(logging, args.loglevel.upper())
+    setup_logger(loglevel=loglevel)
+
+    log.info("ACT portfolio called with: " + " ".join(sys.argv))
+
+    portfolio = Portfolio(
+        bom_files=find_boms(args.materials),
+        op_power=units(args.op_power),
+        op_ci=get_src_or_loc(args.op_ci),
+        duty_cycle=float(args.duty_cycle),
+        hw_lifetime=units(args.lifetime),
+        reports=args.format != "summary",
+    )
+    log.info(f"Evaluating {len(portfolio)} bills of materials")
+
+    results = portfolio.run(workers=args.workers, chunk_size=args.chunk_size)
+    with open(args.output, "w", newline="") as handle:
+        if portfolio.reports:
+            stream = open_report_stream(handle, args.format, keys=("bom",))
+            n_boms, n_failed = write_reports(results, stream)
+        else:
+            n_boms, n_failed = write_csv(results, handle)
+    log.info(f"ACT portfolio results exported to: {args.output}")
+    if n_failed:
+        log.warning(f"{n_failed} bills of materials could not be evaluated")
+
+    log.info(f"ACT portfolio done executing {n_boms} bills of materials...")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import argparse
+import datetime
+import logging
+import sys
+
+import yaml
+
+from .core.arg_parser import add_lifetime_args
+from .core.common import DEFAULT_OP_LOCATION, get_src_or_loc
+from .core.logger import log, setup_logger
+from .core.sampling import SAMPLERS
+from .core.sensitivity import DEFAULT_SPREAD, SensitivityAnalysis
+from .core.uncertainty import DEFAULT_CHUNK_SIZE, load_uncertainty_spec
+from .core.units import kg, units
+
+
+def get_parser():
+    """
+    Returns an ArgumentParser instance for the ACT sensitivity analysis tool.
+
+    The parser includes arguments for the bill of materials, the analyzed parameters, the analysis method
+    and its sampling settings, the output report and the operating parameters.
+    """
+    parser = argparse.ArgumentParser(description="ACT sensitivity analysis tool.")
+
+    add_lifetime_args(parser)
+
+    parser.add_argument(
+        "-m",
+        "--materials",
+        type=str,
+        required=True,
+        help="Bill of materials file to analyze.",
+    )
+    parser.add_argument(
+        "-u",
+        "--uncertainty",
+        type=str,
+        default=None,
+        help="Uncertainty specification file of the analyzed parameters. Defaults to every numeric bill of materials field and operating parameter.",
+    )
+    parser.add_argument(
+        "--spread",
+        type=float,
+        default=DEFAULT_SPREAD,
+        help="Relative spread of each parameter around its value when no uncertainty specification is given.",
+    )
+    parser.add_argument(
+        "--method",
+        type=str,
+        default="sobol",
+        choices=["sobol", "morris"],
+        help="Sobol indices (variance based) or Morris screening (cheaper, ranking only).",
+    )
+    parser.add_argument(
+        "-n",
+        "--samples",
+        type=int,
+        default=1024,
+        help="Number of base samples (sobol) or trajectories (morris).",
+    )
+    parser.add_argument(
+        "--levels",
+        type=int,
+        default=4,
+        help="Number of grid levels of each parameter for Morris screening.",
+    )
+    parser.add_argument(
+        "--sampler",
+        type=str,
+        default="random",
+        choices=list(SAMPLERS),
+        help="Uniform sample generator for Sobol indices.",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Seed of the samples for reproducible results.",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=0,
+        help="Number of worker processes. Defaults to 0 to run in this process.",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Number of samples evaluated per vectorized call.",
+    )
+    parser.add_argument(
+        "--op-power",
+        default="0mW",
+        type=str,
+        help="Device operating power. Must have units of power (ex. 100mW, 10W etc.).",
+    )
+    parser.add_argument(
+        "--op-ci",
+        default=DEFAULT_OP_LOCATION,
+        type=str,
+        help=f"Carbon intensity configuration for device operation. By default will use {DEFAULT_OP_LOCATION}.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        default="sensitivity.yaml",
+        help="Output report file for the sensitivity of each parameter.",
+    )
+    parser.add_argument(
+        "-l",
+        "--loglevel",
+        type=str,
+        default="info",
+        help="Log level to report messages and telemetry.",
+    )
+
+    return parser
+
+
+def main():
+    # parse arguments and sanitize them
+    parser = get_parser()
+    args = parser.parse_args()
+
+    # setup logging and telemetry
+    loglevel = getattr(logging, args.loglevel.upper())
+    setup_logger(loglevel=loglevel)
+
+    log.info("ACT sensitivity called with: " + " ".join(sys.argv))
+
+    analysis = SensitivityAnalysis(
+        bom_file=args.materials,
+        spec=(
+            None
+            if args.uncertainty is None
+            else load_uncertainty_spec(args.uncertainty)
+        ),
+        spread=args.spread,
+        op_power=units(args.op_power),
+        op_ci=get_src_or_loc(args.op_ci),
+        duty_cycle=float(args.duty_cycle),
+        hw_lifetime=units(args.lifetime),
+    )
+    if args.method == "sobol":
+        result = analysis.sobol(
+            n_samples=args.samples,
+            seed=args.seed,
+            sampler=args.sampler,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+        )
+        sensitivity = result.to_dict()
+    else:
+        result = analysis.morris(
+            n_trajectories=args.samples,
+            levels=args.levels,
+            seed=args.seed,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+        )
+        sensitivity = result.to_dict(kg)
+
+    now = datetime.datetime.now()
+    export_data = dict(report_generated=now.strftime("%m/%d/%Y %H:%M:%S"))
+    export_data.update(cl_args=" ".join(sys.argv), method=args.method)
+    export_data.update(sensitivity=sensitivity)
+    with open(args.output, "w") as handle:
+        yaml.dump(export_data, handle, sort_keys=False)
+    log.info(f"ACT sensitivity results exported to: {args.output}")
+
+    log.info(f"Most influential parameters: {', '.join(result.ranking()[:5])}")
+    log.info("ACT sensitivity done executing...")
+
+
+if __name__ == "__main__":
+    main()
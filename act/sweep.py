@@ -0,0 +1,135 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import argparse
+import logging
+import sys
+
+from .core.arg_parser import add_lifetime_args
+from .core.common import DEFAULT_OP_LOCATION, get_src_or_loc
+from .core.logger import log, setup_logger
+from .core.store import write_store
+from .core.sweep import (
+    DEFAULT_CHUNK_SIZE,
+    load_sweep_spec,
+    Sweep,
+    write_csv,
+    write_jsonl,
+)
+from .core.units import units
+
+
+def get_parser():
+    """
+    Returns an ArgumentParser instance for the ACT design space sweep tool.
+
+    The parser includes arguments for the base bill of materials, the sweep specification,
+    the output file and format, the worker pool and the operating parameters that are not swept.
+    """
+    parser = argparse.ArgumentParser(description="ACT design space sweep tool.")
+
+    add_lifetime_args(parser)
+
+    parser.add_argument(
+        "-m",
+        "--materials",
+        type=str,
+        required=True,
+        help="Base bill of materials file to sweep over.",
+    )
+    parser.add_argument(
+        "-s",
+        "--sweep",
+        type=str,
+        required=True,
+        help="Sweep specification file mapping parameters (ex., silicon.cpu.area, fab_ci, hw_lifetime) to lists or ranges of values.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        default="sweep.csv",
+        help="Output file, or columnar store directory with --format store, for the sweep results.",
+    )
+    parser.add_argument(
+        "--format",
+        type=str,
+        default="csv",
+        choices=["csv", "jsonl", "store"],
+        help="Output format: a CSV file, a JSON Lines file, or a columnar store of memory-mappable arrays that several sweeps can append to.",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes. Use 0 to run in this process. Defaults to the number of CPUs.",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Number of design points evaluated per vectorized call.",
+    )
+    parser.add_argument(
+        "--op-power",
+        default="0mW",
+        type=str,
+        help="Device operating power. Must have units of power (ex. 100mW, 10W etc.).",
+    )
+    parser.add_argument(
+        "--op-ci",
+        default=DEFAULT_OP_LOCATION,
+        type=str,
+        help=f"Carbon intensity configuration for device operation. By default will use {DEFAULT_OP_LOCATION}.",
+    )
+    parser.add_argument(
+        "-l",
+        "--loglevel",
+        type=str,
+        default="info",
+        help="Log level to report messages and telemetry.",
+    )
+
+    return parser
+
+
+def main():
+    # parse arguments and sanitize them
+    parser = get_parser()
+    args = parser.parse_args()
+
+    # setup logging and telemetry
+    loglevel = getattr(logging, args.loglevel.upper())
+    setup_logger(loglevel=loglevel)
+
+    log.info("ACT sweep called with: " + " ".join(sys.argv))
+
+    sweep = Sweep(
+        bom_file=args.materials,
+        spec=load_sweep_spec(args.sweep),
+        op_power=units(args.op_power),
+        op_ci=get_src_or_loc(args.op_ci),
+        duty_cycle=float(args.duty_cycle),
+        hw_lifetime=units(args.lifetime),
+    )
+    log.info(f"Sweeping {sweep.size} design points over {len(sweep.axes)} parameters")
+
+    results = sweep.run(workers=args.workers, chunk_size=args.chunk_size)
+    if args.format == "store":
+        n_points = write_store(results, args.output)
+    elif args.format == "jsonl":
+        with open(args.output, "w") as handle:
+            n_points = write_jsonl(results, handle)
+    else:
+        with open(args.output, "w", newline="") as handle:
+            n_points = write_csv(results, handle)
+    log.info(f"ACT sweep results exported to: {args.output}")
+
+    log.info(f"ACT sweep done executing {n_points} design points...")
+
+
+if __name__ == "__main__":
+    main()
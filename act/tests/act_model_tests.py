@@ -9,14 +9,46 @@ from ..core.common import *
 
 from .base_test_case import BaseTestCase
 from ..core.units import *
+from ..core.units import parse_quantity, quantity_cache
 import copy
+import gc
 import glob
+import io
+import json
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import threading
+from unittest.mock import patch
 
+import numpy as np
 import yaml
 
-from ..core.bom import BOM
+from ..core import bom as bom_module
+from ..core.bom import BOM, decode_bom, IMPORTS, load_bom, MATERIALS, PASSIVES, SILICON
 
 from ..core.logger import log
+from ..core.report import build_report, open_report_stream
+from ..core.materials_model import make_material_type
+
+"""Budget in seconds for importing act.act_model in a fresh process once pint and the unit registry are loaded."""
+IMPORT_TIME_BUDGET = 0.06
+
+
+def base_unit_values() -> dict:
+    """Magnitude in base units and dimensionality of every unit variable"""
+    from ..core import units as unit_module
+
+    return {
+        name: (
+            getattr(unit_module, name).to_base_units().magnitude,
+            str(getattr(unit_module, name).dimensionality),
+        )
+        for name in unit_module.__all__
+        if name != "units"
+    }
 
 
 class ACTModelTests(BaseTestCase):
@@ -76,6 +108,523 @@ class ACTModelTests(BaseTestCase):
             self.assertTrue(stype in carbon.carbon_by_type.keys())
             self.assertGreater(carbon.partial(stype), 0 * g)
 
+    def test_get_carbon_batch(self):
+        """Check that batch evaluation matches point by point evaluation"""
+        file = f"{self.test_dir}/../boms/test.yaml"
+        bom = load_bom(file, self.act_model.materials_model.MaterialType)
+        areas = np.array([10.0, 50.0, 100.0]) * mm2
+        processes = [LogicProcess.N14, LogicProcess.N7, LogicProcess.N5]
+        capacities = np.array([1.0, 2.0, 4.0]) * GB
+        op_powers = np.array([100.0, 200.0, 300.0]) * mW
+
+        carbon = self.act_model.get_carbon_batch(
+            bom=bom,
+            op_power=op_powers,
+            duty_cycle=0.5,
+            params={
+                "silicon.dut.area": areas,
+                "silicon.dut.process": processes,
+                "silicon.dram.capacity": capacities,
+            },
+        )
+        self.assertEqual(carbon.shape, (3,))
+
+        for i in range(len(areas)):
+            point_bom = load_bom(file, self.act_model.materials_model.MaterialType)
+            point_bom.silicon["dut"].area = areas[i]
+            point_bom.silicon["dut"].process = processes[i]
+            point_bom.silicon["dram"].capacity = capacities[i]
+            expected = self.act_model.get_carbon(
+                bom=point_bom, op_power=op_powers[i], duty_cycle=0.5
+            )
+            for src in SourceType:
+                self.assertAlmostEqual(carbon.partial(src)[i], expected.partial(src))
+            self.assertEqual(set(carbon[i].types()), set(expected.types()))
+
+    def test_get_carbon_batch_passives_materials(self):
+        """Batch parameters of passives and materials match scalar evaluations"""
+        bom = load_bom(
+            f"{self.boms_dir}/test.yaml", self.act_model.materials_model.MaterialType
+        )
+        weights = np.array([0.01, 0.03, 0.05]) * units("mg")
+        areas = np.array([5.0, 10.0, 20.0]) * cm2
+        params = {
+            "passives.cap0.weight": weights,
+            "passives.cap0.quantity": np.array([1, 2, 3]),
+            "materials.pcb.area": areas,
+            "materials.fasteners.weight": np.array([0.5, 0.6, 0.7]) * g,
+        }
+        carbon = self.act_model.get_carbon_batch(bom, op_power=1 * W, params=params)
+
+        for i in range(3):
+            point_bom = copy.deepcopy(bom)
+            point_bom.passives["cap0"].weight = weights[i]
+            point_bom.passives["cap0"].quantity = i + 1
+            point_bom.materials["pcb"].area = areas[i]
+            point_bom.materials["fasteners"].weight = params[
+                "materials.fasteners.weight"
+            ][i]
+            expected = self.act_model.get_carbon(point_bom, op_power=1 * W)
+            for src in SourceType:
+                self.assertAlmostEqual(
+                    carbon[i].partial(src).m_as(g), expected.partial(src).m_as(g)
+                )
+
+        with self.assertRaises(KeyError):
+            self.act_model.get_carbon_batch(
+                bom, op_power=1 * W, params={"materials.pcb.quantity": [1, 2]}
+            )
+
+    def test_compiled_bom(self):
+        """Check that a compiled bill of materials matches re-running the full analysis"""
+        file = f"{self.test_dir}/../boms/test.yaml"
+        bom = load_bom(file, self.act_model.materials_model.MaterialType)
+        plan = self.act_model.compile_bom(bom)
+
+        for lifetime in [1 * year, 2.5 * year, 4 * year]:
+            for duty_cycle in [0.1, 0.7]:
+                expected = self.act_model.get_carbon(
+                    bom=bom,
+                    op_power=5 * W,
+                    duty_cycle=duty_cycle,
+                    hw_lifetime=lifetime,
+                )
+                carbon = plan.get_carbon(
+                    op_power=5 * W, duty_cycle=duty_cycle, hw_lifetime=lifetime
+                )
+                self.assertEqual(set(carbon.types()), set(expected.types()))
+                self.assertEqual(carbon.total(), expected.total())
+
+                # compiled plans can also be passed to the top level model
+                carbon = self.act_model.get_carbon(
+                    bom=plan,
+                    op_power=5 * W,
+                    duty_cycle=duty_cycle,
+                    hw_lifetime=lifetime,
+                )
+                self.assertEqual(carbon.total(), expected.total())
+                self.assertIs(self.act_model.last_bom, bom)
+
+        lifetimes = np.array([1.0, 2.5, 4.0]) * year
+        carbon = plan.get_carbon_batch(op_power=5 * W, hw_lifetime=lifetimes)
+        for i, lifetime in enumerate(lifetimes):
+            expected = plan.get_carbon(op_power=5 * W, hw_lifetime=lifetime)
+            for src in SourceType:
+                self.assertAlmostEqual(carbon[i].partial(src), expected.partial(src))
+
+    def test_pickle_model(self):
+        """Models and bills of materials can be pickled and shipped to other processes"""
+        bom = load_bom(
+            f"{self.boms_dir}/dellr740.yaml",
+            self.act_model.materials_model.MaterialType,
+        )
+        expected = self.act_model.get_carbon(bom, op_power=10 * W)
+
+        data = pickle.dumps((self.act_model, bom))
+        model, unpickled_bom = pickle.loads(data)
+        material_type = model.materials_model.MaterialType
+        self.assertIs(material_type, self.act_model.materials_model.MaterialType)
+        self.assertIs(unpickled_bom.material_type, material_type)
+        self.assertEqual(
+            model.get_carbon(unpickled_bom, op_power=10 * W).total(), expected.total()
+        )
+
+        # a fresh process does not have the materials enum cached yet
+        make_material_type.cache_clear()
+        model, unpickled_bom = pickle.loads(data)
+        material_type = model.materials_model.MaterialType
+        self.assertIsNot(material_type, self.act_model.materials_model.MaterialType)
+        for material in unpickled_bom.materials.values():
+            self.assertIsInstance(material.type, material_type)
+        self.assertEqual(
+            model.get_carbon(unpickled_bom, op_power=10 * W).total(), expected.total()
+        )
+
+    def test_component_cache(self):
+        """Only devices with changed specifications are evaluated again"""
+        model = ACTModel()
+        uncached = ACTModel(cache_size=0)
+        bom = load_bom(
+            f"{self.boms_dir}/dellr740.yaml", model.materials_model.MaterialType
+        )
+        n_devices = len(bom.silicon) + len(bom.passives) + len(bom.materials)
+
+        model.get_carbon(bom, op_power=10 * W)
+        n_misses = model.component_cache.info().misses
+        self.assertLessEqual(n_misses, n_devices)
+
+        # edit two devices
+        bom.silicon["cpu.main0"].area = 500 * mm2
+        bom.silicon["ssd.main0"].capacity = 7680 * GB
+        carbon = model.get_carbon(bom, op_power=10 * W)
+        self.assertEqual(model.component_cache.info().misses, n_misses + 2)
+        self.assertEqual(
+            carbon.total(), uncached.get_carbon(bom, op_power=10 * W).total()
+        )
+        self.assertEqual(
+            model.silicon_results["cpu.main0"].total(),
+            uncached.silicon_results["cpu.main0"].total(),
+        )
+
+        # cached results are copies that can be accumulated into
+        model.silicon_results["cpu.main0"] += carbon
+        self.assertEqual(model.get_carbon(bom, op_power=10 * W).total(), carbon.total())
+
+        # editing a model table requires invalidating the cache
+        model.ssd_model.fab_model = {
+            k: 2 * v for k, v in model.ssd_model.fab_model.items()
+        }
+        model.invalidate_cache()
+        self.assertGreater(
+            model.get_carbon(bom, op_power=10 * W).total(), carbon.total()
+        )
+
+    def test_export_modes(self):
+        """Reports are written synchronously, by the background writer, or skipped"""
+        bom = load_bom(
+            f"{self.boms_dir}/dellr740.yaml",
+            self.act_model.materials_model.MaterialType,
+        )
+        model = ACTModel(export_mode="none")
+        carbon = model.get_carbon(bom, op_power=10 * W)
+        self.assertIsNone(model.out_dir)
+        self.assertEqual(carbon.total(), self.act_model.get_carbon(bom, 10 * W).total())
+        with self.assertRaises(ValueError):
+            model.get_carbon(bom, op_power=10 * W, export="later")
+
+        def load_report(file):
+            with open(file) as handle:
+                report = yaml.safe_load(handle)
+            report.pop("report_generated")
+            return report
+
+        sync_file = f"{self.out_dir}/sync.yaml"
+        model.get_carbon(bom, op_power=10 * W, export_file=sync_file, export="sync")
+        report = load_report(sync_file)
+        self.assertEqual(report["total_carbon"], str(carbon.total().to(kg)))
+        self.assertEqual(
+            report["result_by_device"]["silicon_results"]["cpu.main0"],
+            {
+                ctype.name: str(amt.to(kg))
+                for ctype, amt in model.silicon_results[
+                    "cpu.main0"
+                ].carbon_by_type.items()
+            },
+        )
+
+        # queued reports are not changed by later estimates
+        async_file = f"{self.out_dir}/async.yaml"
+        model.get_carbon(bom, op_power=10 * W, export_file=async_file, export="async")
+        model.silicon_results["cpu.main0"] += carbon
+        model.get_carbon(bom, op_power=20 * W, export="none")
+        model.flush_reports()
+        self.assertEqual(load_report(async_file), report)
+
+        model.get_carbon(bom, 10 * W, export_file=self.out_dir, export="async")
+        with self.assertRaises(IsADirectoryError):
+            model.flush_reports()
+
+        # the writer of a model shipped to another process starts empty
+        shipped = pickle.loads(pickle.dumps(model))
+        shipped.get_carbon(bom, 10 * W, export_file=async_file, export="async")
+        shipped.flush_reports()
+
+        # writer threads stop when the writer is closed or its model is dropped
+        def writer_threads():
+            return sum(t.name == "act-report-writer" for t in threading.enumerate())
+
+        n_threads = writer_threads()
+        model.report_writer.close()
+        self.assertEqual(writer_threads(), n_threads - 1)
+        dropped_file = f"{self.out_dir}/dropped.yaml"
+        dropped = ACTModel(export_mode="async")
+        dropped.get_carbon(bom, 10 * W, export_file=dropped_file)
+        self.assertEqual(writer_threads(), n_threads)
+        del dropped
+        gc.collect()
+        self.assertEqual(writer_threads(), n_threads - 1)
+        self.assertEqual(load_report(dropped_file), report)
+
+    def test_report_stream(self):
+        """Streamed reports have the fields of the exported reports"""
+        bom = load_bom(
+            f"{self.boms_dir}/dellr740.yaml",
+            self.act_model.materials_model.MaterialType,
+        )
+        handle = io.StringIO()
+        stream = open_report_stream(handle, "jsonl")
+        export_file = f"{self.out_dir}/report.yaml"
+        for op_power in [10 * W, 20 * W]:
+            self.act_model.get_carbon(
+                bom, op_power=op_power, export_file=export_file, stream=stream
+            )
+        self.assertEqual(stream.n_reports, 2)
+        with open(export_file) as handle_yaml:
+            expected = yaml.safe_load(handle_yaml)
+        report = json.loads(handle.getvalue().splitlines()[-1])
+        self.assertEqual(report, expected)
+
+        with self.assertRaises(ValueError):
+            open_report_stream(io.StringIO(), "yaml")
+
+    def test_quantity_parse_cache(self):
+        """Repeated quantity strings are parsed once and every device gets its own quantity"""
+        quantity_cache.clear()
+        first = parse_quantity("12.5 mm2")
+        second = parse_quantity("12.5 mm2")
+        self.assertEqual(quantity_cache.info().misses, 1)
+        self.assertEqual(quantity_cache.info().hits, 1)
+        self.assertEqual(first, units("12.5 mm2"))
+        self.assertIsNot(first, second)
+
+        bom = load_bom(
+            f"{self.boms_dir}/dellr740.yaml",
+            self.act_model.materials_model.MaterialType,
+        )
+        self.assertGreater(quantity_cache.info().hits, 1)
+        areas = [spec.area for spec in bom.silicon.values()]
+        self.assertEqual(len(set(map(id, areas))), len(areas))
+
+        self.assertIs(get_src_or_loc("taiwan"), EnergyLocation.TAIWAN)
+        self.assertIs(get_src_or_loc("taiwan"), EnergyLocation.TAIWAN)
+        self.assertIs(get_src_or_loc(EnergySource.COAL), EnergySource.COAL)
+        with self.assertRaises(ValueError):
+            get_src_or_loc("atlantis")
+
+    def test_decode_bom(self):
+        """Bills of materials decoded from YAML nodes match building them from the loaded YAML data"""
+        material_type = self.act_model.materials_model.MaterialType
+        for file in glob.glob(f"{self.boms_dir}/*.yaml"):
+            with open(file) as handle:
+                expected = BOM(
+                    **yaml.load(handle, Loader=yaml.FullLoader),
+                    file=file,
+                    material_type=material_type,
+                )
+            bom = load_bom(file, material_type)
+            for section in (SILICON, PASSIVES, MATERIALS):
+                self.assertEqual(getattr(bom, section), getattr(expected, section))
+            self.assertEqual(bom.name, expected.name)
+
+        # anchors, merge keys and non string fields go through the generic constructor
+        document = (
+            "silicon:\n"
+            "  cpu: &cpu {model: logic, process: 7nm, area: 100 mm2, n_ics: 2}\n"
+            "  cpu2:\n"
+            "    <<: *cpu\n"
+            "    fab_yield: 0.8\n"
+        )
+        bom = decode_bom(document, material_type)
+        self.assertEqual(bom.silicon["cpu"].n_ics, 2)
+        self.assertEqual(bom.silicon["cpu2"].area, 100 * mm2)
+        self.assertEqual(bom.silicon["cpu2"].fab_yield, 0.8)
+
+    def test_nested_imports(self):
+        """Imports are followed recursively, parsed once and checked for cycles"""
+        material_type = self.act_model.materials_model.MaterialType
+        with tempfile.TemporaryDirectory() as bom_dir:
+            boms = {
+                "board.yaml": {SILICON: {"cpu": {"area": "100 mm2", "process": "7nm"}}},
+                "server.yaml": {
+                    IMPORTS: {"board0": "board.yaml", "board1": "board.yaml"},
+                    SILICON: {"bmc": {"area": "10 mm2", "process": "28nm"}},
+                },
+                "rack.yaml": {
+                    IMPORTS: {"server0": "server.yaml", "server1": "server.yaml"}
+                },
+            }
+            for name, data in boms.items():
+                with open(f"{bom_dir}/{name}", "w") as handle:
+                    yaml.dump(data, handle)
+
+            with patch.object(
+                bom_module, "_load_import", wraps=bom_module._load_import
+            ) as load:
+                bom = load_bom(f"{bom_dir}/rack.yaml", material_type)
+                self.assertEqual(load.call_count, 2)
+            self.assertEqual(len(bom.silicon), 6)
+            cpu = bom.silicon["server1.board0.cpu"]
+            self.assertEqual(cpu.area, 100 * mm2)
+            self.assertIsNot(cpu, bom.silicon["server0.board0.cpu"])
+
+            # importers do not share the parsed quantities of a device
+            cpu.area.ito(cm2)
+            self.assertEqual(bom.silicon["server0.board0.cpu"].area.magnitude, 100)
+            other = load_bom(f"{bom_dir}/rack.yaml", material_type)
+            self.assertEqual(other.silicon["server1.board0.cpu"].area.magnitude, 100)
+            self.assertEqual(bom.silicon["server0.bmc"].process, LogicProcess.N28)
+
+            # the imported files are not parsed again for another bill of materials
+            with patch.object(
+                bom_module, "_load_import", wraps=bom_module._load_import
+            ) as load:
+                load_bom(f"{bom_dir}/rack.yaml", material_type)
+                self.assertEqual(load.call_count, 0)
+
+            with open(f"{bom_dir}/board.yaml", "w") as handle:
+                yaml.dump({IMPORTS: {"rack": "rack.yaml"}}, handle)
+            with self.assertRaises(ValueError):
+                load_bom(f"{bom_dir}/rack.yaml", material_type)
+
+    def test_device_count(self):
+        """Identical devices are evaluated once and scaled by their count"""
+        model = ACTModel()
+        cpu = dict(area="100 mm2", process="7nm")
+        pcb = dict(category="pcb", area="100 cm2", layers=8)
+        cap = dict(category="capacitor", type="mlcc", quantity=10)
+        repeated = BOM(
+            silicon={f"cpu{i}": cpu for i in range(4)},
+            materials={f"pcb{i}": pcb for i in range(4)},
+            passives={f"cap{i}": cap for i in range(4)},
+            material_type=model.materials_model.MaterialType,
+        )
+        counted = BOM(
+            silicon=dict(cpu=dict(cpu, count=4)),
+            materials=dict(pcb=dict(pcb, count=4)),
+            passives=dict(cap=dict(cap, count=4)),
+            material_type=model.materials_model.MaterialType,
+        )
+        expected = model.get_carbon(repeated, op_power=10 * W)
+        n_misses = model.component_cache.info().misses
+        carbon = model.get_carbon(counted, op_power=10 * W)
+        self.assertAlmostEqual(carbon.total(), expected.total())
+        self.assertEqual(model.component_cache.info().misses, n_misses)
+        self.assertAlmostEqual(
+            model.silicon_results["cpu"].total(),
+            4 * model.silicon_analysis(repeated.silicon)["cpu0"].total(),
+        )
+
+        batch = model.get_carbon_batch(
+            counted,
+            op_power=10 * W,
+            params={"silicon.cpu.count": np.array([1, 4])},
+        )
+        self.assertAlmostEqual(batch[1].total(), carbon.total())
+        self.assertLess(batch[0].total(), batch[1].total())
+
+        carbon_array = batch * 2
+        self.assertAlmostEqual(carbon_array[1].total(), 2 * batch[1].total())
+        self.assertAlmostEqual((2 * carbon).total(), 2 * carbon.total())
+
+        with self.assertRaises(ValueError):
+            BOM(silicon=dict(cpu=dict(cpu, count=-1)))
+
+        with tempfile.TemporaryDirectory() as bom_dir:
+            with open(f"{bom_dir}/board.yaml", "w") as handle:
+                yaml.dump({SILICON: dict(cpu=dict(cpu, count=2))}, handle)
+            with open(f"{bom_dir}/server.yaml", "w") as handle:
+                yaml.dump(
+                    {IMPORTS: dict(board=dict(file="board.yaml", count=2))}, handle
+                )
+            for _ in range(2):
+                bom = load_bom(
+                    f"{bom_dir}/server.yaml", model.materials_model.MaterialType
+                )
+                self.assertEqual(bom.silicon["board.cpu"].count, 4)
+
+            export_file = f"{bom_dir}/report.yaml"
+            model.get_carbon(
+                bom, op_power=10 * W, export_file=export_file, expand_instances=True
+            )
+            with open(export_file) as handle:
+                report = yaml.safe_load(handle)["result_by_device"]["silicon_results"]
+            self.assertEqual(list(report), [f"board.cpu[{i}]" for i in range(4)])
+
+        # devices with a count of 0 have no instances
+        absent = BOM(silicon=dict(cpu=dict(cpu, count=0), gpu=dict(cpu)))
+        carbon = model.get_carbon(absent, op_power=10 * W, export="none")
+        report = build_report(**model.report_data(carbon, expand_instances=True))
+        self.assertEqual(list(report["result_by_device"]["silicon_results"]), ["gpu"])
+
+    def test_lazy_submodels(self):
+        """Submodels are only loaded for the devices in the bill of materials"""
+        model = ACTModel()
+        bom = load_bom(
+            f"{self.boms_dir}/fairphone3.yaml", model.materials_model.MaterialType
+        )
+        model.get_carbon(bom, op_power=1 * W)
+        for name in ["hdd_model", "pcb_model", "battery_model", "cap_model"]:
+            self.assertNotIn(name, model.__dict__)
+
+        # replacing a submodel invalidates the memoized device results
+        version = model.model_version
+        model.hdd_model = model.hdd_model
+        self.assertGreater(model.model_version, version)
+
+    def test_import_time(self):
+        """Importing ACT stays within its time budget and defers the submodels"""
+        deferred = [
+            "act.core.hdd_model",
+            "act.core.pcb_model",
+            "act.core.plan",
+            "argparse",
+        ]
+        # pint and the unit registry take most of the import time and are timed separately
+        script = (
+            "import sys, time\n"
+            "import act.core.units\n"
+            "start = time.perf_counter()\n"
+            "import act.act_model\n"
+            "print(time.perf_counter() - start)\n"
+            f"print([m for m in {deferred} if m in sys.modules])\n"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=os.path.dirname(os.path.abspath(ACT_ROOT)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.splitlines()
+        self.assertLess(float(output[0]), IMPORT_TIME_BUDGET)
+        self.assertEqual(output[1], "[]")
+
+    def test_lean_unit_registry(self):
+        """The lean unit registry defines every unit variable like the full registry and loads its pickles"""
+        script = (
+            "import json, pickle, sys\n"
+            "from act.core import units\n"
+            "from act.tests.act_model_tests import base_unit_values\n"
+            "quantity = pickle.loads(bytes.fromhex(sys.stdin.read()))\n"
+            "print(units.UNIT_REGISTRY, quantity.to(units.kg).magnitude)\n"
+            "print(json.dumps(base_unit_values()))\n"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=os.path.dirname(os.path.abspath(ACT_ROOT)),
+            env=dict(os.environ, ACT_UNIT_REGISTRY="lean"),
+            input=pickle.dumps(3 * ton + 5 * kg).hex(),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.splitlines()
+        self.assertEqual(output[0], "lean 3005.0")
+        lean_values = json.loads(output[1])
+        for name, (magnitude, dimensionality) in base_unit_values().items():
+            self.assertAlmostEqual(
+                lean_values[name][0], magnitude, delta=abs(magnitude) * 1e-12
+            )
+            self.assertEqual(lean_values[name][1], dimensionality)
+
+    def test_unit_namespace(self):
+        """Star imports of common export the unit variables and act_model exports its listed names"""
+        namespace = dict()
+        exec("from act.core.common import *", namespace)
+        for name in ["GB", "mm2", "W", "units", "CARBON_UNIT"]:
+            self.assertIs(
+                namespace[name], getattr(sys.modules["act.core.common"], name)
+            )
+        self.assertEqual(namespace["GB"], 1 * GB)
+
+        namespace = dict()
+        exec("from act.act_model import *", namespace)
+        module = sys.modules["act.act_model"]
+        self.assertEqual(
+            sorted(name for name in namespace if name != "__builtins__"),
+            sorted(module.__all__),
+        )
+        for name in ["ACTModel", "BOM", "load_bom", "units", "CARBON_UNIT"]:
+            self.assertIs(namespace[name], getattr(module, name))
+
     def test_default_args(self):
         """Test that the minimal default args work as intended"""
         self.run_act()
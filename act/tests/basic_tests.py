@@ -12,7 +12,9 @@ from ..core.ssd_model import SSDModel
 
 from .base_test_case import BaseTestCase
 from ..core.units import *
-from ..core.carbon import Carbon, SourceType
+from ..core.carbon import Carbon, CarbonArray, SourceType
+
+import numpy as np
 
 
 class BasicACTTests(BaseTestCase):
@@ -120,3 +122,31 @@ class BasicACTTests(BaseTestCase):
         self.assertEqual(wxyz.partial(SourceType.MATERIALS), 82 * g)
         self.assertEqual(wxyz.partial(SourceType.OPERATION), 75 * g)
         self.assertEqual(wxyz.partial(SourceType.PACKAGING), 0 * g)
+
+    def test_carbon_accumulation(self):
+        """In-place accumulation over carbon results and carbon arrays"""
+        x = Carbon(100 * g, SourceType.FABRICATION)
+        y = Carbon(50 * g, SourceType.MATERIALS)
+        x_values = x.values
+
+        # in-place accumulation reuses the result array
+        x += y
+        self.assertIs(x.values, x_values)
+        self.assertEqual(x.total(), 150 * g)
+        self.assertEqual(set(x.types()), {SourceType.FABRICATION, SourceType.MATERIALS})
+        self.assertEqual(y.total(), 50 * g)
+
+        # carbon arrays broadcast against single carbon results
+        batch = CarbonArray.zeros(3)
+        self.assertEqual(batch.types(), [])
+        batch += Carbon(10 * g, SourceType.OPERATION)
+        batch += CarbonArray._from_amounts(
+            {SourceType.PACKAGING: np.array([1.0, 2.0, 3.0])}
+        )
+        self.assertEqual(batch.shape, (3,))
+        self.assertEqual(
+            set(batch.types()), {SourceType.OPERATION, SourceType.PACKAGING}
+        )
+        self.assertEqual(list(batch.total().to(g).magnitude), [11.0, 12.0, 13.0])
+        self.assertEqual(batch[1].partial(SourceType.PACKAGING), 2 * g)
+        self.assertEqual((batch + x)[2].total(), 163 * g)
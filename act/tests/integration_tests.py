@@ -4,7 +4,7 @@
 # LICENSE file in the root directory of this source tree.
 
 from ..core.common import CARBON_PER_IC_PACKAGE
-from ..core.units import kg
+from ..core.units import g, kg
 
 from .base_test_case import BaseTestCase
 
@@ -77,3 +77,27 @@ class IntegrationTest(BaseTestCase):
         self.assertTrue("subsystem.imported_cap" in act.passives_results)
         self.assertTrue("subsystem.imported_si" in act.silicon_results)
         self.assertTrue("subsystem.imported_mat" in act.materials_results)
+
+    def test_original_totals(self):
+        """Ensure that the total carbon of the stock models matches the original pint based results"""
+        expected_totals = {
+            "dellr740.yaml": 1523137.6914285717 * g,
+            "fairphone3.yaml": 11901.223314285713 * g,
+        }
+        for bom_file, expected in expected_totals.items():
+            self.test_args = ["./act", "-m", f"{self.boms_dir}/{bom_file}"]
+            act = self.run_act()
+            total = act.get_carbon(
+                act.last_bom,
+                op_power=act.last_op_power,
+                op_ci=act.last_op_ci,
+                duty_cycle=act.last_duty_cycle,
+                hw_lifetime=act.last_hw_lifetime,
+                export="none",
+            ).total()
+
+            # the model core works on floats in canonical units rather than converting
+            # units per operation, so the last digit may round differently than before
+            self.assertAlmostEqual(
+                total.m_as(g) / expected.m_as(g), 1.0, places=12, msg=bom_file
+            )
@@ -3,7 +3,17 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
+import glob
+import os
+import pickle
+import shutil
+
+import yaml
+
 from .base_test_case import BaseTestCase
+from ..act_model import ACTModel
+from ..core.bundle import build_model_bundle, load_model_bundle
+from ..core.utils import clear_model_data
 from ..core.common import *
 from ..core.capacitor_model import (
     CapacitorModel,
@@ -16,6 +26,7 @@ from ..core.battery_model import BatteryModel
 from ..core.common import EnergyLocation
 from ..core.dram_model import DRAMModel
 from ..core.hdd_model import HDDModel
+from ..core.logic_model import CPA_UNIT, LogicModel
 from ..core.materials_model import MaterialsModel
 from ..core.pcb_model import PCBModel
 from ..core.ssd_model import SSDModel
@@ -86,6 +97,35 @@ class ModelUnitTests(BaseTestCase):
         expected = (4.57 * g / GB * capacity / fab_yield) + 150 * g * n_ics
         _check_results(result, expected)
 
+    def test_model_caches(self):
+        """Carbon per area and per storage lookups are memoized in bounded caches"""
+        logic_model = LogicModel(cache_size=2)
+        for fab_yield in [0.9, 0.8, 0.9, 0.7, 0.9]:
+            logic_model.get_cpa(LogicProcess.N10, fab_yield=fab_yield)
+        info = logic_model.cpa_cache.info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (2, 3, 2))
+
+        # the batch path shares the cache of the scalar path
+        self.assertAlmostEqual(
+            logic_model.get_cpa(LogicProcess.N10, fab_yield=1.0).m_as(CPA_UNIT),
+            logic_model.get_carbon_batch(["10nm", "10nm"], 1 * cm2, fab_yield=1.0)
+            .total()[0]
+            .m_as(CARBON_UNIT),
+        )
+        self.assertEqual(logic_model.cpa_cache.info().hits, 3)
+
+        dram_model = DRAMModel(cache_size=0)
+        dram_model.get_carbon(DRAMProcess.DDR3_30NM, 10 * GB)
+        dram_model.get_carbon(DRAMProcess.DDR3_30NM, 10 * GB)
+        self.assertEqual(dram_model.cpg_cache.info().misses, 2)
+        self.assertEqual(len(dram_model.cpg_cache), 0)
+
+        # arguments are validated even when an equal key is already cached
+        dram_model = DRAMModel()
+        dram_model.get_carbon_batch("ddr3_30nm", 10 * GB, fab_yield=1.0)
+        with self.assertRaises(SystemExit):
+            dram_model.get_carbon(DRAMProcess.DDR3_30NM, 10 * GB, fab_yield=1)
+
     def test_op_model(self):
         """Basic unit test over operational carbon model"""
         lifetime = 3.5 * year
@@ -173,3 +213,89 @@ class ModelUnitTests(BaseTestCase):
         expected = 0.13 * kg / m2 * layers * area
         self.assertAlmostEqual(result.total(), expected)
         self.assertEqual(result.types(), [SourceType.FABRICATION])
+
+    def test_unit_free_tables(self):
+        """Model tables are loaded as plain floats in the canonical units"""
+        logic_model = self.act_model.logic_model
+        tables = [
+            logic_model.epa_model,
+            logic_model.materials_model,
+            logic_model.ci_model,
+            self.act_model.dram_model.fab_model,
+            self.act_model.ssd_model.fab_model,
+            self.act_model.hdd_model.fab_model,
+            self.act_model.cap_model.capacitor_model,
+            self.act_model.materials_model.model,
+            self.act_model.pcb_model.model,
+            *logic_model.gpa_model.values(),
+        ]
+        for table in tables:
+            self.assertGreater(len(table), 0)
+            for value in table.values():
+                self.assertIsInstance(value, float)
+
+        # values authored in the canonical units are loaded unchanged
+        self.assertEqual(logic_model.epa_model[LogicProcess.N10], 1.475)
+        self.assertEqual(logic_model.ci_model[EnergyLocation.TAIWAN], 583)
+        self.assertEqual(
+            self.act_model.dram_model.fab_model[DRAMProcess.DDR3_30NM], 230
+        )
+
+    def test_shared_model_data(self):
+        """Model files are loaded once per process and shared as read-only tables"""
+        model = ACTModel()
+        self.assertIs(model.logic_model.epa_model, self.act_model.logic_model.epa_model)
+        self.assertIs(model.dram_model.fab_model, self.act_model.dram_model.fab_model)
+        self.assertIs(model.materials_model.model, self.act_model.materials_model.model)
+        with self.assertRaises(TypeError):
+            model.logic_model.epa_model[LogicProcess.N10] = 0.0
+        self.assertEqual(
+            pickle.loads(pickle.dumps(model.logic_model.epa_model)),
+            model.logic_model.epa_model,
+        )
+
+        # an edited model file is loaded again
+        model_file = f"{self.out_dir}/dram.yaml"
+        with open(model_file, "w") as handle:
+            yaml.dump({"ddr3_30nm": "230 g / GB"}, handle)
+        self.assertEqual(DRAMModel(model_file).fab_model[DRAMProcess.DDR3_30NM], 230)
+        with open(model_file, "w") as handle:
+            yaml.dump({"ddr3_30nm": "460 g / GB"}, handle)
+        stat = os.stat(model_file)
+        os.utime(model_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+        self.assertEqual(DRAMModel(model_file).fab_model[DRAMProcess.DDR3_30NM], 460)
+
+    def test_model_bundle(self):
+        """Model data is loaded from a bundle for the model files that did not change"""
+        models_dir = f"{self.out_dir}/models"
+        shutil.copytree(f"{ACT_ROOT}/models", models_dir, symlinks=True)
+        bundle_file = f"{self.out_dir}/models.bundle"
+        n_files = build_model_bundle(bundle_file, models_dir)
+        self.assertEqual(
+            n_files, len(glob.glob(f"{models_dir}/**/*.yaml", recursive=True))
+        )
+        with open(bundle_file, "rb") as handle:
+            files = pickle.load(handle)["files"]
+        tables = {
+            rel_path
+            for rel_path, (_, data) in files.items()
+            for key in data
+            if key[0] == "table"
+        }
+        self.assertIn("dram/dram_hynix.yaml", tables)
+        self.assertIn("logic/epa.yaml", tables)
+        self.assertIn("materials/materials.yaml", tables)
+        self.assertTrue(all("yaml" in data for _, data in files.values()))
+
+        with open(f"{models_dir}/dram/dram_hynix.yaml", "a") as handle:
+            handle.write("\n")
+        clear_model_data()
+        self.assertEqual(load_model_bundle(bundle_file, models_dir), n_files - 1)
+        self.assertEqual(load_model_bundle(bundle_file, models_dir), 0)
+
+        # tables from the bundle match the tables loaded from the model files
+        materials_model = MaterialsModel(f"{models_dir}/materials/materials.yaml")
+        self.assertEqual(materials_model.model, self.act_model.materials_model.model)
+        self.assertIs(
+            materials_model.MaterialType, self.act_model.materials_model.MaterialType
+        )
@@ -0,0 +1,125 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import copy
+import itertools
+
+import numpy as np
+
+from ..core.bom import load_bom
+from ..core.carbon import SourceType
+from ..core.common import *
+from ..core.pareto import pareto_mask, ParetoSearch
+from ..core.units import *
+
+from .base_test_case import BaseTestCase
+
+
+class ParetoTests(BaseTestCase):
+    """Tests for the Pareto frontier search over slot alternatives"""
+
+    def setUp(self):
+        super().setUp()
+        self.bom_file = f"{self.boms_dir}/fairphone3.yaml"
+        self.bom = load_bom(self.bom_file, self.act_model.materials_model.MaterialType)
+        self.spec = {
+            "silicon.cpu": [
+                {"process": "28nm", "op_power": "3 W", "metrics": {"cost": 10}},
+                {"process": "7nm", "op_power": "2 W", "metrics": {"cost": 40}},
+                {
+                    "process": "5nm",
+                    "area": "30 mm2",
+                    "op_power": "1.5 W",
+                    "metrics": {"cost": 60},
+                },
+            ],
+            "silicon.dram.process": ["ddr3_50nm", "ddr4_10nm", "lpddr3_20nm"],
+            "silicon.ssd.process": ["nand_30nm", "nand_10nm"],
+        }
+
+    def test_pareto_mask(self):
+        """Dominated and duplicate points are pruned"""
+        points = np.array([[1, 5], [2, 2], [3, 3], [2, 2], [5, 1], [1, 6]])
+        np.testing.assert_array_equal(
+            pareto_mask(points), [True, True, False, False, True, False]
+        )
+        points = np.array([[1, 5, 1], [2, 2, 2], [2, 3, 3], [5, 1, 0], [1, 5, 1]])
+        np.testing.assert_array_equal(
+            pareto_mask(points), [True, True, False, True, False]
+        )
+
+    def test_frontier_matches_brute_force(self):
+        """The frontier equals the non-dominated designs of the full cross product"""
+        for objectives in [("embodied", "operational"), ("total", "cost")]:
+            search = ParetoSearch(
+                self.bom_file, self.spec, objectives=objectives, op_power=1 * W
+            )
+            frontier = search.run(self.act_model)
+            self.assertEqual(frontier.n_combinations, 18)
+
+            points = []
+            for cpu, dram, ssd in itertools.product(
+                self.spec["silicon.cpu"],
+                self.spec["silicon.dram.process"],
+                self.spec["silicon.ssd.process"],
+            ):
+                bom = copy.deepcopy(self.bom)
+                bom.silicon["cpu"].process = LogicProcess(cpu["process"])
+                if "area" in cpu:
+                    bom.silicon["cpu"].area = units(cpu["area"])
+                bom.silicon["dram"].process = DRAMProcess(dram)
+                bom.silicon["ssd"].process = SSDProcess(ssd)
+                carbon = self.act_model.get_carbon(
+                    bom, op_power=1 * W + units(cpu["op_power"])
+                )
+                operational = carbon.partial(SourceType.OPERATION).m_as(g)
+                columns = dict(
+                    embodied=carbon.total().m_as(g) - operational,
+                    operational=operational,
+                    total=carbon.total().m_as(g),
+                    cost=cpu["metrics"]["cost"],
+                )
+                points.append([columns[o] for o in objectives])
+            points = np.array(points)
+            expected = points[pareto_mask(points)]
+            expected = expected[np.lexsort(expected.T[::-1])]
+            np.testing.assert_allclose(frontier.values, expected)
+            np.testing.assert_allclose(
+                frontier.carbon.total().m_as(g),
+                (
+                    frontier.values[:, 0]
+                    if objectives[0] == "total"
+                    else frontier.values.sum(axis=1)
+                ),
+            )
+            self.assertEqual(len(frontier.designs()), len(frontier))
+
+    def test_fields_of_one_device(self):
+        """Single field entries of the same device are combined into one slot"""
+        spec = {
+            "silicon.cpu.process": ["28nm", "7nm"],
+            "silicon.cpu.area": ["30 mm2", "60 mm2"],
+        }
+        search = ParetoSearch(self.bom_file, spec, objectives=("total",))
+        self.assertEqual(len(search.slots), 1)
+        frontier = search.run(self.act_model)
+        self.assertEqual(frontier.n_combinations, 4)
+
+        totals = []
+        for process, area in itertools.product(*spec.values()):
+            bom = copy.deepcopy(self.bom)
+            bom.silicon["cpu"].process = LogicProcess(process)
+            bom.silicon["cpu"].area = units(area)
+            totals.append(self.act_model.get_carbon(bom, op_power=0 * W).total())
+        self.assertAlmostEqual(frontier.values[0, 0], min(totals).m_as(g), places=6)
+        process, area = list(itertools.product(*spec.values()))[
+            totals.index(min(totals))
+        ]
+        self.assertEqual(
+            frontier.designs()[0]["silicon.cpu"], dict(process=process, area=area)
+        )
+
+        with self.assertRaises(ValueError):
+            ParetoSearch(self.bom_file, {**spec, "silicon.cpu": [{"area": "1 mm2"}]})
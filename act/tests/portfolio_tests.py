@@ -0,0 +1,116 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import csv
+import glob
+import io
+import json
+import os
+import tempfile
+
+from ..core.bom import load_bom
+from ..core.common import *
+from ..core.portfolio import find_boms, Portfolio, write_csv, write_reports
+from ..core.report import open_report_stream
+from ..core.units import *
+
+from .base_test_case import BaseTestCase
+
+
+class PortfolioTests(BaseTestCase):
+    """Tests for the evaluation of many bills of materials"""
+
+    def setUp(self):
+        super().setUp()
+        self.bom_files = find_boms([self.boms_dir])
+
+    def test_find_boms(self):
+        """Directories and glob patterns are expanded into sorted unique files"""
+        expected = sorted(
+            os.path.abspath(f) for f in glob.glob(f"{self.boms_dir}/*.yaml")
+        )
+        self.assertEqual(self.bom_files, expected)
+        self.assertEqual(
+            find_boms([f"{self.boms_dir}/*.yaml", f"{self.boms_dir}/test.yaml"]),
+            expected,
+        )
+        with self.assertRaises(ValueError):
+            find_boms([f"{self.boms_dir}/*.json"])
+
+    def test_portfolio(self):
+        """Each bill of materials matches its own evaluation and failures are reported"""
+        portfolio = Portfolio(self.bom_files, op_power=10 * W, hw_lifetime=3 * year)
+        results = [r for chunk in portfolio.run(workers=0, chunk_size=3) for r in chunk]
+        self.assertEqual([file for file, _, _, _ in results], self.bom_files)
+        for file, carbon, error, report in results:
+            self.assertIsNone(report)
+            self.assertIsNone(error)
+            bom = load_bom(file, self.act_model.materials_model.MaterialType)
+            expected = self.act_model.get_carbon(
+                bom, op_power=10 * W, hw_lifetime=3 * year
+            )
+            self.assertAlmostEqual(carbon.total().m_as(g), expected.total().m_as(g))
+
+        with tempfile.TemporaryDirectory() as bom_dir:
+            broken = f"{bom_dir}/broken.yaml"
+            with open(broken, "w") as handle:
+                handle.write("silicon:\n  cpu: {area: 10 mm2, process: 1nm}\n")
+            # the models exit on an invalid yield, which only fails this bill of materials
+            bad_yield = f"{bom_dir}/bad_yield.yaml"
+            with open(bad_yield, "w") as handle:
+                handle.write(
+                    "silicon:\n  dram: {capacity: 4 GB, process: ddr4_10nm, model: dram, fab_yield: 1.5}\n"
+                )
+            serial = [r for c in Portfolio([bad_yield]).run(workers=0) for r in c]
+            self.assertIsNone(serial[0][1])
+            self.assertIn("SystemExit", serial[0][2])
+            portfolio = Portfolio([broken, *self.bom_files, bad_yield], op_power=10 * W)
+
+            output = f"{bom_dir}/portfolio.csv"
+            with open(output, "w", newline="") as handle:
+                n_boms, n_failed = write_csv(
+                    portfolio.run(workers=2, chunk_size=2), handle
+                )
+            self.assertEqual((n_boms, n_failed), (len(self.bom_files) + 2, 2))
+            with open(output) as handle:
+                rows = list(csv.DictReader(handle))
+            self.assertEqual(rows[0]["bom"], broken)
+            self.assertTrue(rows[0]["error"])
+            self.assertEqual(rows[0]["total_carbon"], "")
+            self.assertEqual(rows[-1]["bom"], bad_yield)
+            self.assertIn("SystemExit", rows[-1]["error"])
+            for row, (file, carbon, _, _) in zip(rows[1:-1], results):
+                self.assertEqual(row["bom"], file)
+                self.assertEqual(row["error"], "")
+                self.assertGreater(float(row["total_carbon"]), 0.0)
+
+    def test_portfolio_reports(self):
+        """Full reports of each bill of materials are streamed line by line"""
+        portfolio = Portfolio(self.bom_files, op_power=10 * W, reports=True)
+        handle = io.StringIO()
+        stream = open_report_stream(handle, "jsonl")
+        n_boms, n_failed = write_reports(portfolio.run(workers=2, chunk_size=1), stream)
+        self.assertEqual((n_boms, n_failed), (len(self.bom_files), 0))
+
+        reports = [json.loads(line) for line in handle.getvalue().splitlines()]
+        self.assertEqual([report["bom"] for report in reports], self.bom_files)
+        for report in reports:
+            bom = load_bom(report["bom"], self.act_model.materials_model.MaterialType)
+            carbon = self.act_model.get_carbon(bom, op_power=10 * W, export="none")
+            self.assertEqual(report["total_carbon"], str(carbon.total().to(kg)))
+            self.assertEqual(
+                set(report["result_by_device"]["silicon_results"]), set(bom.silicon)
+            )
+
+        handle = io.StringIO()
+        stream = open_report_stream(handle, "csv", keys=("bom",))
+        write_reports(portfolio.run(workers=0), stream)
+        rows = list(csv.DictReader(io.StringIO(handle.getvalue())))
+        totals = [row for row in rows if row["section"] == "total"]
+        self.assertEqual([row["bom"] for row in totals], self.bom_files)
+        self.assertEqual(
+            [f"{row['carbon']} {row['unit']}" for row in totals],
+            [report["total_carbon"] for report in reports],
+        )
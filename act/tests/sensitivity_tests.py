@@ -0,0 +1,83 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import numpy as np
+
+from ..core.bom import load_bom
+from ..core.sensitivity import (
+    default_sensitivity_spec,
+    morris_design,
+    SensitivityAnalysis,
+    sobol_indices,
+)
+from ..core.units import *
+
+from .base_test_case import BaseTestCase
+
+
+class SensitivityTests(BaseTestCase):
+    """Tests for Sobol indices and Morris screening"""
+
+    def test_sobol_estimators(self):
+        """Sobol indices of an additive function match their analytic values"""
+        rng = np.random.default_rng(0)
+        n_samples, weights = 20000, np.array([1.0, 2.0, 0.0])
+        a, b = rng.random((n_samples, 3)), rng.random((n_samples, 3))
+        ab = np.repeat(a[None], 3, axis=0)
+        ab[np.arange(3), :, np.arange(3)] = b.T
+
+        first, total, first_conf, total_conf = sobol_indices(
+            a @ weights, b @ weights, ab @ weights, seed=0
+        )
+        expected = weights**2 / np.sum(weights**2)
+        np.testing.assert_allclose(first, expected, atol=0.03)
+        np.testing.assert_allclose(total, expected, atol=0.03)
+        self.assertTrue(np.all(first_conf >= 0) and np.all(total_conf >= 0))
+
+    def test_morris_design(self):
+        """Each step of a Morris trajectory changes a single parameter by the grid step"""
+        points, order, steps = morris_design(dims=5, n_trajectories=10, seed=0)
+        self.assertEqual(points.shape, (10, 6, 5))
+        self.assertTrue(np.all((points >= 0) & (points <= 1)))
+        changes = np.diff(points, axis=1)
+        for r in range(10):
+            for k in range(5):
+                expected = np.zeros(5)
+                expected[order[r, k]] = steps[r, order[r, k]]
+                np.testing.assert_allclose(changes[r, k], expected, atol=1e-12)
+
+    def test_default_parameters(self):
+        """Every numeric field of the bill of materials is analyzed by default"""
+        bom = load_bom(
+            f"{self.boms_dir}/test.yaml", self.act_model.materials_model.MaterialType
+        )
+        op_args = dict(op_power=1 * W, duty_cycle=1.0, hw_lifetime=2 * year)
+        spec = default_sensitivity_spec(bom, op_args, spread=0.1)
+        for name in [
+            "silicon.dut.area",
+            "silicon.dut.fab_yield",
+            "passives.cap0.weight",
+            "materials.pcb.area",
+            "materials.battery.capacity",
+            "op_power",
+        ]:
+            self.assertIn(name, spec)
+        self.assertEqual(spec["duty_cycle"].high, 1.0)
+        self.assertAlmostEqual(spec["silicon.dut.area"].low, 9.0)
+
+    def test_sensitivity_ranking(self):
+        """Operational parameters dominate the carbon of a device with a high operating power"""
+        analysis = SensitivityAnalysis(
+            f"{self.boms_dir}/fairphone3.yaml", op_power=2 * W
+        )
+        top = {"hw_lifetime", "op_power", "duty_cycle"}
+
+        indices = analysis.sobol(512, seed=0, model=self.act_model)
+        self.assertEqual(set(indices.ranking()[:3]), top)
+        self.assertAlmostEqual(indices.total_order.sum(), 1.0, delta=0.15)
+
+        effects = analysis.morris(10, seed=0, model=self.act_model)
+        self.assertEqual(set(effects.ranking()[:3]), top)
+        self.assertEqual(effects.names, indices.names)
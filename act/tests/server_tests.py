@@ -0,0 +1,122 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import asyncio
+import json
+import os
+
+from ..core.bom import load_bom
+from ..core.common import *
+from ..core.server import CarbonServer
+from ..core.units import *
+
+from .base_test_case import BaseTestCase
+
+
+async def _request(connect, method: str, path: str, body=None) -> tuple:
+    """Send one HTTP request on a new connection and return the status and JSON response"""
+    reader, writer = await connect()
+    data = b"" if body is None else json.dumps(body).encode()
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: act\r\nContent-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode()
+        + data
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(payload)
+
+
+class CarbonServerTests(BaseTestCase):
+    """Tests for the long-running query server"""
+
+    def setUp(self):
+        super().setUp()
+        self.bom_file = f"{self.boms_dir}/fairphone3.yaml"
+        self.socket = f"{self.out_dir}/act.sock"
+
+    def test_server(self):
+        """Queries over a Unix socket match scalar evaluations and are batched"""
+        server = CarbonServer(max_batch=16, batch_window=0.05, max_concurrency=4)
+        query = dict(bom_file=self.bom_file, op_power="2 W", hw_lifetime="3 years")
+
+        async def run():
+            await server.start(path=self.socket)
+            connect = lambda: asyncio.open_unix_connection(self.socket)
+            try:
+                single = await _request(connect, "POST", "/carbon", query)
+                concurrent = await asyncio.gather(
+                    *[
+                        _request(connect, "POST", "/carbon", dict(query, duty_cycle=d))
+                        for d in [0.1, 0.2, 0.3, 0.4, 0.5, 0.6]
+                    ]
+                )
+                batch = await _request(
+                    connect,
+                    "POST",
+                    "/carbon",
+                    [dict(query, devices=False), dict(query, op_ci="atlantis")],
+                )
+                invalid = await _request(connect, "POST", "/carbon", dict(bom=1))
+                missing = await _request(connect, "GET", "/carbon")
+                health = await _request(connect, "GET", "/health")
+            finally:
+                await server.close()
+            return single, concurrent, batch, invalid, missing, health
+
+        single, concurrent, batch, invalid, missing, health = asyncio.run(run())
+
+        bom = load_bom(self.bom_file, self.act_model.materials_model.MaterialType)
+        expected = self.act_model.get_carbon(
+            bom, op_power=2 * W, hw_lifetime=3 * year, export="none"
+        )
+        status, report = single
+        self.assertEqual(status, 200)
+        self.assertEqual(report["total_carbon"], str(expected.total().to(kg)))
+        self.assertEqual(
+            set(report["result_by_device"]["silicon_results"]), set(bom.silicon)
+        )
+        self.assertNotIn("cl_args", report)
+
+        # the concurrent queries are evaluated in fewer batches than queries
+        self.assertEqual([status for status, _ in concurrent], [200] * 6)
+        duty_cycles = [r["query_settings"]["duty_cycle"] for _, r in concurrent]
+        self.assertEqual(duty_cycles, ["0.1", "0.2", "0.3", "0.4", "0.5", "0.6"])
+        self.assertLess(server.stats["batches"], server.stats["queries"])
+
+        status, results = batch
+        self.assertEqual(status, 200)
+        self.assertNotIn("result_by_device", results[0])
+        self.assertIn("error", results[1])
+        self.assertEqual(invalid[0], 400)
+        self.assertEqual(missing[0], 404)
+        self.assertEqual(health[1]["status"], "ok")
+        self.assertEqual(health[1]["errors"], 2)
+        self.assertFalse(os.path.exists(self.socket))
+
+    def test_server_tcp(self):
+        """Inline bills of materials are answered over TCP"""
+        server = CarbonServer()
+        bom = dict(silicon=dict(cpu=dict(area="100 mm2", process="7nm", count=2)))
+
+        async def run():
+            await server.start(host="127.0.0.1", port=0)
+            host, port = server.addresses[0][:2]
+            try:
+                return await _request(
+                    lambda: asyncio.open_connection(host, port),
+                    "POST",
+                    "/carbon",
+                    dict(bom=bom, op_power="1 W"),
+                )
+            finally:
+                await server.close()
+
+        status, report = asyncio.run(run())
+        self.assertEqual(status, 200)
+        self.assertIn(
+            "FABRICATION", report["result_by_device"]["silicon_results"]["cpu"]
+        )
@@ -0,0 +1,115 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import concurrent.futures
+import os
+
+import numpy as np
+
+from ..core.carbon import SOURCE_INDEX, SourceType
+from ..core.common import *
+from ..core.store import carbon_column, ResultStore, write_store
+from ..core.sweep import Sweep
+from ..core.units import *
+
+from .base_test_case import BaseTestCase
+
+
+def _append_sweep(path: str, bom_file: str, spec: dict, start: int, stop: int) -> int:
+    """Evaluate a range of design points of a sweep and append them to a store from a worker process"""
+    sweep = Sweep(bom_file, spec)
+    points, carbon = next(sweep.run(workers=0, chunk_size=sweep.size))
+    points = {name: values[start:stop] for name, values in points.items()}
+    return ResultStore(path).append(points, carbon[start:stop])
+
+
+class ResultStoreTests(BaseTestCase):
+    """Tests for the columnar result store"""
+
+    def setUp(self):
+        super().setUp()
+        self.bom_file = f"{self.boms_dir}/fairphone3.yaml"
+        self.spec = {
+            "silicon.cpu.area": {"start": "20 mm2", "stop": "60 mm2", "num": 3},
+            "silicon.cpu.process": ["28nm", "7nm"],
+            "duty_cycle": [0.5, 1.0],
+        }
+        self.path = f"{self.out_dir}/store"
+
+    def test_store_round_trip(self):
+        """Sweep results read back from the store match the evaluated chunks"""
+        sweep = Sweep(self.bom_file, self.spec)
+        chunks = list(sweep.run(workers=0, chunk_size=5))
+        self.assertEqual(write_store(iter(chunks), self.path), sweep.size)
+
+        store = ResultStore(self.path)
+        self.assertEqual(len(store), sweep.size)
+        self.assertEqual(
+            store.columns,
+            [*self.spec, *[carbon_column(src) for src in SourceType]],
+        )
+        points = sweep.points(0, sweep.size)
+        carbon = np.concatenate([c.values for _, c in chunks])
+
+        area = store.quantity("silicon.cpu.area")
+        self.assertIsInstance(area.magnitude, np.memmap)
+        np.testing.assert_allclose(area.m_as(mm2), points["silicon.cpu.area"].m_as(mm2))
+        np.testing.assert_array_equal(store.column("duty_cycle"), points["duty_cycle"])
+        categories = store.categories("silicon.cpu.process")
+        self.assertEqual(categories, ["28nm", "7nm"])
+        processes = [categories[i] for i in store.column("silicon.cpu.process")]
+        self.assertEqual(processes, list(points["silicon.cpu.process"]))
+        for src in SourceType:
+            np.testing.assert_array_equal(
+                store.partial(src), carbon[:, SOURCE_INDEX[src]]
+            )
+        np.testing.assert_allclose(
+            store.total(), np.concatenate([c.total().m_as(g) for _, c in chunks])
+        )
+
+        # appends convert quantities to the unit of the column and reject other parameters
+        point, result = chunks[0][0], chunks[0][1]
+        point = dict(point, **{"silicon.cpu.area": point["silicon.cpu.area"].to(cm2)})
+        self.assertEqual(store.append(point, result), sweep.size + 5)
+        np.testing.assert_allclose(
+            store.quantity("silicon.cpu.area")[-5:].m_as(mm2),
+            chunks[0][0]["silicon.cpu.area"].m_as(mm2),
+        )
+        with self.assertRaises(ValueError):
+            store.append({"duty_cycle": point["duty_cycle"]}, result)
+        self.assertEqual(len(store), sweep.size + 5)
+
+        # rows of an interrupted append are dropped
+        with open(f"{self.path}/duty_cycle.bin", "ab") as handle:
+            handle.write(np.zeros(3).tobytes())
+        self.assertEqual(len(store), sweep.size + 5)
+        store.append(point, result)
+        self.assertEqual(
+            os.path.getsize(f"{self.path}/duty_cycle.bin"), 8 * (sweep.size + 10)
+        )
+
+    def test_store_concurrent_appends(self):
+        """Worker processes append to the same store"""
+        size = Sweep(self.bom_file, self.spec).size
+        ranges = [(start, min(start + 4, size)) for start in range(0, size, 4)]
+        with concurrent.futures.ProcessPoolExecutor(max_workers=3) as executor:
+            futures = [
+                executor.submit(_append_sweep, self.path, self.bom_file, self.spec, *r)
+                for r in ranges
+            ]
+            for future in futures:
+                future.result()
+
+        store = ResultStore(self.path)
+        self.assertEqual(len(store), size)
+        self.assertEqual(
+            sorted(store.categories("silicon.cpu.process")), ["28nm", "7nm"]
+        )
+        _, carbon = next(
+            Sweep(self.bom_file, self.spec).run(workers=0, chunk_size=size)
+        )
+        np.testing.assert_allclose(
+            np.sort(store.total()), np.sort(carbon.total().m_as(g))
+        )
@@ -0,0 +1,111 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import copy
+import csv
+import io
+import json
+
+import numpy as np
+
+from ..core.bom import load_bom
+from ..core.carbon import SourceType
+from ..core.common import *
+from ..core.sweep import parse_axis, Sweep, write_csv, write_jsonl
+from ..core.units import *
+
+from .base_test_case import BaseTestCase
+
+
+class SweepTests(BaseTestCase):
+    """Tests for the cartesian design space sweep engine"""
+
+    def setUp(self):
+        super().setUp()
+        self.bom_file = f"{self.boms_dir}/fairphone3.yaml"
+        self.bom = load_bom(self.bom_file, self.act_model.materials_model.MaterialType)
+        self.spec = {
+            "silicon.cpu.area": {"start": "20 mm2", "stop": "60 mm2", "num": 3},
+            "silicon.cpu.process": ["28nm", "7nm"],
+            "fab_ci": ["coal", "taiwan"],
+            "hw_lifetime": ["1 year", "3 years"],
+            "op_power": {"start": "1 W", "stop": "2 W", "step": "0.5 W"},
+        }
+
+    def test_parse_axis(self):
+        """Lists and ranges are parsed into arrays of values"""
+        axis = parse_axis(
+            "silicon.cpu.area", {"start": "1 cm2", "stop": "2 cm2", "num": 5}
+        )
+        self.assertEqual(len(axis), 5)
+        self.assertAlmostEqual(axis.values[-1].m_as(cm2), 2.0)
+
+        axis = parse_axis("duty_cycle", {"start": 0.25, "stop": 1.0, "step": 0.25})
+        np.testing.assert_allclose(axis.values, [0.25, 0.5, 0.75, 1.0])
+
+        axis = parse_axis("silicon.cpu.process", ["28nm", "7nm"])
+        self.assertEqual(list(axis.values), ["28nm", "7nm"])
+
+        with self.assertRaises(ValueError):
+            parse_axis("fab_ci", {"start": 0, "stop": 1, "num": 2})
+        with self.assertRaises(ValueError):
+            parse_axis("op_power", [])
+
+    def test_sweep_matches_get_carbon(self):
+        """Every design point of a sweep matches a scalar ACTModel.get_carbon call"""
+        sweep = Sweep(self.bom_file, self.spec)
+        self.assertEqual(sweep.shape, (3, 2, 2, 2, 3))
+        self.assertEqual(sweep.size, 72)
+
+        chunks = list(sweep.run(workers=0, chunk_size=25))
+        self.assertEqual([len(carbon) for _, carbon in chunks], [25, 25, 22])
+
+        points, carbon = chunks[1]
+        for i in [0, 7, 24]:
+            bom = copy.deepcopy(self.bom)
+            bom.silicon["cpu"].area = points["silicon.cpu.area"][i]
+            bom.silicon["cpu"].process = LogicProcess(points["silicon.cpu.process"][i])
+            for device in bom.silicon.values():
+                device.fab_ci = get_src_or_loc(points["fab_ci"][i])
+            expected = self.act_model.get_carbon(
+                bom,
+                op_power=points["op_power"][i],
+                hw_lifetime=points["hw_lifetime"][i],
+            )
+            self.assertAlmostEqual(
+                carbon[i].total().m_as(g), expected.total().m_as(g), places=6
+            )
+
+    def test_sweep_process_pool(self):
+        """Sweeps evaluated across worker processes stream the same results in grid order"""
+        sweep = Sweep(self.bom_file, self.spec)
+        serial = [carbon for _, carbon in sweep.run(workers=0, chunk_size=10)]
+        parallel = [carbon for _, carbon in sweep.run(workers=2, chunk_size=10)]
+        self.assertEqual(len(serial), len(parallel))
+        for a, b in zip(serial, parallel):
+            np.testing.assert_array_equal(a.values, b.values)
+
+        out_file = f"{self.out_dir}/sweep.csv"
+        with open(out_file, "w", newline="") as handle:
+            n_points = write_csv(sweep.run(workers=2, chunk_size=10), handle)
+        self.assertEqual(n_points, sweep.size)
+        with open(out_file) as handle:
+            rows = list(csv.DictReader(handle))
+        self.assertEqual(len(rows), sweep.size)
+        self.assertEqual(rows[0]["silicon.cpu.process"], "28nm")
+        self.assertAlmostEqual(
+            float(rows[-1]["total_carbon"]), serial[-1][-1].total().m_as(kg)
+        )
+
+        handle = io.StringIO()
+        self.assertEqual(write_jsonl(sweep.run(workers=0), handle), sweep.size)
+        records = [json.loads(line) for line in handle.getvalue().splitlines()]
+        self.assertEqual(records[0]["parameters"]["silicon.cpu.process"], "28nm")
+        self.assertEqual(
+            records[-1]["total_carbon"], str(serial[-1][-1].total().to(kg))
+        )
+        self.assertEqual(
+            set(records[-1]["result_by_category"]), {src.name for src in SourceType}
+        )
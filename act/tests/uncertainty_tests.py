@@ -0,0 +1,210 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import copy
+import statistics
+
+import numpy as np
+
+from ..core.bom import load_bom
+from ..core.carbon import SourceType
+from ..core.common import *
+from ..core.sampling import (
+    get_sampler,
+    HaltonSampler,
+    LatinHypercubeSampler,
+    SobolSampler,
+)
+from ..core.uncertainty import (
+    Choice,
+    MonteCarlo,
+    norm_ppf,
+    parse_distribution,
+    Triangular,
+)
+from ..core.units import *
+
+from .base_test_case import BaseTestCase
+
+
+class UncertaintyTests(BaseTestCase):
+    """Tests for Monte Carlo uncertainty propagation"""
+
+    def setUp(self):
+        super().setUp()
+        self.bom_file = f"{self.boms_dir}/fairphone3.yaml"
+        self.spec = {
+            "silicon.cpu.fab_yield": {
+                "dist": "triangular",
+                "low": 0.8,
+                "mode": 0.875,
+                "high": 0.95,
+            },
+            "fab_ci": {"dist": "choice", "values": ["taiwan", "korea"]},
+            "gpa": [95, 99],
+            "duty_cycle": {"dist": "uniform", "low": 0.2, "high": 0.6},
+            "hw_lifetime": {
+                "dist": "normal",
+                "mean": "3 years",
+                "std": "6 months",
+                "low": "1 year",
+            },
+            "op_power": {"dist": "lognormal", "median": "2 W", "sigma": 0.3},
+        }
+
+    def test_distributions(self):
+        """Distributions map uniform samples to their quantiles"""
+        u = np.array([1e-12, 0.01, 0.3, 0.5, 0.9, 0.999])
+        expected = [statistics.NormalDist().inv_cdf(p) for p in u]
+        np.testing.assert_allclose(norm_ppf(u), expected, rtol=1e-8)
+        self.assertTrue(np.all(np.isfinite(norm_ppf(np.array([0.0, 1.0])))))
+
+        dist = Triangular(low=0.8, mode=0.9, high=0.95)
+        np.testing.assert_allclose(
+            dist.ppf(np.array([0.0, 2 / 3, 1.0])), [0.8, 0.9, 0.95]
+        )
+        dist = Triangular(low=0.9, mode=0.9, high=0.9)
+        np.testing.assert_array_equal(dist.ppf(np.array([0.0, 0.5])), [0.9, 0.9])
+        with self.assertRaises(ValueError):
+            Triangular(low=0.8, mode=0.99, high=0.95)
+
+        dist = Choice(values=["taiwan", "korea"], weights=[3, 1])
+        values = dist.ppf(np.array([0.0, 0.74, 0.76, 0.999]))
+        self.assertEqual(list(values), ["taiwan", "taiwan", "korea", "korea"])
+
+        dist = parse_distribution("hw_lifetime", self.spec["hw_lifetime"])
+        samples = dist.sample(np.linspace(0, 1, 101))
+        self.assertGreaterEqual(samples.min(), 1 * year)
+        self.assertAlmostEqual(samples[50].m_as(year), 3.0, places=3)
+
+        with self.assertRaises(ValueError):
+            parse_distribution("fab_ci", {"dist": "uniform", "low": 0, "high": 1})
+
+    def test_samples_match_get_carbon(self):
+        """Each vectorized sample matches a scalar ACTModel.get_carbon call"""
+        monte_carlo = MonteCarlo(self.bom_file, self.spec)
+        bom = load_bom(self.bom_file, self.act_model.materials_model.MaterialType)
+        u = np.random.default_rng(0).random((5, monte_carlo.dims))
+        samples = monte_carlo.sample(u)
+        carbon, devices = monte_carlo.evaluate_samples(self.act_model, bom, u)
+
+        for i in range(len(u)):
+            sample_bom = copy.deepcopy(bom)
+            sample_bom.silicon["cpu"].fab_yield = samples["silicon.cpu.fab_yield"][i]
+            for device in sample_bom.silicon.values():
+                device.fab_ci = get_src_or_loc(samples["fab_ci"][i])
+                device.gpa = AbatementLevel(samples["gpa"][i])
+            expected = self.act_model.get_carbon(
+                sample_bom,
+                op_power=samples["op_power"][i],
+                duty_cycle=samples["duty_cycle"][i],
+                hw_lifetime=samples["hw_lifetime"][i],
+            )
+            for src in SourceType:
+                self.assertAlmostEqual(
+                    carbon[i].partial(src).m_as(g),
+                    expected.partial(src).m_as(g),
+                    places=6,
+                )
+            self.assertAlmostEqual(
+                devices["silicon.cpu"][i],
+                self.act_model.silicon_results["cpu"].total().m_as(g),
+                places=6,
+            )
+
+    def test_reproducible_runs(self):
+        """Seeded runs are reproducible and independent of the number of workers"""
+        monte_carlo = MonteCarlo(self.bom_file, self.spec)
+        serial = monte_carlo.run(2000, seed=7, chunk_size=500)
+        parallel = monte_carlo.run(2000, seed=7, chunk_size=500, workers=2)
+        np.testing.assert_array_equal(serial.carbon.values, parallel.carbon.values)
+        for device, values in serial.devices.items():
+            np.testing.assert_array_equal(values, parallel.devices[device])
+
+        with self.assertRaisesRegex(ValueError, "n_samples"):
+            monte_carlo.run(0)
+
+        other = monte_carlo.run(2000, seed=8, chunk_size=500)
+        self.assertFalse(np.array_equal(serial.carbon.values, other.carbon.values))
+
+        self.assertEqual(serial.n_samples, 2000)
+        self.assertEqual(len(serial.total), len(serial.percentiles))
+        self.assertTrue(np.all(np.diff(serial.total.m_as(g)) >= 0))
+        self.assertIn(SourceType.OPERATION, serial.by_type)
+        self.assertIn("silicon.cpu", serial.by_device)
+        report = serial.to_dict(kg)
+        self.assertEqual(
+            set(report["total_carbon"]), {"p5", "p25", "p50", "p75", "p95"}
+        )
+
+    def test_samplers(self):
+        """Latin hypercube and low discrepancy samplers cover the unit cube evenly"""
+        n_samples = 1000
+        design = LatinHypercubeSampler(3, n_samples, seed=0).sample(0, n_samples, None)
+        for column in design.T:
+            strata = np.sort(np.floor(column * n_samples))
+            np.testing.assert_array_equal(strata, np.arange(n_samples))
+
+        halton = HaltonSampler(2, 4, scramble=False)
+        np.testing.assert_allclose(
+            halton.sample(0, 4, None),
+            [[0, 0], [0.5, 1 / 3], [0.25, 2 / 3], [0.75, 1 / 9]],
+        )
+        np.testing.assert_array_equal(
+            halton.sample(2, 4, None), halton.sample(0, 4, None)[2:]
+        )
+        halton = HaltonSampler(2, 64, seed=0)
+        np.testing.assert_array_equal(
+            halton.sample(10, 64, None), halton.sample(0, 64, None)[10:]
+        )
+        self.assertFalse(np.array_equal(halton.sample(0, 64, None)[0], [0, 0]))
+
+        # integrate a smooth function over the unit cube (exact value 1 / 16)
+        def error(name):
+            sampler = get_sampler(name, 4, 4096, seed=1)
+            seeds = sampler.chunk_seeds(1)
+            u = sampler.sample(0, 4096, seeds[0])
+            return abs(np.mean(np.prod(u, axis=1)) - 1 / 16)
+
+        self.assertLess(error("halton"), error("random"))
+        self.assertLess(error("sobol"), error("random"))
+        self.assertLess(error("lhs"), error("random"))
+
+        with self.assertRaises(ValueError):
+            get_sampler("grid", 4, 4096)
+
+    def test_sobol_sampler(self):
+        """Sobol samples match the reference sequence and scrambled designs stay balanced"""
+        sobol = SobolSampler(3, 8, scramble=False)
+        np.testing.assert_array_equal(
+            sobol.sample(0, 8, None).T,
+            [
+                [0, 0.5, 0.75, 0.25, 0.375, 0.875, 0.625, 0.125],
+                [0, 0.5, 0.25, 0.75, 0.375, 0.875, 0.125, 0.625],
+                [0, 0.5, 0.25, 0.75, 0.625, 0.125, 0.875, 0.375],
+            ],
+        )
+
+        sampler = get_sampler("sobol", 3, 256, seed=0)
+        full = sampler.sample(0, 256, None)
+        np.testing.assert_array_equal(sampler.sample(100, 200, None), full[100:200])
+        for column in full.T:
+            strata = np.sort(np.floor(column * 256))
+            np.testing.assert_array_equal(strata, np.arange(256))
+        other = get_sampler("sobol", 3, 256, seed=1).sample(0, 256, None)
+        self.assertFalse(np.array_equal(full, other))
+
+        with self.assertRaises(ValueError):
+            get_sampler("sobol", 2000, 256)
+
+    def test_quasi_monte_carlo_runs(self):
+        """Monte Carlo runs with Latin hypercube and Halton designs are independent of the chunking"""
+        monte_carlo = MonteCarlo(self.bom_file, self.spec)
+        for sampler in ["lhs", "halton"]:
+            serial = monte_carlo.run(1000, seed=3, sampler=sampler)
+            parallel = monte_carlo.run(
+                1000, seed=3, sampler=sampler, chunk_size=300, workers=2
+            )
+            np.testing.assert_array_equal(serial.carbon.values, parallel.carbon.values)
@@ -0,0 +1,163 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import argparse
+import datetime
+import logging
+import sys
+
+import yaml
+
+from .core.arg_parser import add_lifetime_args
+from .core.common import DEFAULT_OP_LOCATION, get_src_or_loc
+from .core.logger import log, setup_logger
+from .core.sampling import SAMPLERS
+from .core.uncertainty import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_PERCENTILES,
+    load_uncertainty_spec,
+    MonteCarlo,
+)
+from .core.units import kg, units
+
+
+def get_parser():
+    """
+    Returns an ArgumentParser instance for the ACT uncertainty analysis tool.
+
+    The parser includes arguments for the bill of materials, the uncertainty specification,
+    the sampling settings, the output report and the operating parameters that are not uncertain.
+    """
+    parser = argparse.ArgumentParser(description="ACT uncertainty analysis tool.")
+
+    add_lifetime_args(parser)
+
+    parser.add_argument(
+        "-m",
+        "--materials",
+        type=str,
+        required=True,
+        help="Bill of materials file to analyze.",
+    )
+    parser.add_argument(
+        "-u",
+        "--uncertainty",
+        type=str,
+        required=True,
+        help="Uncertainty specification file mapping parameters (ex., silicon.cpu.fab_yield, fab_ci, hw_lifetime) to distributions.",
+    )
+    parser.add_argument(
+        "-n",
+        "--samples",
+        type=int,
+        default=10000,
+        help="Number of samples.",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Seed of the random streams for reproducible results.",
+    )
+    parser.add_argument(
+        "--sampler",
+        type=str,
+        default="random",
+        choices=list(SAMPLERS),
+        help="Uniform sample generator. Latin hypercube (lhs) and low discrepancy (halton, sobol) designs converge faster than random samples.",
+    )
+    parser.add_argument(
+        "--percentiles",
+        type=float,
+        nargs="+",
+        default=DEFAULT_PERCENTILES,
+        help="Percentiles to report.",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=0,
+        help="Number of worker processes. Defaults to 0 to run in this process.",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Number of samples evaluated per vectorized call.",
+    )
+    parser.add_argument(
+        "--op-power",
+        default="0mW",
+        type=str,
+        help="Device operating power. Must have units of power (ex. 100mW, 10W etc.).",
+    )
+    parser.add_argument(
+        "--op-ci",
+        default=DEFAULT_OP_LOCATION,
+        type=str,
+        help=f"Carbon intensity configuration for device operation. By default will use {DEFAULT_OP_LOCATION}.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        default="uncertainty.yaml",
+        help="Output report file for the percentiles.",
+    )
+    parser.add_argument(
+        "-l",
+        "--loglevel",
+        type=str,
+        default="info",
+        help="Log level to report messages and telemetry.",
+    )
+
+    return parser
+
+
+def main():
+    # parse arguments and sanitize them
+    parser = get_parser()
+    args = parser.parse_args()
+
+    # setup logging and telemetry
+    loglevel = getattr(logging, args.loglevel.upper())
+    setup_logger(loglevel=loglevel)
+
+    log.info("ACT uncertainty called with: " + " ".join(sys.argv))
+
+    monte_carlo = MonteCarlo(
+        bom_file=args.materials,
+        spec=load_uncertainty_spec(args.uncertainty),
+        op_power=units(args.op_power),
+        op_ci=get_src_or_loc(args.op_ci),
+        duty_cycle=float(args.duty_cycle),
+        hw_lifetime=units(args.lifetime),
+    )
+    result = monte_carlo.run(
+        n_samples=args.samples,
+        seed=args.seed,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        percentiles=args.percentiles,
+        sampler=args.sampler,
+    )
+
+    now = datetime.datetime.now()
+    export_data = dict(report_generated=now.strftime("%m/%d/%Y %H:%M:%S"))
+    export_data.update(cl_args=" ".join(sys.argv), seed=args.seed)
+    export_data.update(sampler=args.sampler)
+    export_data.update(result.to_dict(kg))
+    with open(args.output, "w") as handle:
+        yaml.dump(export_data, handle)
+    log.info(f"ACT uncertainty results exported to: {args.output}")
+
+    log.info(f"Mean total carbon over {args.samples} samples: {result.mean.to(kg)}")
+    log.info("ACT uncertainty done executing...")
+
+
+if __name__ == "__main__":
+    main()